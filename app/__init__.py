@@ -1,21 +1,41 @@
 from flask import Flask
 from flask_cors import CORS
 from config import config
+import logging
 import os
+import time
 
 def create_app(config_name=None):
     """Application factory pattern."""
+    start = time.perf_counter()
     if config_name is None:
         config_name = os.environ.get('FLASK_CONFIG', 'default')
     
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
+    # Serializes chat results directly, with orjson when installed
+    from app.serialization import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    app.json.compact = not app.config['JSON_PRETTY_PRINT']
+    
     # Enable CORS
     CORS(app)
     
     # Register blueprints
-    from app.routes import main
+    from app.routes import main, warm_up, install_assets, install_reload_signal
     app.register_blueprint(main)
+    install_assets(app)
+    install_reload_signal(app)
+    
+    # Build the chatbot now instead of on the first user's request.
+    # 'post_fork' leaves it to each gunicorn worker (see gunicorn.conf.py).
+    if app.config['CHATBOT_WARMUP'] == 'eager':
+        warm_up(app)
+    
+    from app.metrics import STARTUP
+    boot_time = time.perf_counter() - start
+    STARTUP.labels('boot').set(boot_time)
+    logging.getLogger(__name__).info("App created in %.3fs (warm-up: %s)", boot_time, app.config['CHATBOT_WARMUP'])
     
     return app
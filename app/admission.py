@@ -0,0 +1,167 @@
+"""
+Admission Control
+Bounded concurrency for model calls with waiting requests ordered by
+triage urgency, per-tier queue limits and queue-wait timeouts.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from .safety import UrgencyLevel
+
+# Lower value is admitted first
+URGENCY_PRIORITY = {
+    UrgencyLevel.EMERGENCY: 0,
+    UrgencyLevel.URGENT: 1,
+    UrgencyLevel.ROUTINE: 2
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a model call cannot be admitted (queue full or wait timed out)."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Model call not admitted: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ('event', 'granted', 'cancelled', 'tier')
+
+    def __init__(self, tier: str):
+        self.event = threading.Event()
+        self.granted = False
+        self.cancelled = False
+        self.tier = tier
+
+
+class AdmissionController:
+    """Priority-aware concurrency limiter around model calls."""
+
+    def __init__(self, max_concurrent: int = 8, queue_limits: Optional[Dict[str, int]] = None,
+                 queue_timeout: float = 10.0, retry_after: int = 5, sample_size: int = 1024):
+        """
+        Args:
+            max_concurrent (int): Model calls allowed to run at once
+            queue_limits (Dict[str, int]): Maximum waiting requests per urgency value
+            queue_timeout (float): Seconds a request may wait for a slot
+            retry_after (int): Retry-After seconds suggested to rejected clients
+            sample_size (int): Recent wait times kept per tier for percentiles
+        """
+        self.max_concurrent = max_concurrent
+        self.queue_limits = queue_limits or {
+            UrgencyLevel.URGENT.value: 64,
+            UrgencyLevel.ROUTINE.value: 32
+        }
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = []
+        self._sequence = itertools.count()
+
+        tiers = [level.value for level in UrgencyLevel]
+        self._queue_depth = {tier: 0 for tier in tiers}
+        self._admitted = {tier: 0 for tier in tiers}
+        self._rejected = {tier: 0 for tier in tiers}
+        self._timed_out = {tier: 0 for tier in tiers}
+        self._wait_times = {tier: deque(maxlen=sample_size) for tier in tiers}
+
+    def acquire(self, urgency: UrgencyLevel) -> None:
+        """
+        Wait for a model-call slot.
+
+        Raises:
+            AdmissionRejected: The tier's queue is full or the wait timed out
+        """
+        tier = urgency.value
+        start = time.monotonic()
+
+        with self._lock:
+            if self._active < self.max_concurrent and not any(self._queue_depth.values()):
+                self._active += 1
+                self._record_admission(tier, 0.0)
+                return
+
+            if self._queue_depth[tier] >= self.queue_limits.get(tier, 0):
+                self._rejected[tier] += 1
+                raise AdmissionRejected('queue full', self.retry_after)
+
+            waiter = _Waiter(tier)
+            heapq.heappush(self._waiters, (URGENCY_PRIORITY[urgency], next(self._sequence), waiter))
+            self._queue_depth[tier] += 1
+
+        waiter.event.wait(self.queue_timeout)
+
+        with self._lock:
+            if waiter.granted:
+                self._record_admission(tier, time.monotonic() - start)
+                return
+            # Left in the heap and skipped by release()
+            waiter.cancelled = True
+            self._queue_depth[tier] -= 1
+            self._timed_out[tier] += 1
+            raise AdmissionRejected('queue wait timed out', self.retry_after)
+
+    def release(self) -> None:
+        """Release a slot, handing it to the highest-priority waiter if any."""
+        with self._lock:
+            while self._waiters:
+                _, _, waiter = heapq.heappop(self._waiters)
+                if waiter.cancelled:
+                    continue
+                waiter.granted = True
+                self._queue_depth[waiter.tier] -= 1
+                waiter.event.set()
+                return
+            self._active -= 1
+
+    @contextmanager
+    def slot(self, urgency: UrgencyLevel):
+        """Hold a model-call slot for the duration of the block."""
+        self.acquire(urgency)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _record_admission(self, tier: str, wait_time: float) -> None:
+        self._admitted[tier] += 1
+        self._wait_times[tier].append(wait_time)
+
+    def stats(self) -> Dict:
+        """Get active slots, queue depth and wait-time statistics per tier."""
+        with self._lock:
+            tiers = {}
+            for tier, samples in self._wait_times.items():
+                waits = sorted(samples)
+                tiers[tier] = {
+                    'queue_depth': self._queue_depth[tier],
+                    'queue_limit': self.queue_limits.get(tier, 0),
+                    'admitted': self._admitted[tier],
+                    'rejected': self._rejected[tier],
+                    'timed_out': self._timed_out[tier],
+                    'wait_p50': _percentile(waits, 0.50),
+                    'wait_p95': _percentile(waits, 0.95),
+                    'wait_p99': _percentile(waits, 0.99),
+                    'wait_max': waits[-1] if waits else 0.0
+                }
+            return {
+                'active': self._active,
+                'max_concurrent': self.max_concurrent,
+                'tiers': tiers
+            }
+
+
+def _percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return round(sorted_values[index], 6)
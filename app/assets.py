@@ -0,0 +1,152 @@
+"""
+Precomputed Responses
+Static assets and fixed JSON bodies rendered once, stored with gzip (and
+brotli, when installed) variants and strong ETags, and served with 304s for
+matching If-None-Match headers.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip variants are stored without it
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 256
+
+# Cache-Control for content-addressed URLs, which change whenever the content does
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+_COMPRESSIBLE = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+
+@dataclass(frozen=True)
+class PrecomputedResponse:
+    """One response body with its compressed variants and validators."""
+    mimetype: str
+    digest: str
+    # Content-Encoding ('identity', 'gzip', 'br') -> body
+    variants: Dict[str, bytes]
+
+    @classmethod
+    def build(cls, body: bytes, mimetype: str) -> 'PrecomputedResponse':
+        variants = {'identity': body}
+        if len(body) >= MIN_COMPRESS_SIZE and mimetype.startswith(_COMPRESSIBLE):
+            # mtime=0 keeps the gzip bytes (and so the ETag) identical across workers
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                variants['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    variants['br'] = compressed
+        return cls(mimetype, hashlib.sha256(body).hexdigest(), variants)
+
+    @classmethod
+    def json(cls, data) -> 'PrecomputedResponse':
+        return cls.build(json.dumps(data).encode('utf-8'), 'application/json')
+
+    @property
+    def fingerprint(self) -> str:
+        """Short content hash used in asset URLs."""
+        return self.digest[:12]
+
+    def etag(self, encoding: str) -> str:
+        # Each encoding is a different representation, so it gets its own strong validator
+        suffix = '' if encoding == 'identity' else f'-{encoding}'
+        return f'{self.digest[:32]}{suffix}'
+
+    def respond(self, cache_control: str) -> Response:
+        """Serve the best variant for this request, or 304 if the client's copy is current."""
+        encoding = request.accept_encodings.best_match(
+            [e for e in ('br', 'gzip') if e in self.variants]) or 'identity'
+        headers = {'Cache-Control': cache_control, 'Vary': 'Accept-Encoding'}
+
+        etags = request.if_none_match
+        # Any variant matches: the client has the same content, whatever encoding it got it in
+        if etags and (etags.star_tag or any(etags.contains_weak(self.etag(e)) for e in self.variants)):
+            response = Response(status=304, headers=headers)
+        else:
+            response = Response(self.variants[encoding], mimetype=self.mimetype, headers=headers)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(self.etag(encoding))
+        return response
+
+
+class AssetStore:
+    """Static files and fixed responses, precomputed at startup."""
+
+    def __init__(self, static_folder: str):
+        """
+        Args:
+            static_folder (str): Directory whose files are loaded and fingerprinted
+        """
+        self.static_folder = static_folder
+        self.assets: Dict[str, PrecomputedResponse] = {}
+        self._rendered: Dict[str, PrecomputedResponse] = {}
+        self._lock = threading.Lock()
+
+        for root, _, files in os.walk(static_folder):
+            for name in files:
+                path = os.path.join(root, name)
+                filename = os.path.relpath(path, static_folder).replace(os.sep, '/')
+                # Bare mimetype: Werkzeug adds the charset for text types
+                mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                with open(path, 'rb') as f:
+                    self.assets[filename] = PrecomputedResponse.build(f.read(), mimetype)
+
+    def url(self, filename: str) -> str:
+        """Content-addressed URL for a static file; unknown files fall back to /static/."""
+        asset = self.assets.get(filename)
+        if asset is None:
+            return f'/static/{filename}'
+        return f'/assets/{asset.fingerprint}/{filename}'
+
+    def asset(self, filename: str) -> Optional[PrecomputedResponse]:
+        return self.assets.get(filename)
+
+    def rendered(self, key: str, render: Callable[[], Tuple[bytes, str]]) -> PrecomputedResponse:
+        """
+        Precompute a response on first use, e.g. a template that needs an app context.
+
+        Args:
+            key (str): Cache key
+            render (Callable): Returns the body and mimetype
+        """
+        response = self._rendered.get(key)
+        if response is None:
+            with self._lock:
+                response = self._rendered.get(key)
+                if response is None:
+                    response = PrecomputedResponse.build(*render())
+                    self._rendered[key] = response
+        return response
+
+    def add(self, key: str, response: PrecomputedResponse) -> None:
+        """Register a response precomputed at startup."""
+        self._rendered[key] = response
+
+    def get(self, key: str) -> PrecomputedResponse:
+        """A response registered with add()."""
+        return self._rendered[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Get counts and sizes of precomputed bodies."""
+        responses = list(self.assets.values()) + list(self._rendered.values())
+        return {
+            'responses': len(responses),
+            'bytes_identity': sum(len(r.variants['identity']) for r in responses),
+            'bytes_gzip': sum(len(r.variants.get('gzip', r.variants['identity'])) for r in responses),
+            'brotli': brotli is not None
+        }
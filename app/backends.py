@@ -0,0 +1,207 @@
+"""
+LLM Backends
+Pluggable text-generation backends used by MedicalChatbot: the Gemini API
+and a deterministic local stand-in for load tests and air-gapped runs.
+"""
+
+import inspect
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Iterator, Mapping, Optional
+
+DEFAULT_STUB_RESPONSE = 'This is a simulated response for testing purposes.'
+
+
+class StubBackendError(RuntimeError):
+    """Simulated model failure raised by StubBackend at its configured error rate."""
+
+
+class LLMBackend(ABC):
+    """Interface for text-generation backends."""
+
+    name = 'base'
+    # Whether an instance may be created before fork() and used in the child
+    fork_safe = True
+
+    @abstractmethod
+    def generate(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        """Generate the full response text for a prompt."""
+
+    def stream(self, prompt: str, system_instruction: Optional[str] = None) -> Iterator[str]:
+        """Yield response text incrementally. Defaults to a single chunk."""
+        yield self.generate(prompt, system_instruction)
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini generative model."""
+
+    name = 'gemini'
+    # The gRPC transport must not be shared across fork()
+    fork_safe = False
+
+    def __init__(self, api_key: str, model_name: str = 'gemini-1.5-flash'):
+        # Imported lazily so triage-only code paths never pay for the SDK
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        # Older SDKs have no system_instruction; the instruction is then
+        # prepended to the user turn instead
+        self.supports_system_instruction = (
+            'system_instruction' in inspect.signature(genai.GenerativeModel).parameters)
+        self._instructed_models = {}
+
+    def _request(self, prompt: str, system_instruction: Optional[str]):
+        """Pick the model and contents for a request."""
+        if not system_instruction:
+            return self.model, prompt
+        if not self.supports_system_instruction:
+            return self.model, f"{system_instruction}\n\n{prompt}"
+        model = self._instructed_models.get(system_instruction)
+        if model is None:
+            model = self._genai.GenerativeModel(self.model_name, system_instruction=system_instruction)
+            self._instructed_models[system_instruction] = model
+        return model, prompt
+
+    def generate(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        model, contents = self._request(prompt, system_instruction)
+        return model.generate_content(contents).text
+
+    def stream(self, prompt: str, system_instruction: Optional[str] = None) -> Iterator[str]:
+        model, contents = self._request(prompt, system_instruction)
+        for chunk in model.generate_content(contents, stream=True):
+            if chunk.text:
+                yield chunk.text
+
+
+class StubBackend(LLMBackend):
+    """
+    Local stand-in that simulates model latency without any network calls.
+
+    Latency is drawn from a configurable distribution and the response is
+    either a canned text or an echo of the user query, optionally padded or
+    cut to a fixed length. A fraction of calls can be made to fail.
+    """
+
+    name = 'stub'
+
+    DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal')
+    MODES = ('canned', 'echo')
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 distribution: str = 'fixed', mode: str = 'canned',
+                 canned_response: str = DEFAULT_STUB_RESPONSE,
+                 chunk_count: int = 4, seed: Optional[int] = None,
+                 error_rate: float = 0.0, response_chars: int = 0):
+        """
+        Args:
+            latency_ms (float): Mean (or fixed) response latency in milliseconds
+            jitter_ms (float): Spread of the latency distribution in milliseconds
+            distribution (str): One of 'fixed', 'uniform', 'normal', 'lognormal'
+            mode (str): 'canned' returns canned_response, 'echo' returns the user query
+            canned_response (str): Text returned in canned mode
+            chunk_count (int): Number of chunks emitted when streaming
+            seed (int): Seed for reproducible latency samples and failures
+            error_rate (float): Fraction of calls that raise StubBackendError after their latency
+            response_chars (int): Repeat or cut the response to this many characters (0 = as is)
+        """
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown stub response mode: {mode}")
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.distribution = distribution
+        self.mode = mode
+        self.canned_response = canned_response
+        self.chunk_count = max(1, chunk_count)
+        self.error_rate = error_rate
+        self.response_chars = response_chars
+        self._random = random.Random(seed)
+
+    def sample_latency(self) -> float:
+        """Draw one latency sample in seconds."""
+        mean, spread = self.latency_ms, self.jitter_ms
+        if self.distribution == 'uniform':
+            latency = self._random.uniform(mean - spread, mean + spread)
+        elif self.distribution == 'normal':
+            latency = self._random.gauss(mean, spread)
+        elif self.distribution == 'lognormal':
+            # Parameterized so the median equals latency_ms
+            sigma = spread / mean if mean > 0 else 0.0
+            latency = mean * self._random.lognormvariate(0.0, sigma)
+        else:
+            latency = mean
+        return max(0.0, latency) / 1000.0
+
+    def _respond(self, prompt: str) -> str:
+        if self.mode == 'echo':
+            marker = 'USER QUERY:'
+            query = prompt.split(marker, 1)[1] if marker in prompt else prompt
+            text = f"Echo: {query.strip().splitlines()[0] if query.strip() else ''}"
+        else:
+            text = self.canned_response
+        if self.response_chars > 0 and text:
+            text = (text + ' ') * (self.response_chars // (len(text) + 1) + 1)
+            text = text[:self.response_chars]
+        return text
+
+    def _should_fail(self) -> bool:
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def generate(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        fail = self._should_fail()
+        time.sleep(self.sample_latency())
+        if fail:
+            raise StubBackendError("Simulated model failure")
+        return self._respond(prompt)
+
+    def stream(self, prompt: str, system_instruction: Optional[str] = None) -> Iterator[str]:
+        text = self._respond(prompt)
+        # A failing stream breaks off after its first chunk, like a dropped upstream connection
+        fail = self._should_fail()
+        delay = self.sample_latency() / self.chunk_count
+        size = -(-len(text) // self.chunk_count) or 1
+        for start in range(0, len(text), size):
+            time.sleep(delay)
+            yield text[start:start + size]
+            if fail:
+                raise StubBackendError("Simulated model failure")
+
+
+def create_backend(settings: Mapping, api_key: Optional[str] = None) -> LLMBackend:
+    """
+    Build the backend selected by the application configuration.
+
+    Args:
+        settings (Mapping): Flask config or any mapping with the LLM_* / STUB_* keys
+        api_key (str): Gemini API key, required for the gemini backend
+
+    Returns:
+        LLMBackend: Configured backend instance
+    """
+    backend_name = settings.get('LLM_BACKEND', 'gemini')
+
+    if backend_name == 'gemini':
+        if not api_key:
+            raise ValueError("Gemini API key not found. Please check your .env file.")
+        return GeminiBackend(api_key, settings.get('GEMINI_MODEL', 'gemini-1.5-flash'))
+
+    if backend_name == 'stub':
+        return StubBackend(
+            latency_ms=settings.get('STUB_LATENCY_MS', 0.0),
+            jitter_ms=settings.get('STUB_LATENCY_JITTER_MS', 0.0),
+            distribution=settings.get('STUB_LATENCY_DISTRIBUTION', 'fixed'),
+            mode=settings.get('STUB_RESPONSE_MODE', 'canned'),
+            canned_response=settings.get('STUB_RESPONSE_TEXT') or DEFAULT_STUB_RESPONSE,
+            seed=settings.get('STUB_SEED'),
+            error_rate=settings.get('STUB_ERROR_RATE', 0.0),
+            response_chars=settings.get('STUB_RESPONSE_CHARS', 0)
+        )
+
+    raise ValueError(f"Unknown LLM backend: {backend_name}")
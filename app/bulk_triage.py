@@ -0,0 +1,218 @@
+"""
+Bulk Triage
+Re-triage historical chat logs offline: streams JSONL (optionally gzipped)
+messages through MedicalSafety and SymptomChecker in a process pool and
+writes ordered JSONL results, or the differences between two knowledge bases.
+
+Usage:
+    python -m app.bulk_triage logs.jsonl.gz -o triaged.jsonl.gz
+    python -m app.bulk_triage logs.jsonl.gz --baseline-kb kb_v1.json --kb kb_v2.json -o diff.jsonl
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from typing import Dict, IO, Iterator, List, Optional, Tuple
+
+from .knowledge_base import KnowledgeBase, TriageEngines
+
+# Per-process triage engines, built once by _init_worker
+_engines: List[TriageEngines] = []
+_options: Dict = {}
+
+
+def open_text(path: str, mode: str) -> IO[str]:
+    """Open a text stream; ``-`` is stdin/stdout and a ``.gz`` suffix means gzip."""
+    if path == '-':
+        # Leave the process's own streams open on exit
+        return nullcontext(sys.stdin if 'r' in mode else sys.stdout)
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', compresslevel=6)
+    return open(path, mode, encoding='utf-8', buffering=1024 * 1024)
+
+
+def _init_worker(kb_paths: List[Optional[str]], options: Dict) -> None:
+    """Build one engine set per knowledge base (baseline first when diffing)."""
+    _engines.clear()
+    for path in kb_paths:
+        kb = KnowledgeBase.load(path) if path else KnowledgeBase.builtin()
+        _engines.append(TriageEngines.build(kb))
+    _options.clear()
+    _options.update(options)
+
+
+def _triage(engines: TriageEngines, message: str) -> Dict:
+    analysis = engines.analyzer.analyze(message)
+    triage = engines.safety.assess_urgency_from(analysis)
+    result = {
+        'urgency': triage.urgency.value,
+        'risk_level': triage.risk.value,
+        'confidence': triage.confidence,
+        'conditions': [c['condition'] for c in engines.checker.analyze_symptoms_from(analysis)['possible_conditions']]
+    }
+    if _options['reasoning']:
+        result['reasoning'] = triage.reasoning
+    return result
+
+
+def process_chunk(first_line: int, lines: List[str]) -> Tuple[str, Counter]:
+    """
+    Triage a chunk of raw JSONL lines.
+
+    Returns:
+        Tuple[str, Counter]: Serialized output lines and per-chunk counters
+    """
+    message_field, id_field = _options['message_field'], _options['id_field']
+    diff = len(_engines) == 2
+    out = []
+    counts = Counter()
+
+    for line_number, line in enumerate(lines, first_line):
+        if not line.strip():
+            continue
+        counts['messages'] += 1
+        try:
+            record = json.loads(line)
+            message = record[message_field]
+            if not isinstance(message, str):
+                raise TypeError(f"'{message_field}' is not a string")
+        except (ValueError, KeyError, TypeError) as e:
+            counts['errors'] += 1
+            out.append(json.dumps({'line': line_number, 'error': f"{type(e).__name__}: {e}"}))
+            continue
+
+        key = {'line': line_number}
+        if id_field in record:
+            key['id'] = record[id_field]
+
+        if not diff:
+            result = _triage(_engines[0], message)
+            counts['urgency:' + result['urgency']] += 1
+            out.append(json.dumps({**key, **result}))
+            continue
+
+        before, after = _triage(_engines[0], message), _triage(_engines[1], message)
+        if before['urgency'] != after['urgency']:
+            counts[f"urgency:{before['urgency']}->{after['urgency']}"] += 1
+        if before['conditions'] != after['conditions']:
+            counts['conditions_changed'] += 1
+        if before != after:
+            counts['changed'] += 1
+            out.append(json.dumps({**key, 'before': before, 'after': after}))
+
+    return ''.join(line + '\n' for line in out), counts
+
+
+def read_chunks(stream: IO[str], chunk_size: int) -> Iterator[Tuple[int, List[str]]]:
+    """Yield ``(first_line_number, lines)`` chunks without reading the whole input."""
+    first_line = 1
+    while True:
+        lines = list(islice(stream, chunk_size))
+        if not lines:
+            return
+        yield first_line, lines
+        first_line += len(lines)
+
+
+def run(input_path: str, output_path: str, kb_paths: List[Optional[str]], workers: int = 0,
+        chunk_size: int = 2000, message_field: str = 'message', id_field: str = 'id',
+        reasoning: bool = False, progress_every: float = 0.0) -> Dict:
+    """
+    Triage every message in ``input_path`` and write ordered results to ``output_path``.
+
+    At most ``2 * workers`` chunks are in flight at once, so memory stays
+    constant regardless of input size while output keeps input order.
+
+    Args:
+        kb_paths (List[Optional[str]]): One knowledge base file (None = built-in), or
+            two to write only the messages whose triage differs between them
+
+    Returns:
+        Dict: Summary with message counts, urgency counts or transitions and throughput
+    """
+    workers = workers or os.cpu_count() or 1
+    options = {'message_field': message_field, 'id_field': id_field, 'reasoning': reasoning}
+    totals = Counter()
+    start = last_progress = time.perf_counter()
+
+    with open_text(input_path, 'r') as source, open_text(output_path, 'w') as sink:
+        chunks = read_chunks(source, chunk_size)
+
+        def report(output: str, counts: Counter) -> None:
+            nonlocal last_progress
+            sink.write(output)
+            totals.update(counts)
+            now = time.perf_counter()
+            if progress_every and now - last_progress >= progress_every:
+                last_progress = now
+                rate = totals['messages'] / (now - start)
+                print(f"{totals['messages']:,} messages, {rate:,.0f} msg/s", file=sys.stderr)
+
+        if workers == 1:
+            _init_worker(kb_paths, options)
+            for first_line, lines in chunks:
+                report(*process_chunk(first_line, lines))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(kb_paths, options)) as pool:
+                in_flight = deque()
+                for first_line, lines in chunks:
+                    if len(in_flight) >= 2 * workers:
+                        report(*in_flight.popleft().result())
+                    in_flight.append(pool.submit(process_chunk, first_line, lines))
+                while in_flight:
+                    report(*in_flight.popleft().result())
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        'messages': totals.pop('messages', 0),
+        'errors': totals.pop('errors', 0),
+        'elapsed_seconds': round(elapsed, 3),
+        'workers': workers,
+        'chunk_size': chunk_size
+    }
+    summary['messages_per_second'] = round(summary['messages'] / elapsed, 1) if elapsed > 0 else None
+    if len(kb_paths) == 2:
+        summary['changed'] = totals.pop('changed', 0)
+        summary['conditions_changed'] = totals.pop('conditions_changed', 0)
+    summary['urgency'] = {key.split(':', 1)[1]: count for key, count in sorted(totals.items())}
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Re-triage JSONL chat logs in bulk.')
+    parser.add_argument('input', help="JSONL input ('-' for stdin, .gz for gzip)")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output ('-' for stdout, .gz for gzip)")
+    parser.add_argument('--kb', help='Knowledge base JSON file (default: built-in lists)')
+    parser.add_argument('--baseline-kb', nargs='?', const='', default=None,
+                        help='Diff against this knowledge base (no value = built-in lists); '
+                             'only messages whose triage changes are written')
+    parser.add_argument('--workers', type=int, default=0, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=2000, help='Lines per batch sent to a worker')
+    parser.add_argument('--message-field', default='message', help='JSON field holding the message text')
+    parser.add_argument('--id-field', default='id', help='JSON field copied to the output to identify records')
+    parser.add_argument('--reasoning', action='store_true', help='Include triage reasoning in the output')
+    parser.add_argument('--progress', type=float, default=10.0,
+                        help='Seconds between progress lines on stderr (0 disables)')
+    args = parser.parse_args(argv)
+
+    kb_paths = [args.kb]
+    if args.baseline_kb is not None:
+        kb_paths.insert(0, args.baseline_kb or None)
+
+    summary = run(args.input, args.output, kb_paths, workers=args.workers, chunk_size=args.chunk_size,
+                  message_field=args.message_field, id_field=args.id_field,
+                  reasoning=args.reasoning, progress_every=args.progress)
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
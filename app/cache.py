@@ -0,0 +1,107 @@
+"""
+Response Cache
+Bounded in-process LRU cache with TTL expiry for model-generated answers.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def _estimate_size(value: Any) -> int:
+    """Rough byte footprint of a cached value."""
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, dict):
+        return sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class ResponseCache:
+    """Thread-safe LRU cache bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 8 * 1024 * 1024,
+                 ttl: float = 600.0):
+        """
+        Args:
+            max_entries (int): Maximum number of cached entries
+            max_bytes (int): Maximum estimated size of all cached values
+            ttl (float): Seconds an entry stays valid after being stored
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key`` or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, expires_at = entry
+            if expires_at <= now:
+                self._remove(key, size)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` under ``key``, evicting least recently used entries."""
+        size = _estimate_size(key) + _estimate_size(value)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+
+        with self._lock:
+            existing = self._entries.pop(key, None)
+            if existing is not None:
+                self._bytes -= existing[1]
+
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable, size: int) -> None:
+        del self._entries[key]
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache occupancy and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
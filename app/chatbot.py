@@ -1,21 +1,64 @@
-import google.generativeai as genai
-from typing import Dict, List, Optional
+from contextlib import nullcontext
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Tuple
 import logging
 import time
-from .safety import MedicalSafety, SymptomChecker, UrgencyLevel
+from .safety import MedicalSafety, SymptomChecker, TriageResult, UrgencyLevel
+from .cache import ResponseCache
+from .backends import GeminiBackend, LLMBackend
+from .admission import AdmissionController, AdmissionRejected
+from .metrics import PROMPT_TOKENS, record_request, timed
+from .text_analysis import MessageAnalysis, TextAnalyzer
+from .knowledge_base import KnowledgeBaseStore, TriageEngines
+from .prompts import Prompt, PromptBuilder
+from .coalescing import CoalescedWaitTimeout, SingleFlight
+from .sessions import SessionStore
+from .similarity import SimilarAnswerIndex, shingles
+from .results import DISCLAIMERS, ERROR_RESPONSE, ChatResult
+from .resilience import CircuitOpen, DeadlineExceeded, ModelCallGuard, ModelUnavailable
+from .rate_limit import RateLimited, RateLimiter
+
+logger = logging.getLogger(__name__)
 
 class MedicalChatbot:
-    """Medical chatbot using Google's Gemini AI."""
+    """Medical chatbot using Google's Gemini AI (or another LLMBackend)."""
     
-    def __init__(self, api_key: str):
-        """Initialize the chatbot with Gemini API key and safety systems."""
+    def __init__(self, api_key: Optional[str], response_cache: Optional[ResponseCache] = None,
+                 backend: Optional[LLMBackend] = None,
+                 admission: Optional[AdmissionController] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 model_guard: Optional[ModelCallGuard] = None,
+                 knowledge_base: Optional[KnowledgeBaseStore] = None,
+                 sessions: Optional[SessionStore] = None,
+                 similar_answers: Optional[SimilarAnswerIndex] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
+        """Initialize the chatbot with a generation backend and safety systems.
+        
+        Args:
+            api_key (str): Gemini API key, used when no backend is given
+            response_cache (ResponseCache): Optional cache for repeated questions
+            backend (LLMBackend): Generation backend, defaults to Gemini
+            admission (AdmissionController): Optional urgency-aware limiter for model calls
+            single_flight (SingleFlight): Optional coalescing of identical in-flight queries
+            model_guard (ModelCallGuard): Optional deadline, hedging and circuit breaker for model calls
+            knowledge_base (KnowledgeBaseStore): Source of triage engines, defaults to the packaged knowledge base
+            sessions (SessionStore): Optional multi-turn conversation history
+            similar_answers (SimilarAnswerIndex): Optional reuse of answers to paraphrased questions
+            rate_limiter (RateLimiter): Optional per-client and host-wide model-call limits;
+                emergencies are never limited
+        """
         self.api_key = api_key
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        self.response_cache = response_cache
+        self.backend = backend if backend is not None else GeminiBackend(api_key)
+        self.admission = admission
+        self.single_flight = single_flight
+        self.model_guard = model_guard
+        self.sessions = sessions
+        self.similar_answers = similar_answers
+        self.rate_limiter = rate_limiter
         
-        # Initialize safety and triage systems
-        self.safety_system = MedicalSafety()
-        self.symptom_checker = SymptomChecker()
+        # Safety and triage systems, swapped as a unit when the knowledge base reloads
+        self.knowledge_base = knowledge_base if knowledge_base is not None else KnowledgeBaseStore()
         
         # Enhanced medical context prompt with explainable AI
         self.system_prompt = """
@@ -48,110 +91,440 @@ class MedicalChatbot:
         Keep responses helpful, empathetic, medically responsible, and always explain your reasoning.
         """
         
-    def get_response(self, user_message: str) -> Dict[str, any]:
+        # Rendered once and sent as the model's system instruction
+        self.prompt_builder = PromptBuilder(
+            self.system_prompt,
+            closing_instruction="Use the TRIAGE, SYMPTOM PATTERNS and any CONVERSATION context for the USER QUERY and follow the response structure above."
+        )
+        
+    @property
+    def safety_system(self) -> MedicalSafety:
+        return self.knowledge_base.engines.safety
+    
+    @property
+    def symptom_checker(self) -> SymptomChecker:
+        return self.knowledge_base.engines.checker
+    
+    @property
+    def text_analyzer(self) -> TextAnalyzer:
+        return self.knowledge_base.engines.analyzer
+    
+    def get_response(self, user_message: str, use_cache: bool = True,
+                     deadline: Optional[float] = None, session_id: Optional[str] = None,
+                     client_id: Optional[str] = None) -> ChatResult:
         """
         Get comprehensive response from the medical chatbot with safety checks.
         
         Args:
             user_message (str): User's medical query
+            use_cache (bool): Serve and store non-emergency answers in the response cache
+                and the near-duplicate answer index
+            deadline (float): time.monotonic() by which the model must answer; when it
+                passes or the circuit breaker is open, a triage-only answer is returned
+            session_id (str): Conversation to continue; earlier turns are added to the prompt
+                and this turn is recorded (requires a session store)
+            client_id (str): Caller identity for the per-client rate limit (non-emergencies only)
             
         Returns:
-            Dict: Comprehensive response with safety information, analysis, and recommendations
+            ChatResult: Comprehensive response with safety information, analysis, and recommendations
+            
+        Raises:
+            AdmissionRejected: The model call could not be scheduled under current load
+            RateLimited: The client or the host-wide model-call quota is over its limit
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
+        urgency = 'unknown'
+        # One knowledge base snapshot for the whole request, even if a reload lands mid-way
+        engines = self.knowledge_base.engines
         
         try:
             # Step 1: Safety and triage assessment
-            triage_result = self.safety_system.assess_urgency(user_message)
+            with timed('text_analysis'):
+                analysis = engines.analyzer.analyze(user_message)
+            with timed('assess_urgency'):
+                triage_result = engines.safety.assess_urgency_from(analysis)
+            urgency = triage_result.urgency.value
             
             # Step 2: Handle emergencies immediately
             if triage_result.urgency == UrgencyLevel.EMERGENCY:
-                emergency_response = self.safety_system.get_emergency_response(triage_result)
-                return {
-                    'response': emergency_response,
-                    'urgency': triage_result.urgency.value,
-                    'risk_level': triage_result.risk.value,
-                    'confidence': triage_result.confidence,
-                    'reasoning': triage_result.reasoning,
-                    'emergency': True,
-                    'response_time': round(time.time() - start_time, 2),
-                    'safety_override': True
-                }
+                emergency_response = engines.safety.get_emergency_response(triage_result)
+                self._remember_turn(session_id, user_message, emergency_response, triage_result, analysis)
+                elapsed = time.perf_counter() - start_time
+                record_request(urgency, 'emergency', elapsed)
+                return ChatResult(
+                    response=emergency_response,
+                    urgency=urgency,
+                    risk_level=triage_result.risk.value,
+                    confidence=triage_result.confidence,
+                    reasoning=triage_result.reasoning,
+                    response_time=round(elapsed, 2),
+                    kb_version=engines.version,
+                    emergency=True
+                )
             
-            # Step 3: Symptom analysis for non-emergency cases
-            symptom_analysis = self.symptom_checker.analyze_symptoms(user_message)
-            symptom_explanation = self.symptom_checker.generate_explanation(symptom_analysis)
+            self._check_client(client_id)
             
-            # Step 4: Generate AI response with enhanced context
-            enhanced_prompt = f"""
-            {self.system_prompt}
+            # Step 3: Symptom analysis for non-emergency cases
+            with timed('analyze_symptoms'):
+                symptom_analysis = engines.checker.analyze_symptoms_from(analysis)
             
-            TRIAGE INFORMATION:
-            - Urgency Level: {triage_result.urgency.value}
-            - Risk Level: {triage_result.risk.value}
-            - Recommended Action: {triage_result.action_required}
+            # Answers that depend on earlier turns are neither cached nor shared
+            history = self._session_context(session_id)
             
-            SYMPTOM ANALYSIS:
-            {symptom_explanation if symptom_analysis['possible_conditions'] else 'No specific symptom patterns identified.'}
+            # Serve repeated questions from the cache when possible
+            request_key = self._request_key(analysis, triage_result, symptom_analysis, engines.version)
+            use_similar = use_cache and self.similar_answers is not None and not history
+            use_cache = use_cache and self.response_cache is not None and not history
+            ai_response = self.response_cache.get(request_key) if use_cache else None
+            cached = ai_response is not None
             
-            USER QUERY: {user_message}
+            # Then paraphrases of questions answered under the same triage outcome
+            similarity = None
+            if use_similar:
+                features = shingles(analysis.normalized, analysis.terms('symptom'))
+                if not cached:
+                    with timed('similar_lookup'):
+                        similar = self.similar_answers.lookup(request_key[1:], features)
+                    if similar is not None:
+                        ai_response, similarity = similar
+                        cached = True
+                        if use_cache:
+                            self.response_cache.set(request_key, ai_response)
             
-            Please provide a comprehensive response following the response structure outlined above.
-            """
+            # Steps 4-5: Generate AI response with enhanced context
+            prompt_tokens = None
+            coalesced = False
+            degraded = False
+            if not cached:
+                generate = partial(self._generate_answer, engines, user_message, triage_result, symptom_analysis,
+                                   deadline, history)
+                try:
+                    if self.single_flight is not None and not history:
+                        # Identical concurrent queries share one model call
+                        (ai_response, prompt_tokens), coalesced = self.single_flight.do(request_key, generate)
+                        if coalesced:
+                            prompt_tokens = None
+                    else:
+                        ai_response, prompt_tokens = generate()
+                except (ModelUnavailable, CoalescedWaitTimeout) as e:
+                    # Upstream is slow or failing, or the shared call outlasted our wait:
+                    # answer from triage alone
+                    logger.warning("Serving triage-only answer: %s", e)
+                    ai_response = self._triage_only_answer(engines, triage_result, symptom_analysis)
+                    degraded = True
+                if use_cache and not coalesced and not degraded:
+                    self.response_cache.set(request_key, ai_response)
+                if use_similar and not coalesced and not degraded:
+                    self.similar_answers.add(request_key[1:], features, ai_response)
+            self._remember_turn(session_id, user_message, ai_response, triage_result, analysis, symptom_analysis)
             
-            # Generate content with enhanced prompt
-            response = self.model.generate_content(enhanced_prompt)
-            ai_response = response.text
+            # Step 6: Compile comprehensive response
+            elapsed = time.perf_counter() - start_time
+            outcome = ('similar' if similarity is not None else 'cached' if cached
+                       else 'degraded' if degraded else 'success')
+            record_request(urgency, outcome, elapsed)
+            response_time = round(elapsed, 6 if cached else 2)
             
-            # Step 5: Add urgent care warning if needed
-            if triage_result.urgency == UrgencyLevel.URGENT:
-                urgent_warning = self.safety_system.get_emergency_response(triage_result)
-                ai_response = urgent_warning + "\n\n" + ai_response
+            return ChatResult(
+                response=ai_response,
+                urgency=urgency,
+                risk_level=triage_result.risk.value,
+                confidence=triage_result.confidence,
+                reasoning=triage_result.reasoning,
+                response_time=response_time,
+                kb_version=engines.version,
+                symptom_analysis=symptom_analysis,
+                disclaimers=DISCLAIMERS[triage_result.urgency],
+                recommendations=triage_result.action_required,
+                cached=cached,
+                similarity=similarity,
+                coalesced=coalesced,
+                degraded=degraded,
+                prompt_tokens=prompt_tokens
+            )
             
-            # Step 6: Compile comprehensive response
-            response_time = round(time.time() - start_time, 2)
+        except AdmissionRejected:
+            record_request(urgency, 'rejected', time.perf_counter() - start_time)
+            raise
+        except RateLimited:
+            record_request(urgency, 'rate_limited', time.perf_counter() - start_time)
+            raise
+        except Exception as e:
+            logger.error("Error getting chatbot response: %s", e)
+            elapsed = time.perf_counter() - start_time
+            record_request(urgency, 'error', elapsed)
+            return ChatResult(
+                response=ERROR_RESPONSE,
+                urgency='unknown',
+                risk_level='unknown',
+                confidence=0.0,
+                reasoning=f"System error: {str(e)}",
+                response_time=round(elapsed, 2),
+                error=True
+            )
+    
+    def _generate_answer(self, engines: TriageEngines, user_message: str, triage_result: TriageResult,
+                         symptom_analysis: Dict, deadline: Optional[float] = None,
+                         history: str = '') -> Tuple[str, Dict[str, int]]:
+        """Call the model with triage, symptom and conversation context; return the answer and prompt token estimate."""
+        prompt = self._build_prompt(user_message, triage_result, symptom_analysis, history)
+        
+        # Generate content with the compact prompt
+        call = partial(self.backend.generate, prompt.user, system_instruction=prompt.system)
+        with self._model_slot(triage_result.urgency), timed('model_call'):
+            # Charged once admitted, so a rejected request keeps its share of the quota
+            self._acquire_model_quota()
+            ai_response = self.model_guard.call(call, deadline) if self.model_guard is not None else call()
+        
+        # Step 5: Add urgent care warning if needed
+        if triage_result.urgency == UrgencyLevel.URGENT:
+            urgent_warning = engines.safety.get_emergency_response(triage_result)
+            ai_response = urgent_warning + "\n\n" + ai_response
+        
+        return ai_response, prompt.token_estimate
+    
+    def _triage_only_answer(self, engines: TriageEngines, triage_result: TriageResult, symptom_analysis: Dict) -> str:
+        """Answer built from triage and symptom analysis alone, used when the model is unavailable."""
+        parts = []
+        if triage_result.urgency == UrgencyLevel.URGENT:
+            parts.append(engines.safety.get_emergency_response(triage_result))
+        parts.append(
+            "Our AI assistant is temporarily unavailable, so this answer is based on automated triage only.\n\n"
+            f"**Recommended next step:** {triage_result.action_required}"
+        )
+        if symptom_analysis['possible_conditions']:
+            parts.append(engines.checker.generate_explanation(symptom_analysis))
+        return "\n\n".join(parts)
+    
+    def _model_slot(self, urgency: UrgencyLevel):
+        """Admission slot for a model call, or a no-op without admission control."""
+        if self.admission is None:
+            return nullcontext()
+        return self.admission.slot(urgency)
+    
+    def _check_client(self, client_id: Optional[str]) -> None:
+        """Count a non-emergency request against its client's rate limit."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.check_client(client_id)
+    
+    def _acquire_model_quota(self) -> None:
+        """Count a model call against the host-wide quota; cache hits never get here."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire_model()
+    
+    def _session_context(self, session_id: Optional[str]) -> str:
+        """Prompt context from earlier turns of the session, or '' without one."""
+        if session_id is None or self.sessions is None:
+            return ''
+        return self.sessions.context(session_id)
+    
+    def _remember_turn(self, session_id: Optional[str], user_message: str, reply: str,
+                       triage_result: TriageResult, analysis: MessageAnalysis,
+                       symptom_analysis: Optional[Dict] = None) -> None:
+        """Record the exchange and its triage-relevant facts in the session."""
+        if session_id is None or self.sessions is None:
+            return
+        symptoms = analysis.terms('emergency') + analysis.terms('urgent') + analysis.terms('symptom')
+        conditions = [c['condition'] for c in symptom_analysis['possible_conditions']] if symptom_analysis else []
+        self.sessions.record(session_id, user_message, reply, triage_result.urgency.value,
+                             symptoms=symptoms, conditions=conditions)
+    
+    def _build_prompt(self, user_message: str, triage_result: TriageResult, symptom_analysis: Dict,
+                      history: str = '') -> Prompt:
+        """Step 4: Build the compact prompt and record its estimated size."""
+        with timed('prompt_assembly'):
+            prompt = self.prompt_builder.build(user_message, triage_result, symptom_analysis, history)
+        PROMPT_TOKENS.labels('system').inc(prompt.system_tokens)
+        PROMPT_TOKENS.labels('user').inc(prompt.user_tokens)
+        return prompt
+    
+    def stream_response(self, user_message: str, use_cache: bool = True, deadline: Optional[float] = None,
+                        session_id: Optional[str] = None,
+                        client_id: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Stream a chat response as a sequence of events.
+        
+        The first event carries triage metadata (and the full answer for
+        emergencies, which never call the model). Model output follows as
+        ``chunk`` events and a final ``done`` event carries disclaimers and timing.
+        
+        Args:
+            user_message (str): User's medical query
+            use_cache (bool): Serve and store non-emergency answers in the response cache
+            deadline (float): time.monotonic() by which the model must finish streaming
+            session_id (str): Conversation to continue, as in get_response
+            client_id (str): Caller identity for the per-client rate limit, as in get_response
             
-            return {
-                'response': ai_response,
+        Yields:
+            Tuple[str, Dict]: Event name and its JSON-serializable payload
+        """
+        start_time = time.perf_counter()
+        urgency = 'unknown'
+        engines = self.knowledge_base.engines
+        
+        try:
+            with timed('text_analysis'):
+                analysis = engines.analyzer.analyze(user_message)
+            with timed('assess_urgency'):
+                triage_result = engines.safety.assess_urgency_from(analysis)
+            urgency = triage_result.urgency.value
+            metadata = {
                 'urgency': triage_result.urgency.value,
                 'risk_level': triage_result.risk.value,
                 'confidence': triage_result.confidence,
                 'reasoning': triage_result.reasoning,
-                'symptom_analysis': symptom_analysis,
-                'response_time': response_time,
-                'emergency': False,
-                'disclaimers': self._get_disclaimers(triage_result.urgency),
-                'recommendations': triage_result.action_required
+                'emergency': triage_result.urgency == UrgencyLevel.EMERGENCY,
+                'kb_version': engines.version
+            }
+            
+            # Emergencies flush the complete answer in the first event
+            if metadata['emergency']:
+                metadata['response'] = engines.safety.get_emergency_response(triage_result)
+                metadata['safety_override'] = True
+                self._remember_turn(session_id, user_message, metadata['response'], triage_result, analysis)
+                elapsed = time.perf_counter() - start_time
+                record_request(urgency, 'emergency', elapsed)
+                yield 'triage', metadata
+                yield 'done', {'response_time': round(elapsed, 2), 'status': 'emergency'}
+                return
+            
+            self._check_client(client_id)
+            with timed('analyze_symptoms'):
+                symptom_analysis = engines.checker.analyze_symptoms_from(analysis)
+            metadata['recommendations'] = triage_result.action_required
+            if symptom_analysis['possible_conditions']:
+                metadata['symptom_analysis'] = symptom_analysis
+            yield 'triage', metadata
+            
+            history = self._session_context(session_id)
+            cache_key = None
+            ai_response = None
+            if use_cache and self.response_cache is not None and not history:
+                cache_key = self._request_key(analysis, triage_result, symptom_analysis, engines.version)
+                ai_response = self.response_cache.get(cache_key)
+            cached = ai_response is not None
+            
+            prompt_tokens = None
+            degraded = False
+            if cached:
+                yield 'chunk', {'text': ai_response}
+            else:
+                prompt = self._build_prompt(user_message, triage_result, symptom_analysis, history)
+                prompt_tokens = prompt.token_estimate
+                parts = []
+                try:
+                    yield from self._stream_model(engines, prompt, triage_result, deadline, parts)
+                except CircuitOpen as e:
+                    # Raised before any chunk is sent: answer from triage alone
+                    logger.warning("Serving triage-only answer: %s", e)
+                    degraded = True
+                    ai_response = self._triage_only_answer(engines, triage_result, symptom_analysis)
+                    yield 'chunk', {'text': ai_response}
+                
+                if not degraded:
+                    ai_response = ''.join(parts)
+                    if cache_key is not None:
+                        self.response_cache.set(cache_key, ai_response)
+            self._remember_turn(session_id, user_message, ai_response, triage_result, analysis, symptom_analysis)
+            
+            elapsed = time.perf_counter() - start_time
+            outcome = 'cached' if cached else 'degraded' if degraded else 'success'
+            record_request(urgency, outcome, elapsed)
+            yield 'done', {
+                'response_time': round(elapsed, 6 if cached else 2),
+                'disclaimers': DISCLAIMERS[triage_result.urgency],
+                'cached': cached,
+                'prompt_tokens': prompt_tokens,
+                'status': 'degraded' if degraded else 'success'
             }
             
+        except DeadlineExceeded as e:
+            logger.warning("Chat stream cut off: %s", e)
+            elapsed = time.perf_counter() - start_time
+            record_request(urgency, 'timeout', elapsed)
+            yield 'error', {
+                'error': 'The response took too long and was cut off. Please try again shortly.',
+                'response_time': round(elapsed, 2),
+                'status': 'timeout'
+            }
+        except AdmissionRejected as e:
+            record_request(urgency, 'rejected', time.perf_counter() - start_time)
+            yield 'error', {
+                'error': 'The service is busy. Please try again shortly.',
+                'retry_after': e.retry_after,
+                'status': 'busy'
+            }
+        except RateLimited as e:
+            record_request(urgency, 'rate_limited', time.perf_counter() - start_time)
+            yield 'error', {
+                'error': 'Too many requests. Please try again shortly.',
+                'retry_after': e.retry_after,
+                'status': 'rate_limited'
+            }
         except Exception as e:
-            logging.error(f"Error getting chatbot response: {str(e)}")
-            error_time = round(time.time() - start_time, 2)
-            return {
-                'response': "I apologize, but I'm experiencing technical difficulties. Please try again later or consult with a healthcare professional for your medical concerns.",
-                'urgency': 'unknown',
-                'risk_level': 'unknown',
-                'confidence': 0.0,
-                'reasoning': f"System error: {str(e)}",
-                'emergency': False,
-                'error': True,
-                'response_time': error_time
+            logger.error("Error streaming chatbot response: %s", e)
+            elapsed = time.perf_counter() - start_time
+            record_request(urgency, 'error', elapsed)
+            yield 'error', {
+                'error': ERROR_RESPONSE,
+                'response_time': round(elapsed, 2),
+                'status': 'error'
             }
     
-    def _get_disclaimers(self, urgency: UrgencyLevel) -> List[str]:
-        """Get appropriate disclaimers based on urgency level."""
-        base_disclaimers = [
-            "This AI assistant provides general health information only and is not a substitute for professional medical advice, diagnosis, or treatment.",
-            "Always seek the advice of your physician or other qualified health provider with any questions you may have regarding a medical condition.",
-            "Never disregard professional medical advice or delay seeking it because of something you have read here."
-        ]
-        
-        if urgency == UrgencyLevel.URGENT:
-            base_disclaimers.insert(0, "⚠️ Your symptoms may require prompt medical attention. Please contact your healthcare provider.")
+    def _stream_model(self, engines: TriageEngines, prompt: Prompt, triage_result: TriageResult,
+                      deadline: Optional[float], parts: List[str]) -> Iterator[Tuple[str, Dict]]:
+        """Stream the urgent warning and model chunks into ``parts``, enforcing the deadline on every chunk."""
+        guard = self.model_guard
+        with self._model_slot(triage_result.urgency), timed('model_call'):
+            # Before check(), which may claim the breaker's half-open trial
+            self._acquire_model_quota()
+            if guard is not None:
+                guard.check()
+                if deadline is None:
+                    deadline = time.monotonic() + guard.default_timeout
+            
+            if triage_result.urgency == UrgencyLevel.URGENT:
+                urgent_warning = engines.safety.get_emergency_response(triage_result) + "\n\n"
+                parts.append(urgent_warning)
+                yield 'chunk', {'text': urgent_warning}
+            
+            start = time.monotonic()
+            chunks = self.backend.stream(prompt.user, system_instruction=prompt.system)
+            if guard is not None:
+                # Each chunk, the first included, is awaited for at most the time left
+                chunks = guard.iterate(chunks, deadline)
+            try:
+                for text in chunks:
+                    parts.append(text)
+                    yield 'chunk', {'text': text}
+            except GeneratorExit:
+                # Client went away mid-stream; no verdict on upstream health
+                if guard is not None:
+                    guard.breaker.release_trial()
+                raise
+            except DeadlineExceeded:
+                guard.record_timeout()
+                raise
+            except Exception:
+                if guard is not None:
+                    guard.record_failure()
+                raise
+            if guard is not None:
+                guard.record_success(time.monotonic() - start)
+    
+    def _request_key(self, analysis: MessageAnalysis, triage_result: TriageResult, symptom_analysis: Dict,
+                     kb_version: str) -> tuple:
+        """
+        Build a response cache key from the normalized message, analysis outcome and knowledge base version.
         
-        return base_disclaimers
+        Everything after the message (urgency, matched conditions, version) also
+        partitions the near-duplicate answer index.
+        """
+        conditions = tuple(c['condition'] for c in symptom_analysis['possible_conditions'])
+        return (analysis.cache_text, triage_result.urgency.value, conditions, kb_version)
     
-    def get_health_tips(self) -> List[str]:
+    @staticmethod
+    def get_health_tips() -> List[str]:
         """Get general health tips."""
         tips = [
             "Stay hydrated by drinking at least 8 glasses of water daily",
@@ -0,0 +1,103 @@
+"""
+Request Coalescing
+Single-flight execution: concurrent callers with the same key share one
+in-flight model call instead of each issuing their own.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class CoalescedWaitTimeout(Exception):
+    """Raised when a follower gives up waiting for the in-flight call."""
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'followers')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self, wait_timeout: float = 30.0):
+        """
+        Args:
+            wait_timeout (float): Seconds a follower waits for the leader's result
+        """
+        self.wait_timeout = wait_timeout
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+        self.leaders = 0
+        self.followers = 0
+        self.follower_timeouts = 0
+        self.errors = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` once per key among concurrent callers.
+
+        Args:
+            key (Hashable): Identity of the work, e.g. normalized message and triage outcome
+            fn (Callable): Work to run if no identical call is in flight
+
+        Returns:
+            Tuple[Any, bool]: The result and whether it was shared from another caller
+
+        Raises:
+            CoalescedWaitTimeout: A follower waited longer than ``wait_timeout``
+            Exception: Whatever the leader's call raised, re-raised in every waiter
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+                leader = True
+            else:
+                call.followers += 1
+                self.followers += 1
+                leader = False
+
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                with self._lock:
+                    self.follower_timeouts += 1
+                raise CoalescedWaitTimeout(f"Timed out after {self.wait_timeout}s waiting for identical request")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            # Unregister before waking followers so later callers start a fresh call
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        return call.result, False
+
+    def stats(self) -> Dict[str, int]:
+        """Get leader/follower counters and the number of model calls saved."""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'leaders': self.leaders,
+                'followers': self.followers,
+                'calls_saved': self.followers - self.follower_timeouts,
+                'follower_timeouts': self.follower_timeouts,
+                'errors': self.errors
+            }
@@ -0,0 +1,273 @@
+"""
+Typo-Tolerant Keyword Matching
+A precomputed deletion index (SymSpell-style) over the words of a keyword
+vocabulary, used to find misspelled keyword phrases such as "chest pian"
+among the message tokens that exact matching left uncovered.
+"""
+
+import functools
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+_WORD = re.compile(r"[\w']+")
+
+# Tokens shorter than this are only ever matched exactly
+MIN_FUZZY_LENGTH = 4
+
+# Shorter keyword words only match a misspelling with a missing or swapped letter: a
+# substituted or extra one too often spells another word ("rain", "bond", "plain")
+MIN_SUBSTITUTION_LENGTH = 6
+
+# Everyday words within edit distance of an emergency keyword word; never treated as typos
+COMMON_WORDS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'common_words.txt')
+
+# Distinct message tokens whose fuzzy lookups are memoized per index
+MEMO_SIZE = 65536
+
+
+def max_word_distance(word: str) -> int:
+    """Edit distance tolerated for a single word of this length."""
+    if len(word) < MIN_FUZZY_LENGTH:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (insertions, deletions, substitutions and
+    adjacent transpositions), or ``limit + 1`` once it is known to exceed ``limit``.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+@functools.lru_cache(maxsize=1)
+def common_words() -> frozenset:
+    """The packaged list of real words that are only ever matched exactly (parsed once per process)."""
+    with open(COMMON_WORDS_PATH, encoding='utf-8') as f:
+        return frozenset(line.strip() for line in f if line.strip() and not line.startswith('#'))
+
+
+def _is_substitution(a: str, b: str) -> bool:
+    """Whether same-length words differ only by substituted characters (no transposition)."""
+    if len(a) != len(b):
+        return False
+    diffs = [i for i in range(len(a)) if a[i] != b[i]]
+    return not (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]])
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """Every string reachable from ``word`` by deleting up to ``distance`` characters."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+def normalize_words(text: str) -> List[Tuple[str, int, int]]:
+    """Lowercase word tokens with apostrophes removed ("can't" -> "cant"), with their spans."""
+    return [(m.group().replace("'", ''), m.start(), m.end())
+            for m in _WORD.finditer(text.lower()) if m.group().strip("'")]
+
+
+@dataclass(frozen=True)
+class FuzzyMatch:
+    """A keyword phrase found with bounded spelling errors."""
+    keyword: str
+    index: int  # Position of the keyword in the vocabulary
+    matched_text: str
+    start: int
+    end: int
+    distance: int  # Total edit distance over the phrase's words
+
+
+class FuzzyPhraseIndex:
+    """Finds keyword phrases whose words are within a small edit distance of message tokens."""
+
+    def __init__(self, keywords: Iterable[str], max_phrase_distance: int = 2,
+                 known_words: Optional[Iterable[str]] = None):
+        """
+        Precompute the deletion index over the vocabulary's words.
+
+        Args:
+            keywords (Iterable[str]): Keyword phrases, e.g. the emergency tier
+            max_phrase_distance (int): Total edit distance tolerated across a phrase
+            known_words (Iterable[str]): Correctly spelled words that are never read as
+                misspellings; defaults to the packaged common word list
+        """
+        self.keywords = list(keywords)
+        self.max_phrase_distance = max_phrase_distance
+        self.known_words = frozenset(known_words) if known_words is not None else common_words()
+
+        self._phrases: List[Tuple[str, ...]] = []
+        self._by_first_word: Dict[str, List[int]] = {}
+        self._deletes: Dict[str, Set[str]] = {}
+
+        for index, keyword in enumerate(self.keywords):
+            words = tuple(word for word, _, _ in normalize_words(keyword))
+            self._phrases.append(words)
+            if not words:
+                continue
+            self._by_first_word.setdefault(words[0], []).append(index)
+            for word in words:
+                for variant in _deletes(word, max_word_distance(word)):
+                    self._deletes.setdefault(variant, set()).add(word)
+
+        self._vocabulary = {word for words in self._phrases for word in words}
+        self._phrase_starts = {words[0] for words in self._phrases if len(words) > 1}
+        self._max_words = max((len(words) for words in self._phrases), default=1)
+        # Message vocabularies are heavily skewed, so most lookups hit these memos
+        self._memo: Dict[str, Dict[str, int]] = {}
+        self._chunk_memo: Dict[str, bool] = {}
+
+    def _word_candidates(self, token: str, fuzzy: bool) -> Dict[str, int]:
+        """Vocabulary words equal to ``token`` or, if ``fuzzy``, within their tolerated distance of it."""
+        if not fuzzy:
+            return {token: 0} if token in self._vocabulary else {}
+        found = self._memo.get(token)
+        if found is not None:
+            return found
+        found = {}
+        if token in self._vocabulary:
+            found[token] = 0
+        if len(token) >= MIN_FUZZY_LENGTH and token not in self.known_words:
+            seen = set()
+            for variant in _deletes(token, 2 if len(token) >= 8 else 1):
+                for word in self._deletes.get(variant, ()):
+                    if word in seen or word == token:
+                        continue
+                    seen.add(word)
+                    limit = min(max_word_distance(word), max_word_distance(token))
+                    distance = edit_distance(token, word, limit)
+                    if distance <= limit and (len(word) >= MIN_SUBSTITUTION_LENGTH or len(token) < len(word)
+                                              or (len(token) == len(word) and not _is_substitution(token, word))):
+                        found[word] = distance
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        self._memo[token] = found
+        return found
+
+    def find(self, text: str, covered: Sequence[Tuple[int, int]] = ()) -> List[FuzzyMatch]:
+        """
+        Find misspelled keyword phrases in ``text``.
+
+        Only tokens that failed exact matching are looked up fuzzily; tokens
+        inside ``covered`` spans can still complete a phrase, but only as
+        exact words.
+
+        Args:
+            text (str): Message text, lowercased
+            covered (Sequence[Tuple[int, int]]): Spans already explained by exact matches
+
+        Returns:
+            List[FuzzyMatch]: Matches, best (lowest distance) first
+        """
+        chunks = text.split()
+        flagged = [i for i, chunk in enumerate(chunks) if self._chunk_flagged(chunk)]
+        if not flagged:
+            return []
+
+        # Every match overlaps a flagged chunk, so only the few chunks around
+        # each one are tokenized with offsets
+        span = self._max_words - 1
+        offsets = []
+        position = 0
+        for chunk in chunks[:flagged[-1] + span + 1]:
+            position = text.index(chunk, position)
+            offsets.append(position)
+            position += len(chunk)
+
+        best: Dict[int, FuzzyMatch] = {}
+        for flagged_chunk in flagged:
+            tokens = []
+            for i in range(max(0, flagged_chunk - span), min(flagged_chunk + span + 1, len(offsets))):
+                for m in _WORD.finditer(chunks[i]):
+                    word = m.group().replace("'", '')
+                    if not word:
+                        continue
+                    start, end = offsets[i] + m.start(), offsets[i] + m.end()
+                    fuzzy = not any(start < c_end and c_start < end for c_start, c_end in covered)
+                    tokens.append((word, start, end, fuzzy, i <= flagged_chunk))
+
+            for position, (token, start, _, fuzzy, may_start) in enumerate(tokens):
+                if not may_start:
+                    break
+                for first_word, first_distance in self._word_candidates(token, fuzzy).items():
+                    for index in self._by_first_word.get(first_word, ()):
+                        match = self._match_phrase(index, tokens, position, first_distance, text, start)
+                        if match is not None and (index not in best or match.distance < best[index].distance):
+                            best[index] = match
+
+        return sorted(best.values(), key=lambda m: (m.distance, m.index))
+
+    def _chunk_flagged(self, chunk: str) -> bool:
+        """
+        Cheap pre-check of one whitespace-separated chunk: could a match overlap it?
+
+        Space-separated exact phrases were already found by exact matching,
+        so only near-misses, apostrophes and phrases joined by punctuation
+        (e.g. "chest-pain") need a closer look.
+        """
+        flagged = self._chunk_memo.get(chunk)
+        if flagged is None:
+            words = _WORD.findall(chunk)
+            flagged = "'" in chunk or any(
+                distance or (len(words) > 1 and candidate in self._phrase_starts)
+                for word in words
+                for candidate, distance in self._word_candidates(word, True).items())
+            if len(self._chunk_memo) >= MEMO_SIZE:
+                self._chunk_memo.clear()
+            self._chunk_memo[chunk] = flagged
+        return flagged
+
+    def _match_phrase(self, index: int, tokens: List[Tuple[str, int, int, bool, bool]], position: int,
+                      distance: int, text: str, start: int) -> Optional[FuzzyMatch]:
+        words = self._phrases[index]
+        if position + len(words) > len(tokens):
+            return None
+        for offset in range(1, len(words)):
+            token, _, _, fuzzy, _ = tokens[position + offset]
+            word_distance = self._word_candidates(token, fuzzy).get(words[offset])
+            if word_distance is None:
+                return None
+            distance += word_distance
+        if distance > self.max_phrase_distance:
+            return None
+
+        end = tokens[position + len(words) - 1][2]
+        if len(words) == 1 and distance:
+            # Lone words are riskier ("cooking" vs "choking"): require a long word and a
+            # dropped, extra or swapped letter rather than a substituted one
+            token = tokens[position][0]
+            if distance > 1 or len(words[0]) < MIN_SUBSTITUTION_LENGTH or _is_substitution(token, words[0]):
+                return None
+        return FuzzyMatch(
+            keyword=self.keywords[index],
+            index=index,
+            matched_text=text[start:end],
+            start=start,
+            end=end,
+            distance=distance
+        )
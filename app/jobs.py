@@ -0,0 +1,186 @@
+"""
+Chat Jobs
+Asynchronous chat generations: requests are triaged and answered with a job
+id right away, a bounded worker pool runs the model calls, and clients
+long-poll for the result. Finished jobs are kept for a TTL, and at most
+``max_finished`` of them at once.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already waiting or running."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Chat job queue is full")
+        self.retry_after = retry_after
+
+
+class Job:
+    """One submitted generation; ``result`` is set once ``finished`` is."""
+
+    __slots__ = ('job_id', 'state', 'result', 'created', 'finished_at', 'finished')
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.state = QUEUED
+        self.result: Any = None
+        self.created = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.finished = threading.Event()
+
+    def info(self) -> Dict[str, Any]:
+        """JSON-serializable job status, with the result once finished."""
+        info = {'job_id': self.job_id, 'state': self.state}
+        if self.finished.is_set():
+            info['result'] = self.result
+        return info
+
+
+class ChatJobQueue:
+    """Bounded pool of background chat generations with TTL-based cleanup."""
+
+    def __init__(self, max_workers: int = 32, max_pending: int = 500, ttl: float = 300.0,
+                 max_wait: float = 30.0, retry_after: int = 5, max_finished: int = 5000):
+        """
+        Args:
+            max_workers (int): Generations run at once (model calls still go through admission control)
+            max_pending (int): Queued plus running jobs before submissions are rejected
+            ttl (float): Seconds a finished job's result stays available
+            max_wait (float): Longest long-poll a client may request
+            retry_after (int): Retry-After seconds suggested to rejected clients
+            max_finished (int): Finished jobs kept before the oldest are dropped ahead of their TTL
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.max_finished = max_finished
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='chat-job')
+        self._jobs: Dict[str, Job] = {}
+        # Finish order, so the sweep never waits behind a long-running job
+        self._finished: "OrderedDict[str, Job]" = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def submit(self, fn: Callable[[], Any], on_error: Callable[[Exception], Any]) -> Job:
+        """
+        Queue ``fn`` to run in the worker pool.
+
+        Args:
+            fn (Callable): Produces the job result
+            on_error (Callable): Turns an exception raised by ``fn`` into the failed job's result
+
+        Raises:
+            JobQueueFull: ``max_pending`` jobs are already queued or running
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise JobQueueFull(self.retry_after)
+            job = Job(secrets.token_urlsafe(12))
+            self._jobs[job.job_id] = job
+            self._pending += 1
+            self.submitted += 1
+        self._executor.submit(self._run, job, fn, on_error)
+        return job
+
+    def complete(self, result: Any) -> Job:
+        """Record a job that finished synchronously, e.g. an emergency answered without the model."""
+        job = Job(secrets.token_urlsafe(12))
+        job.state, job.result = DONE, result
+        job.finished.set()
+        with self._lock:
+            self._expire(time.monotonic())
+            self._jobs[job.job_id] = job
+            self._finish(job)
+            self.submitted += 1
+            self.completed += 1
+        return job
+
+    def _run(self, job: Job, fn: Callable[[], Any], on_error: Callable[[Exception], Any]) -> None:
+        job.state = RUNNING
+        try:
+            result, state = fn(), DONE
+        except Exception as e:
+            result, state = on_error(e), FAILED
+        with self._lock:
+            job.result, job.state = result, state
+            self._finish(job)
+            self._pending -= 1
+            if state == DONE:
+                self.completed += 1
+            else:
+                self.failed += 1
+        job.finished.set()
+
+    def get(self, job_id: str, wait: float = 0.0) -> Optional[Job]:
+        """
+        Look up a job, waiting up to ``wait`` seconds (capped at ``max_wait``) for it to finish.
+
+        Returns:
+            Optional[Job]: The job, or None if it is unknown or expired
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            job = self._jobs.get(job_id)
+        if job is not None and wait > 0:
+            job.finished.wait(min(wait, self.max_wait))
+        return job
+
+    def _finish(self, job: Job) -> None:
+        # Unfinished jobs are bounded by max_pending, finished ones here
+        job.finished_at = time.monotonic()
+        self._finished[job.job_id] = job
+        while len(self._finished) > self.max_finished:
+            _, evicted = self._finished.popitem(last=False)
+            del self._jobs[evicted.job_id]
+            self.evicted += 1
+
+    def _expire(self, now: float) -> None:
+        # Oldest finished first, so the sweep stops at the first job still within its TTL
+        while self._finished:
+            job = next(iter(self._finished.values()))
+            if now - job.finished_at < self.ttl:
+                break
+            self._finished.popitem(last=False)
+            del self._jobs[job.job_id]
+            self.expired += 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Get job counts and queue occupancy."""
+        with self._lock:
+            return {
+                'jobs': len(self._jobs),
+                'pending': self._pending,
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'completed': self.completed,
+                'failed': self.failed,
+                'expired': self.expired,
+                'evicted': self.evicted
+            }
@@ -0,0 +1,222 @@
+"""
+Triage Knowledge Base
+Keyword tiers and symptom patterns loaded from versioned JSON data files,
+compiled into immutable triage engines that can be hot-reloaded and swapped
+in atomically while requests are in flight.
+"""
+
+import copy
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from .metrics import KB_RELOADS
+from .text_analysis import TextAnalyzer
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_TIERS = ('emergency_keywords', 'urgent_keywords', 'routine_keywords')
+
+# Knowledge base shipped with the application
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), 'data', 'knowledge_base.json')
+
+
+@dataclass(frozen=True)
+class KnowledgeBase:
+    """Keyword tiers and symptom patterns that drive triage."""
+    version: str
+    emergency_keywords: Tuple[str, ...]
+    urgent_keywords: Tuple[str, ...]
+    routine_keywords: Tuple[str, ...]
+    symptom_patterns: Dict
+
+    @classmethod
+    def builtin(cls) -> 'KnowledgeBase':
+        """The packaged knowledge base (parsed once per process)."""
+        return _load_builtin()
+
+    @classmethod
+    def from_dict(cls, data: Dict, default_version: str = None) -> 'KnowledgeBase':
+        """
+        Build a knowledge base from parsed JSON.
+
+        Args:
+            data (Dict): ``emergency_keywords``, ``urgent_keywords``, ``routine_keywords``,
+                ``symptom_patterns`` and an optional ``version``
+            default_version (str): Version when ``data`` has none; defaults to a content hash
+
+        Raises:
+            ValueError: A required section is missing or malformed
+        """
+        missing = [key for key in KEYWORD_TIERS + ('symptom_patterns',) if key not in data]
+        if missing:
+            raise ValueError(f"Knowledge base is missing: {', '.join(missing)}")
+        for name, pattern in data['symptom_patterns'].items():
+            if not pattern.get('symptoms') or 'conditions' not in pattern:
+                raise ValueError(f"Symptom pattern '{name}' needs 'symptoms' and 'conditions'")
+
+        version = data.get('version') or default_version
+        if not version:
+            content = json.dumps({key: data[key] for key in KEYWORD_TIERS + ('symptom_patterns',)},
+                                 sort_keys=True)
+            version = 'sha256:' + hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+
+        return cls(
+            version=str(version),
+            emergency_keywords=tuple(data['emergency_keywords']),
+            urgent_keywords=tuple(data['urgent_keywords']),
+            routine_keywords=tuple(data['routine_keywords']),
+            symptom_patterns=copy.deepcopy(data['symptom_patterns'])
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'KnowledgeBase':
+        """Load a knowledge base from a JSON file."""
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def build_engines(self) -> Tuple:
+        """Build a MedicalSafety and SymptomChecker pair over this knowledge base."""
+        from .safety import MedicalSafety, SymptomChecker
+        return MedicalSafety(self), SymptomChecker(self)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_builtin() -> KnowledgeBase:
+    return KnowledgeBase.load(DEFAULT_PATH)
+
+
+@dataclass(frozen=True)
+class TriageEngines:
+    """
+    One consistent snapshot of compiled triage structures.
+
+    Requests read the current snapshot once and use it throughout, so a
+    reload never mixes keyword tiers and symptom patterns of two versions.
+    """
+    knowledge_base: KnowledgeBase
+    safety: object  # MedicalSafety
+    checker: object  # SymptomChecker
+    analyzer: TextAnalyzer
+
+    @property
+    def version(self) -> str:
+        return self.knowledge_base.version
+
+    @classmethod
+    def build(cls, knowledge_base: KnowledgeBase) -> 'TriageEngines':
+        safety, checker = knowledge_base.build_engines()
+        return cls(knowledge_base, safety, checker, TextAnalyzer(safety, checker))
+
+
+class KnowledgeBaseStore:
+    """Holds the active TriageEngines and reloads them when the data file changes."""
+
+    def __init__(self, path: Optional[str] = None, reload_interval: float = 0.0):
+        """
+        Args:
+            path (str): Knowledge base JSON file, defaults to the packaged one
+            reload_interval (float): Seconds between file change checks in a background
+                thread; 0 disables watching (reload() can still be called, e.g. from a signal)
+
+        Raises:
+            OSError, ValueError: The initial knowledge base cannot be loaded
+        """
+        self.path = path or DEFAULT_PATH
+        self.reload_interval = reload_interval
+        self._signature = self._file_signature()
+        knowledge_base = KnowledgeBase.builtin() if self.path == DEFAULT_PATH else KnowledgeBase.load(self.path)
+        self.engines = TriageEngines.build(knowledge_base)
+        self.loaded_at = time.time()
+
+        self.reloads = 0
+        self.failures = 0
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    @property
+    def version(self) -> str:
+        return self.engines.version
+
+    def _file_signature(self) -> Optional[Tuple[float, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Rebuild the engines from the data file and swap them in.
+
+        The new snapshot is fully built before the single attribute swap, so
+        in-flight requests finish on the snapshot they started with. A file
+        that fails to load is logged and the current snapshot stays active.
+
+        Args:
+            force (bool): Reload even if the file looks unchanged
+
+        Returns:
+            bool: Whether a new snapshot was swapped in
+        """
+        with self._reload_lock:
+            signature = self._file_signature()
+            if not force and signature == self._signature:
+                return False
+            try:
+                engines = TriageEngines.build(KnowledgeBase.load(self.path))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self.failures += 1
+                self._signature = signature  # Don't retry a broken file until it changes again
+                KB_RELOADS.labels('failure').inc()
+                logger.error("Knowledge base reload from %s failed, keeping %s: %s", self.path, self.version, e)
+                return False
+
+            previous = self.engines.version
+            self.engines = engines
+            self._signature = signature
+            self.loaded_at = time.time()
+            self.reloads += 1
+            KB_RELOADS.labels('success').inc()
+            logger.info("Knowledge base reloaded: %s -> %s", previous, engines.version)
+            return True
+
+    def start_watching(self) -> None:
+        """Start the file watcher thread if watching is enabled and it is not running."""
+        if self.reload_interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name='kb-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+
+    def after_fork(self) -> None:
+        """Reset locks and restart the watcher in a forked child (threads do not survive fork)."""
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        self.start_watching()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.reload_interval):
+            self.reload()
+
+    def stats(self) -> Dict:
+        """Get the active version and reload counters."""
+        return {
+            'version': self.version,
+            'path': self.path,
+            'loaded_at': self.loaded_at,
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'watching': self._watcher is not None and self._watcher.is_alive()
+        }
@@ -0,0 +1,237 @@
+"""
+Logging Pipeline
+Request threads only decide, format, redact and enqueue log records; a
+background listener thread does the writing. Per-request lines are sampled
+and every level is rate-capped, so logging cost per request stays constant
+however slow the sink is. Dropped records are counted by reason.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+from .metrics import LOG_RECORDS_DROPPED
+
+# Logger for per-request lines, the ones subject to sampling
+REQUEST_LOGGER = 'app.requests'
+
+DEFAULT_FORMAT = '%(levelname)s:%(name)s:%(message)s'
+
+# One alternation, so redaction is a single scan of the formatted message
+_REDACT = re.compile(
+    r'(?P<email>[\w.+-]+@[\w-]+\.[\w.-]+)'
+    r'|(?P<key>AIza[0-9A-Za-z_-]{35})'
+    # Phone numbers: +<country code> with space/dash groups, or North American 3-3-4
+    # digits; never dotted runs such as IP addresses and version strings
+    r'|(?P<phone>(?<![\w.+])(?:\+\d{1,3}[ -](?:\(\d{1,4}\)|\d{1,4})(?:[ -]\d{2,4}){1,4}'
+    r'|(?:\+?1[ .-]?)?(?:\(\d{3}\) ?|\d{3}[ .-])\d{3}[ .-]\d{4})(?!\w|\.\d))'
+    r'|(?P<number>\b\d{6,}\b)'
+)
+
+
+def redact(text: str) -> str:
+    """Mask emails, API keys, phone numbers and long digit runs (IDs, card numbers)."""
+    return _REDACT.sub(lambda m: f'[{m.lastgroup}]', text)
+
+
+def parse_levels(spec: str, cast=float) -> Dict[int, float]:
+    """Parse "INFO=0.1,WARNING=1" into {logging.INFO: 0.1, logging.WARNING: 1.0}."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        name, _, value = item.partition('=')
+        level = logging.getLevelName(name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level: {name}")
+        levels[level] = cast(value)
+    return levels
+
+
+class _RateLimit:
+    """Token bucket allowing ``rate`` records per second with a burst of the same size."""
+
+    __slots__ = ('rate', 'tokens', 'updated', 'lock')
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        with self.lock:
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class SamplingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that drops records before formatting them when they are
+    sampled out, over their level's rate, or the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue, sample_rates: Optional[Dict[int, float]] = None,
+                 rate_limits: Optional[Dict[int, float]] = None):
+        """
+        Args:
+            log_queue (queue.Queue): Bounded queue drained by the writer thread
+            sample_rates (Dict[int, float]): Fraction of per-request records kept, by level
+            rate_limits (Dict[int, float]): Records per second allowed, by level (all loggers)
+        """
+        super().__init__(log_queue)
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = {level: _RateLimit(rate) for level, rate in (rate_limits or {}).items()}
+        self.enqueued = 0
+        self.dropped = {'sampled': 0, 'rate_limited': 0, 'queue_full': 0}
+
+    def _drop(self, reason: str) -> None:
+        self.dropped[reason] += 1
+        LOG_RECORDS_DROPPED.labels(reason).inc()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.name == REQUEST_LOGGER:
+            rate = self.sample_rates.get(record.levelno, 1.0)
+            if rate < 1.0 and random.random() >= rate:
+                self._drop('sampled')
+                return
+        limit = self.rate_limits.get(record.levelno)
+        if limit is not None and not limit.allow():
+            self._drop('rate_limited')
+            return
+        try:
+            # Formatting and redaction happen only for records that will be written
+            self.enqueue(self.prepare(record))
+            self.enqueued += 1
+        except queue.Full:
+            self._drop('queue_full')
+        except Exception:
+            self.handleError(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        record.msg = redact(record.msg)
+        return record
+
+    def stats(self) -> Dict[str, int]:
+        """Get enqueued and dropped record counts and the current backlog."""
+        return {
+            'enqueued': self.enqueued,
+            'queue_depth': self.queue.qsize(),
+            **{f'dropped_{reason}': count for reason, count in self.dropped.items()}
+        }
+
+
+class _Writer(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Request threads never block on a full queue, but shutdown must wait its turn
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    """Root logger wiring: a sampling queue handler in front, a writer thread behind."""
+
+    def __init__(self, level: int = logging.INFO, queue_size: int = 10000,
+                 sample_rates: Optional[Dict[int, float]] = None,
+                 rate_limits: Optional[Dict[int, float]] = None,
+                 sink: Optional[logging.Handler] = None):
+        """
+        Args:
+            level (int): Root logger level
+            queue_size (int): Records buffered for the writer before new ones are dropped
+            sample_rates (Dict[int, float]): Per-level sampling of per-request lines
+            rate_limits (Dict[int, float]): Per-level records-per-second caps
+            sink (logging.Handler): Where the writer thread writes, defaults to stderr
+        """
+        self.level = level
+        self.handler = SamplingQueueHandler(queue.Queue(queue_size), sample_rates, rate_limits)
+        if sink is None:
+            sink = logging.StreamHandler(sys.stderr)
+            sink.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+        self.sink = sink
+        self.listener = None
+
+    def start(self) -> None:
+        """Attach to the root logger and start the writer thread."""
+        root = logging.getLogger()
+        root.setLevel(self.level)
+        if self.handler not in root.handlers:
+            root.addHandler(self.handler)
+        self.listener = _Writer(self.handler.queue, self.sink, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Flush queued records and stop the writer thread."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def after_fork(self) -> None:
+        """Restart the writer in a forked child, where the parent's thread does not exist."""
+        self.handler.queue = queue.Queue(self.handler.queue.maxsize)
+        for limit in self.handler.rate_limits.values():
+            limit.lock = threading.Lock()
+        self.listener = None
+        self.start()
+
+    def stats(self) -> Dict[str, int]:
+        return self.handler.stats()
+
+
+pipeline: Optional[LogPipeline] = None
+
+
+def configure_logging(level: str = 'INFO', queue_size: int = 10000, sample_rates: str = '',
+                      rate_limits: str = '') -> Optional[LogPipeline]:
+    """
+    Install the logging pipeline on the root logger, once per process.
+
+    Like logging.basicConfig, it does nothing if the root logger already has
+    handlers configured elsewhere (e.g. by a test runner).
+
+    Args:
+        level (str): Root log level name
+        queue_size (int): Writer queue capacity
+        sample_rates (str): Per-request sampling, e.g. "INFO=0.1"
+        rate_limits (str): Per-level caps in records per second, e.g. "INFO=50,WARNING=20"
+
+    Returns:
+        Optional[LogPipeline]: The active pipeline, or None if logging was configured elsewhere
+    """
+    global pipeline
+    if pipeline is not None:
+        return pipeline
+    if logging.getLogger().handlers:
+        return None
+    pipeline = LogPipeline(
+        level=logging.getLevelName(level.upper()),
+        queue_size=queue_size,
+        sample_rates=parse_levels(sample_rates),
+        rate_limits=parse_levels(rate_limits)
+    )
+    pipeline.start()
+    atexit.register(pipeline.stop)
+    return pipeline
+
+
+def _restart_after_fork():
+    if pipeline is not None:
+        pipeline.after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
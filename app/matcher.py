@@ -0,0 +1,121 @@
+"""
+Keyword Matching Engine
+Compiles keyword vocabularies into an Aho-Corasick automaton so that every
+keyword of every tier is found in a single pass over the message.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    """A single keyword occurrence found in a message."""
+    tier: str
+    keyword: str
+    index: int  # Position of the keyword in its tier's vocabulary
+    start: int
+    end: int
+    whole_word: bool  # True when both ends fall on word boundaries
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class KeywordMatcher:
+    """Multi-pattern matcher over named keyword tiers (Aho-Corasick)."""
+
+    def __init__(self, tiers: Dict[str, Iterable[str]]):
+        """
+        Compile the keyword tiers into an automaton.
+
+        Args:
+            tiers (Dict[str, Iterable[str]]): Tier name mapped to its keywords.
+                Keywords are matched case-insensitively.
+        """
+        self.tiers = {name: list(keywords) for name, keywords in tiers.items()}
+
+        # Trie transitions, failure links and per-state outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, int, int]]] = [[]]
+
+        for tier, keywords in self.tiers.items():
+            for index, keyword in enumerate(keywords):
+                self._insert(keyword.lower(), tier, index)
+
+        self._build_failure_links()
+
+    def _insert(self, keyword: str, tier: str, index: int) -> None:
+        if not keyword:
+            return
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._out[state].append((tier, index, len(keyword)))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(char, 0)
+                self._fail[child] = link if link != child else 0
+                # Inherit outputs of the suffix state so a single visit reports
+                # every keyword ending here
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find_all(self, text: str, whole_words: bool = False) -> List[KeywordMatch]:
+        """
+        Find every keyword occurrence in ``text`` in one pass.
+
+        Args:
+            text (str): Text to scan, expected to be lowercased already
+            whole_words (bool): Only report matches bounded by word boundaries
+
+        Returns:
+            List[KeywordMatch]: Matches ordered by end position
+        """
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        matches = []
+        state = 0
+
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+
+            end = position + 1
+            for tier, index, length in out[state]:
+                start = end - length
+                bounded = ((start == 0 or not _is_word_char(text[start - 1]))
+                           and (end == len(text) or not _is_word_char(text[end])))
+                if whole_words and not bounded:
+                    continue
+                matches.append(KeywordMatch(
+                    tier=tier,
+                    keyword=self.tiers[tier][index],
+                    index=index,
+                    start=start,
+                    end=end,
+                    whole_word=bounded
+                ))
+
+        return matches
@@ -0,0 +1,238 @@
+"""
+Metrics
+Per-stage latency histograms and request counters, rendered in the
+Prometheus text exposition format.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Upper bounds in seconds, from 100µs (triage stages) up to 30s (model calls)
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Fixed-bucket histogram; one short critical section per observation."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self._counts), self._sum, self._count
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        counts, _, total = self.snapshot()
+        if not total:
+            return 0.0
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+
+class Counter:
+    """Monotonic counter."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Gauge:
+    """Point-in-time value."""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _Family:
+    """A named metric with one child per label-value combination."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str], factory):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._factory())
+        return child
+
+    def children(self):
+        return sorted(self._children.items())
+
+    def _label_text(self, values: Tuple[str, ...], extra: str = '') -> str:
+        pairs = [f'{name}="{value}"' for name, value in zip(self.label_names, values)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class HistogramFamily(_Family):
+    def __init__(self, name, documentation, label_names, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names, lambda: Histogram(buckets))
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        quantile_lines = []
+        for values, histogram in self.children():
+            counts, total_sum, total_count = histogram.snapshot()
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, counts):
+                cumulative += count
+                labels = self._label_text(values, 'le="%s"' % bound)
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = self._label_text(values, 'le="+Inf"')
+            lines.append(f'{self.name}_bucket{labels} {total_count}')
+            lines.append(f'{self.name}_sum{self._label_text(values)} {total_sum:.6f}')
+            lines.append(f'{self.name}_count{self._label_text(values)} {total_count}')
+            for q in QUANTILES:
+                labels = self._label_text(values, 'quantile="%s"' % q)
+                quantile_lines.append(f'{self.name}_quantile{labels} {histogram.quantile(q):.6f}')
+        if quantile_lines:
+            lines.append(f'# HELP {self.name}_quantile Estimated {self.documentation.lower()} percentiles')
+            lines.append(f'# TYPE {self.name}_quantile gauge')
+            lines.extend(quantile_lines)
+        return lines
+
+
+class CounterFamily(_Family):
+    def __init__(self, name, documentation, label_names):
+        super().__init__(name, documentation, label_names, Counter)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        for values, counter in self.children():
+            lines.append(f'{self.name}{self._label_text(values)} {counter.value}')
+        return lines
+
+
+class GaugeFamily(_Family):
+    def __init__(self, name, documentation, label_names):
+        super().__init__(name, documentation, label_names, Gauge)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge']
+        for values, gauge in self.children():
+            lines.append(f'{self.name}{self._label_text(values)} {gauge.value:.6f}')
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self):
+        self._families: List[_Family] = []
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> HistogramFamily:
+        family = HistogramFamily(name, documentation, label_names, buckets)
+        self._families.append(family)
+        return family
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> CounterFamily:
+        family = CounterFamily(name, documentation, label_names)
+        self._families.append(family)
+        return family
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> GaugeFamily:
+        family = GaugeFamily(name, documentation, label_names)
+        self._families.append(family)
+        return family
+
+    def render(self) -> str:
+        lines = []
+        for family in self._families:
+            lines.extend(family.render())
+        return '\n'.join(lines) + '\n'
+
+
+def render_gauges(name: str, documentation: str, label_name: str,
+                  samples: Iterable[Tuple[str, float]]) -> str:
+    """Render point-in-time values (e.g. cache or queue statistics) as a gauge."""
+    lines = [f'# HELP {name} {documentation}', f'# TYPE {name} gauge']
+    for label, value in samples:
+        lines.append(f'{name}{{{label_name}="{label}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+# Application-wide registry
+registry = MetricsRegistry()
+
+STAGE_LATENCY = registry.histogram(
+    'chatbot_stage_duration_seconds', 'Time spent in each request stage', ['stage'])
+REQUEST_LATENCY = registry.histogram(
+    'chatbot_request_duration_seconds', 'End-to-end get_response time', ['urgency', 'outcome'])
+REQUESTS = registry.counter(
+    'chatbot_requests_total', 'Chat requests by urgency and outcome', ['urgency', 'outcome'])
+PROMPT_TOKENS = registry.counter(
+    'chatbot_prompt_tokens_total', 'Estimated prompt tokens sent to the model', ['part'])
+STARTUP = registry.gauge(
+    'chatbot_startup_seconds', 'Worker startup phase durations (boot, warmup, first_request)', ['phase'])
+KB_RELOADS = registry.counter(
+    'chatbot_kb_reloads_total', 'Knowledge base reload attempts', ['result'])
+LOG_RECORDS_DROPPED = registry.counter(
+    'chatbot_log_records_dropped_total', 'Log records dropped before writing', ['reason'])
+RATE_LIMITED = registry.counter(
+    'chatbot_rate_limited_total', 'Requests refused by a rate limit', ['limit'])
+
+
+@contextmanager
+def timed(stage: str):
+    """Record the duration of the enclosed block under the given stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(stage).observe(time.perf_counter() - start)
+
+
+def record_request(urgency: str, outcome: str, duration: float) -> None:
+    """Count a finished request and record its latency."""
+    REQUESTS.labels(urgency, outcome).inc()
+    REQUEST_LATENCY.labels(urgency, outcome).observe(duration)
@@ -0,0 +1,99 @@
+"""
+Prompt Builder
+Renders the static system instructions once and builds a compact user turn
+with structured triage and symptom context plus token estimates.
+"""
+
+import math
+import textwrap
+from dataclasses import dataclass
+from typing import Dict
+
+from .safety import TriageResult
+
+# Rough average for English text with the Gemini tokenizer
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of ``text`` without calling the tokenizer."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """A model request split into reusable system instruction and per-request user turn."""
+    system: str
+    user: str
+    system_tokens: int
+    user_tokens: int
+
+    @property
+    def token_estimate(self) -> Dict[str, int]:
+        return {
+            'system': self.system_tokens,
+            'user': self.user_tokens,
+            'total': self.system_tokens + self.user_tokens
+        }
+
+
+class PromptBuilder:
+    """Builds compact prompts around a pre-rendered system instruction."""
+
+    def __init__(self, system_prompt: str, closing_instruction: str = ''):
+        """
+        Args:
+            system_prompt (str): System instructions, possibly indented source text
+            closing_instruction (str): Appended to the system instructions
+        """
+        lines = [line.rstrip() for line in textwrap.dedent(system_prompt).strip().splitlines()]
+        # Collapse runs of blank lines left over from source formatting
+        compact = []
+        for line in lines:
+            if line or (compact and compact[-1]):
+                compact.append(line)
+        if closing_instruction:
+            compact.extend(['', closing_instruction])
+
+        self.system_instruction = '\n'.join(compact)
+        self.system_tokens = estimate_tokens(self.system_instruction)
+
+    def build(self, user_message: str, triage_result: TriageResult, symptom_analysis: Dict,
+              history: str = '') -> Prompt:
+        """
+        Build the per-request user turn.
+
+        Args:
+            user_message (str): User's medical query
+            triage_result (TriageResult): Result from urgency assessment
+            symptom_analysis (Dict): Results from analyze_symptoms
+            history (str): Conversation context lines from the session store, if any
+
+        Returns:
+            Prompt: System instruction, compact user turn and token estimates
+        """
+        lines = [
+            f"TRIAGE: urgency={triage_result.urgency.value}; risk={triage_result.risk.value}; "
+            f"action={triage_result.action_required}"
+        ]
+
+        conditions = symptom_analysis['possible_conditions']
+        if conditions:
+            lines.append('SYMPTOM PATTERNS: ' + '; '.join(
+                f"{c['condition']} {c['confidence']} ({c['matched_symptoms']}/{c['total_symptoms']})"
+                for c in conditions
+            ))
+        else:
+            lines.append('SYMPTOM PATTERNS: none identified')
+
+        if history:
+            lines.append(history)
+        lines.append(f"USER QUERY: {user_message}")
+        user = '\n'.join(lines)
+
+        return Prompt(
+            system=self.system_instruction,
+            user=user,
+            system_tokens=self.system_tokens,
+            user_tokens=estimate_tokens(user)
+        )
@@ -0,0 +1,289 @@
+"""
+Rate Limiting
+Token buckets shared by every worker process on a host: per-client request
+limits and a global model-call quota, kept in a memory-mapped file and
+updated under short per-stripe locks. A decision is a hash, a lock and a
+few bytes read and written, with no external service.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+from .metrics import RATE_LIMITED
+
+_HEADER = struct.Struct('<4sIQ')  # magic, layout version, table slots
+_SLOT = struct.Struct('<Qdd')  # key hash (0 = empty), tokens, last update (time.monotonic())
+_MAGIC = b'CBRL'
+_VERSION = 1
+
+# Slots probed per key before the least recently updated one is reused
+PROBES = 8
+
+# Fixed slots for host-wide buckets, which hashed keys can never evict
+MODEL_QUOTA_SLOT = 0
+RESERVED_SLOTS = 8
+
+
+def default_path(namespace: str) -> str:
+    """
+    Shared-memory file for one deployment, under /dev/shm where available, else the temp directory.
+
+    Args:
+        namespace (str): Identifies the deployment, e.g. the Flask instance path; workers
+            of one deployment share buckets, other deployments on the host get their own
+    """
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    suffix = hashlib.blake2b(namespace.encode('utf-8'), digest_size=6).hexdigest()
+    return os.path.join(directory, f'medical-chatbot-rate-limits-{suffix}')
+
+
+class RateLimited(Exception):
+    """Raised when a client or the model-call quota is out of tokens."""
+
+    def __init__(self, limit: str, retry_after: int):
+        super().__init__(f"Rate limit exceeded: {limit}")
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+class SharedTokenBuckets:
+    """
+    Fixed-size table of token buckets in a file mapped by every process on the host.
+
+    Keys hash to a stripe and a home slot in it. Each stripe is guarded by a
+    thread lock (within a process) and an fcntl byte-range lock (across
+    processes). Timestamps use time.monotonic(), which is system-wide on Linux.
+    """
+
+    def __init__(self, path: str, slots: int = 4096, stripes: int = 64):
+        """
+        Args:
+            path (str): Backing file, shared by processes that should share limits (see default_path)
+            slots (int): Hashed bucket slots; a multiple of ``stripes``. Size it well above
+                the number of clients active within one bucket refill period
+            stripes (int): Independently locked sections of the table
+        """
+        if slots % stripes:
+            raise ValueError("slots must be a multiple of stripes")
+        self.path = path
+        self.slots = slots
+        self.stripes = stripes
+        self.stripe_slots = slots // stripes
+        self.size = _HEADER.size + (RESERVED_SLOTS + slots) * _SLOT.size
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            self._init_file()
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self._map = mmap.mmap(self._fd, self.size)
+        # Indexed by lock byte: 0 guards initialization, then one per stripe, then one per reserved slot
+        self._locks = [threading.Lock() for _ in range(1 + stripes + RESERVED_SLOTS)]
+        self.evictions = 0
+
+    def _init_file(self) -> None:
+        """
+        Lay out a new (empty) file, or check that an existing one has this table's layout.
+
+        Raises:
+            ValueError: The file holds another layout, e.g. a different slot count; other
+                processes may be using it, so it is never rewritten
+        """
+        # Lock byte 0 serializes initialization; stripe locks use the bytes after it
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 0)
+        try:
+            header = os.pread(self._fd, _HEADER.size, 0)
+            expected = _HEADER.pack(_MAGIC, _VERSION, self.slots)
+            if header == expected:
+                return
+            if header.strip(b'\0'):
+                magic, version, slots = _HEADER.unpack(header.ljust(_HEADER.size, b'\0'))
+                raise ValueError(
+                    f"Rate limit file {self.path} has another layout ({magic!r} v{version}, {slots} slots; "
+                    f"wanted {self.slots}); set RATE_LIMIT_PATH or RATE_LIMIT_SLOTS to match")
+            # New file: every bucket starts full
+            os.ftruncate(self._fd, self.size)
+            os.pwrite(self._fd, expected, 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 0)
+
+    def _offset(self, slot: int) -> int:
+        return _HEADER.size + slot * _SLOT.size
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """
+        Take ``cost`` tokens from the bucket for ``key``.
+
+        Args:
+            key (str): Bucket identity, e.g. "client:203.0.113.7"
+            rate (float): Tokens added per second
+            burst (float): Bucket capacity
+            cost (float): Tokens this request needs
+
+        Returns:
+            float: 0.0 if the tokens were taken, else seconds until they would be available
+        """
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+        h = int.from_bytes(digest, 'little') or 1
+        stripe = h % self.stripes
+        home = (h // self.stripes) % self.stripe_slots
+        first = RESERVED_SLOTS + stripe * self.stripe_slots
+        with self._stripe_lock(stripe + 1):
+            slot = self._find(h, first, home)
+            return self._update(slot, h, rate, burst, cost)
+
+    def take_reserved(self, slot: int, rate: float, burst: float, cost: float = 1.0) -> float:
+        """Like take(), for one of the fixed host-wide buckets (e.g. MODEL_QUOTA_SLOT)."""
+        with self._stripe_lock(self.stripes + 1 + slot):
+            return self._update(slot, slot + 1, rate, burst, cost)
+
+    def _stripe_lock(self, lock_byte: int):
+        return _StripeLock(self._locks[lock_byte], self._fd, lock_byte)
+
+    def _find(self, h: int, first: int, home: int) -> int:
+        """Slot holding ``h``, an empty slot, or the stalest of the probed slots."""
+        victim, oldest = None, None
+        for i in range(PROBES):
+            slot = first + (home + i) % self.stripe_slots
+            key, _, updated = _SLOT.unpack_from(self._map, self._offset(slot))
+            if key == h or key == 0:
+                return slot
+            if oldest is None or updated < oldest:
+                victim, oldest = slot, updated
+        # Evicting a bucket idle for longer than its refill time loses nothing
+        self.evictions += 1
+        _SLOT.pack_into(self._map, self._offset(victim), 0, 0.0, 0.0)
+        return victim
+
+    def _update(self, slot: int, h: int, rate: float, burst: float, cost: float) -> float:
+        offset = self._offset(slot)
+        now = time.monotonic()
+        key, tokens, updated = _SLOT.unpack_from(self._map, offset)
+        if key != h:
+            tokens, updated = burst, now
+        # A timestamp from the future (e.g. a file kept across a reboot) counts as now
+        tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+        if tokens >= cost:
+            tokens -= cost
+            wait = 0.0
+        else:
+            wait = (cost - tokens) / rate if rate > 0 else float('inf')
+        _SLOT.pack_into(self._map, offset, h, tokens, now)
+        return wait
+
+    def occupancy(self) -> int:
+        """Hashed slots currently holding a bucket (a full table scan, for /stats)."""
+        empty = 0
+        for slot in range(RESERVED_SLOTS, RESERVED_SLOTS + self.slots):
+            if _SLOT.unpack_from(self._map, self._offset(slot))[0] == 0:
+                empty += 1
+        return self.slots - empty
+
+    def after_fork(self) -> None:
+        """Replace thread locks that may have been held by other threads at fork()."""
+        self._locks = [threading.Lock() for _ in range(len(self._locks))]
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+
+class _StripeLock:
+    """Thread lock plus fcntl byte-range lock; fcntl locks alone do not exclude threads of one process."""
+
+    __slots__ = ('lock', 'fd', 'byte')
+
+    def __init__(self, lock: threading.Lock, fd: int, byte: int):
+        self.lock = lock
+        self.fd = fd
+        self.byte = byte
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, 1, self.byte)
+        except BaseException:
+            self.lock.release()
+            raise
+
+    def __exit__(self, *exc):
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, 1, self.byte)
+        finally:
+            self.lock.release()
+
+
+class RateLimiter:
+    """Per-client request limits and a host-wide model-call quota over SharedTokenBuckets."""
+
+    def __init__(self, buckets: SharedTokenBuckets, client_rate: float = 1.0, client_burst: float = 20.0,
+                 model_rate: float = 0.0, model_burst: float = 0.0):
+        """
+        Args:
+            buckets (SharedTokenBuckets): Shared bucket table
+            client_rate (float): Requests per second each client may sustain (0 = no client limit)
+            client_burst (float): Requests a client may send at once
+            model_rate (float): Model calls per second across all workers on the host (0 = no quota)
+            model_burst (float): Model calls that may start at once; defaults to one second's worth
+        """
+        self.buckets = buckets
+        self.client_rate = client_rate
+        self.client_burst = client_burst or max(1.0, client_rate)
+        self.model_rate = model_rate
+        self.model_burst = model_burst or max(1.0, model_rate)
+        self.allowed = {'client': 0, 'model': 0}
+        self.limited = {'client': 0, 'model': 0}
+
+    def check_client(self, client_id: Optional[str]) -> None:
+        """
+        Count one request against ``client_id``'s bucket.
+
+        Raises:
+            RateLimited: The client is over its limit
+        """
+        if self.client_rate <= 0 or not client_id:
+            return
+        self._decide('client', self.buckets.take(
+            'client:' + client_id, self.client_rate, self.client_burst))
+
+    def acquire_model(self) -> None:
+        """
+        Count one model call against the host-wide quota.
+
+        Raises:
+            RateLimited: The quota is exhausted
+        """
+        if self.model_rate <= 0:
+            return
+        self._decide('model', self.buckets.take_reserved(
+            MODEL_QUOTA_SLOT, self.model_rate, self.model_burst))
+
+    def _decide(self, limit: str, wait: float) -> None:
+        if wait <= 0:
+            self.allowed[limit] += 1
+            return
+        self.limited[limit] += 1
+        RATE_LIMITED.labels(limit).inc()
+        raise RateLimited(limit, max(1, int(wait + 0.999)))
+
+    def after_fork(self) -> None:
+        self.buckets.after_fork()
+
+    def stats(self) -> Dict[str, int]:
+        """Get this worker's allow/limit counts and the shared table's occupancy."""
+        return {
+            'client_allowed': self.allowed['client'],
+            'client_limited': self.limited['client'],
+            'model_allowed': self.allowed['model'],
+            'model_limited': self.limited['model'],
+            'buckets': self.buckets.occupancy(),
+            'evictions': self.buckets.evictions
+        }
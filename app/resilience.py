@@ -0,0 +1,261 @@
+"""
+Model Call Resilience
+Deadlines, optional hedged retries and a circuit breaker around calls to
+the generation backend.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+class ModelUnavailable(Exception):
+    """Base class for model calls skipped or abandoned to protect latency."""
+
+
+class DeadlineExceeded(ModelUnavailable):
+    """The model did not answer before the request deadline."""
+
+
+class CircuitOpen(ModelUnavailable):
+    """The circuit breaker is open after repeated upstream failures."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open trial call."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures or timeouts that open the circuit
+            reset_timeout (float): Seconds to stay open before allowing a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.opens = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Give up a claimed half-open trial without an outcome, e.g. on client disconnect."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opens += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class ModelCallGuard:
+    """Runs backend calls under a deadline with optional hedging and a circuit breaker."""
+
+    def __init__(self, max_workers: int = 16, default_timeout: float = 25.0,
+                 hedge_percentile: float = 0.0, hedge_min_samples: int = 20,
+                 breaker: Optional[CircuitBreaker] = None, sample_size: int = 512):
+        """
+        Args:
+            max_workers (int): Threads available for upstream calls
+            default_timeout (float): Deadline in seconds when the caller gives none
+            hedge_percentile (float): Latency percentile after which a hedged call is
+                started (e.g. 0.95); 0 disables hedging
+            hedge_min_samples (int): Latency samples required before hedging kicks in
+            breaker (CircuitBreaker): Breaker shared by every call through this guard
+            sample_size (int): Recent successful latencies kept for the percentile
+        """
+        self.default_timeout = default_timeout
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='model-call')
+        self._latencies = deque(maxlen=sample_size)
+        self._lock = threading.Lock()
+
+        self.timeouts = 0
+        self.failures = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.short_circuited = 0
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge_percentile:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            samples = sorted(self._latencies)
+        return samples[min(len(samples) - 1, int(self.hedge_percentile * len(samples)))]
+
+    def remaining(self, deadline: Optional[float]) -> float:
+        """Seconds left until ``deadline`` (a time.monotonic() value)."""
+        if deadline is None:
+            return self.default_timeout
+        return deadline - time.monotonic()
+
+    def check(self) -> None:
+        """
+        Raise CircuitOpen if upstream calls are currently short-circuited.
+
+        Claims the half-open trial slot when one is available, so a
+        successful check must be followed by record_success/record_failure.
+        """
+        if not self.breaker.allow():
+            with self._lock:
+                self.short_circuited += 1
+            raise CircuitOpen("Model temporarily unavailable (circuit open)")
+
+    def call(self, fn: Callable[[], Any], deadline: Optional[float] = None) -> Any:
+        """
+        Run ``fn`` before ``deadline``, hedging slow calls when enabled.
+
+        Raises:
+            CircuitOpen: The breaker is open
+            DeadlineExceeded: No attempt finished before the deadline
+            Exception: The error raised by the last failed attempt
+        """
+        self.check()
+        remaining = self.remaining(deadline)
+        if remaining <= 0:
+            self.record_timeout()
+            raise DeadlineExceeded("Request deadline already passed")
+
+        start = time.monotonic()
+        primary = self._executor.submit(fn)
+        pending = {primary}
+        hedge_delay = self._hedge_delay()
+        last_error = None
+
+        while pending:
+            timeout = self.remaining(deadline) if deadline is not None else remaining - (time.monotonic() - start)
+            if hedge_delay is not None and len(pending) == 1 and primary in pending:
+                timeout = min(timeout, max(0.0, hedge_delay - (time.monotonic() - start)))
+            done, pending = wait(pending, timeout=max(0.0, timeout), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                if future.exception() is None:
+                    self._record_success(time.monotonic() - start, hedged=future is not primary)
+                    return future.result()
+                last_error = future.exception()
+
+            out_of_time = (deadline is not None and self.remaining(deadline) <= 0) or \
+                (deadline is None and time.monotonic() - start >= remaining)
+            if out_of_time:
+                break
+            if hedge_delay is not None and not done and primary in pending and len(pending) == 1:
+                # Primary is slower than the hedge percentile: race a second attempt
+                with self._lock:
+                    self.hedges += 1
+                hedge_delay = None
+                pending.add(self._executor.submit(fn))
+
+        if pending:
+            for future in pending:
+                future.cancel()
+            self.record_timeout()
+            raise DeadlineExceeded(f"Model call exceeded deadline after {time.monotonic() - start:.2f}s")
+
+        self.record_failure()
+        raise last_error
+
+    def iterate(self, chunks: Iterator[Any], deadline: Optional[float] = None) -> Iterator[Any]:
+        """
+        Yield from ``chunks``, pulling each item on the executor so an upstream that
+        stalls (including before its first item) cannot hold the caller past ``deadline``.
+
+        Does not check or update the breaker; the caller records the outcome.
+
+        Raises:
+            DeadlineExceeded: The next item did not arrive before the deadline
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.default_timeout
+        exhausted = object()
+        future = None
+        try:
+            while True:
+                remaining = self.remaining(deadline)
+                if remaining <= 0:
+                    raise DeadlineExceeded("Model stream exceeded deadline")
+                future = self._executor.submit(next, chunks, exhausted)
+                try:
+                    item = future.result(timeout=remaining)
+                except FuturesTimeout:
+                    raise DeadlineExceeded("Model stream stalled past the deadline") from None
+                future = None
+                if item is exhausted:
+                    return
+                yield item
+        finally:
+            # A pull still running on the executor owns the iterator; it is abandoned,
+            # like a timed-out call(). Otherwise release the upstream stream now.
+            if future is not None:
+                future.cancel()
+            elif hasattr(chunks, 'close'):
+                chunks.close()
+
+    def _record_success(self, latency: float, hedged: bool = False) -> None:
+        self.breaker.record_success()
+        with self._lock:
+            self._latencies.append(latency)
+            if hedged:
+                self.hedge_wins += 1
+
+    def record_success(self, latency: float) -> None:
+        """Record a call completed outside call(), e.g. a streamed response."""
+        self._record_success(latency)
+
+    def record_timeout(self) -> None:
+        self.breaker.record_failure()
+        with self._lock:
+            self.timeouts += 1
+
+    def record_failure(self) -> None:
+        self.breaker.record_failure()
+        with self._lock:
+            self.failures += 1
+
+    def stats(self) -> Dict:
+        """Get breaker state and timeout/failure/hedging counters."""
+        with self._lock:
+            return {
+                'breaker_state': self.breaker.state,
+                'breaker_opens': self.breaker.opens,
+                'timeouts': self.timeouts,
+                'failures': self.failures,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'short_circuited': self.short_circuited
+            }
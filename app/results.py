@@ -0,0 +1,118 @@
+"""
+Chat Results
+Slotted result type returned by MedicalChatbot.get_response, shaped into the
+/chat JSON body only when it is serialized, plus the immutable pieces every
+result shares (disclaimers per urgency level).
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from .safety import UrgencyLevel
+
+BASE_DISCLAIMERS = (
+    "This AI assistant provides general health information only and is not a substitute for professional medical advice, diagnosis, or treatment.",
+    "Always seek the advice of your physician or other qualified health provider with any questions you may have regarding a medical condition.",
+    "Never disregard professional medical advice or delay seeking it because of something you have read here."
+)
+
+URGENT_DISCLAIMER = "⚠️ Your symptoms may require prompt medical attention. Please contact your healthcare provider."
+
+# Built once: results share these tuples instead of allocating a list per request
+DISCLAIMERS: Dict[UrgencyLevel, Tuple[str, ...]] = {
+    UrgencyLevel.EMERGENCY: BASE_DISCLAIMERS,
+    UrgencyLevel.URGENT: (URGENT_DISCLAIMER,) + BASE_DISCLAIMERS,
+    UrgencyLevel.ROUTINE: BASE_DISCLAIMERS
+}
+
+ERROR_RESPONSE = "I apologize, but I'm experiencing technical difficulties. Please try again later or consult with a healthcare professional for your medical concerns."
+
+
+class ChatResult:
+    """
+    One get_response outcome.
+
+    Emergency results carry only triage fields; ``error`` results carry a
+    fallback response and the failure in ``reasoning``. ``session_id`` is
+    filled in by the route before serialization.
+    """
+
+    __slots__ = ('response', 'urgency', 'risk_level', 'confidence', 'reasoning', 'response_time',
+                 'kb_version', 'emergency', 'error', 'symptom_analysis', 'disclaimers',
+                 'recommendations', 'cached', 'similarity', 'coalesced', 'degraded',
+                 'prompt_tokens', 'session_id')
+
+    def __init__(self, response: str, urgency: str, risk_level: str, confidence: float, reasoning: str,
+                 response_time: float, kb_version: Optional[str] = None, emergency: bool = False,
+                 error: bool = False, symptom_analysis: Optional[Dict] = None,
+                 disclaimers: Tuple[str, ...] = (), recommendations: Optional[str] = None,
+                 cached: bool = False, similarity: Optional[float] = None, coalesced: bool = False,
+                 degraded: bool = False, prompt_tokens: Optional[Dict[str, int]] = None):
+        self.response = response
+        self.urgency = urgency
+        self.risk_level = risk_level
+        self.confidence = confidence
+        self.reasoning = reasoning
+        self.response_time = response_time
+        self.kb_version = kb_version
+        self.emergency = emergency
+        self.error = error
+        self.symptom_analysis = symptom_analysis
+        self.disclaimers = disclaimers
+        self.recommendations = recommendations
+        self.cached = cached
+        self.similarity = similarity
+        self.coalesced = coalesced
+        self.degraded = degraded
+        self.prompt_tokens = prompt_tokens
+        self.session_id: Optional[str] = None
+
+    @property
+    def status(self) -> str:
+        if self.error:
+            return 'error'
+        if self.emergency:
+            return 'emergency'
+        return 'degraded' if self.degraded else 'success'
+
+    def to_json(self) -> Dict[str, Any]:
+        """The /chat response body."""
+        if self.error:
+            return {'error': 'Sorry, I encountered an error. Please try again.', 'status': 'error'}
+        if self.emergency:
+            return {
+                'response': self.response,
+                'urgency': self.urgency,
+                'risk_level': self.risk_level,
+                'emergency': True,
+                'confidence': self.confidence,
+                'reasoning': self.reasoning,
+                'response_time': self.response_time,
+                'kb_version': self.kb_version,
+                'session_id': self.session_id,
+                'status': 'emergency'
+            }
+
+        data = {
+            'response': self.response,
+            'urgency': self.urgency,
+            'risk_level': self.risk_level,
+            'emergency': False,
+            'confidence': self.confidence,
+            'reasoning': self.reasoning,
+            'recommendations': self.recommendations,
+            'response_time': self.response_time,
+            'disclaimers': self.disclaimers,
+            'cached': self.cached,
+            'similarity': self.similarity,
+            'prompt_tokens': self.prompt_tokens,
+            'kb_version': self.kb_version,
+            'session_id': self.session_id,
+            'status': self.status
+        }
+        # Symptom analysis only when it found something
+        if self.symptom_analysis and self.symptom_analysis['possible_conditions']:
+            data['symptom_analysis'] = self.symptom_analysis
+        return data
+
+    def __repr__(self) -> str:
+        return f'ChatResult(urgency={self.urgency!r}, status={self.status!r}, response_time={self.response_time!r})'
@@ -1,122 +1,691 @@
-from flask import Blueprint, render_template, request, jsonify, current_app
+from flask import Blueprint, Response, render_template, request, jsonify, current_app, g, stream_with_context
 from app.chatbot import MedicalChatbot
+from app.cache import ResponseCache
+from app.backends import create_backend
+from app.admission import AdmissionController, AdmissionRejected
+from app.coalescing import SingleFlight
+from app.resilience import CircuitBreaker, ModelCallGuard
+from app.safety import UrgencyLevel
+from app.knowledge_base import KnowledgeBaseStore
+from app.sessions import SessionStore, new_session_id, valid_session_id
+from app.similarity import SimilarAnswerIndex
+from app.jobs import ChatJobQueue, JobQueueFull
+from app.rate_limit import RateLimited, RateLimiter, SharedTokenBuckets, default_path
+from app.assets import IMMUTABLE, AssetStore, PrecomputedResponse
+from app.metrics import STARTUP, registry, render_gauges, timed
+from app.log_pipeline import REQUEST_LOGGER, configure_logging
+from app import log_pipeline
+from config import Config
 import logging
+import os
+import signal
+import threading
+import time
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Queue-based logging: request threads never wait on the log sink
+configure_logging(Config.LOG_LEVEL, Config.LOG_QUEUE_SIZE, Config.LOG_REQUEST_SAMPLE_RATES, Config.LOG_RATE_LIMITS)
 logger = logging.getLogger(__name__)
+# Per-request lines, sampled by the pipeline
+request_log = logging.getLogger(REQUEST_LOGGER)
 
 main = Blueprint('main', __name__)
 
-# Initialize chatbot (will be done on first request)
+# Chatbot instance, built by warm_up() at startup or on first request
 chatbot = None
+_chatbot_lock = threading.Lock()
+# Hot-reloadable knowledge base shared by the chatbot and /triage/batch
+knowledge_base = None
+_knowledge_base_lock = threading.Lock()
+# Background generations for /chat/jobs, started on first use
+chat_jobs = None
+_chat_jobs_lock = threading.Lock()
+_first_request_pending = True
+
+def get_knowledge_base(settings=None) -> KnowledgeBaseStore:
+    """Get or load the knowledge base store, starting its file watcher."""
+    global knowledge_base
+    if knowledge_base is None:
+        with _knowledge_base_lock:
+            if knowledge_base is None:
+                settings = settings if settings is not None else current_app.config
+                store = KnowledgeBaseStore(
+                    path=settings['KNOWLEDGE_BASE_PATH'],
+                    reload_interval=settings['KNOWLEDGE_BASE_RELOAD_INTERVAL']
+                )
+                store.start_watching()
+                logger.info("Knowledge base %s loaded from %s", store.version, store.path)
+                knowledge_base = store
+    return knowledge_base
+
+def build_chatbot(settings) -> MedicalChatbot:
+    """Construct a chatbot with the backend, cache and admission control from settings."""
+    api_key = settings['GEMINI_API_KEY']
+    backend = create_backend(settings, api_key)
+    response_cache = None
+    if settings['RESPONSE_CACHE_ENABLED']:
+        response_cache = ResponseCache(
+            max_entries=settings['RESPONSE_CACHE_MAX_ENTRIES'],
+            max_bytes=settings['RESPONSE_CACHE_MAX_BYTES'],
+            ttl=settings['RESPONSE_CACHE_TTL']
+        )
+    admission = None
+    if settings['ADMISSION_ENABLED']:
+        admission = AdmissionController(
+            max_concurrent=settings['ADMISSION_MAX_CONCURRENT'],
+            queue_limits={
+                'urgent': settings['ADMISSION_URGENT_QUEUE_LIMIT'],
+                'routine': settings['ADMISSION_ROUTINE_QUEUE_LIMIT']
+            },
+            queue_timeout=settings['ADMISSION_QUEUE_TIMEOUT'],
+            retry_after=settings['ADMISSION_RETRY_AFTER']
+        )
+    similar_answers = None
+    if settings['SIMILAR_ANSWERS_ENABLED']:
+        similar_answers = SimilarAnswerIndex(
+            threshold=settings['SIMILAR_ANSWERS_THRESHOLD'],
+            max_entries=settings['SIMILAR_ANSWERS_MAX_ENTRIES'],
+            ttl=settings['SIMILAR_ANSWERS_TTL']
+        )
+    single_flight = None
+    if settings['COALESCING_ENABLED']:
+        single_flight = SingleFlight(wait_timeout=settings['COALESCING_WAIT_TIMEOUT'])
+    sessions = None
+    if settings['SESSIONS_ENABLED']:
+        sessions = SessionStore(
+            max_sessions=settings['SESSION_MAX_SESSIONS'],
+            max_bytes=settings['SESSION_MAX_BYTES'],
+            idle_timeout=settings['SESSION_IDLE_TIMEOUT'],
+            max_turns=settings['SESSION_MAX_TURNS'],
+            history_token_budget=settings['SESSION_HISTORY_TOKEN_BUDGET']
+        )
+    rate_limiter = None
+    if settings['RATE_LIMIT_ENABLED']:
+        rate_limiter = RateLimiter(
+            SharedTokenBuckets(path=settings['RATE_LIMIT_PATH'] or default_path(current_app.instance_path),
+                               slots=settings['RATE_LIMIT_SLOTS']),
+            client_rate=settings['RATE_LIMIT_CLIENT_RATE'],
+            client_burst=settings['RATE_LIMIT_CLIENT_BURST'],
+            model_rate=settings['RATE_LIMIT_MODEL_RATE'],
+            model_burst=settings['RATE_LIMIT_MODEL_BURST']
+        )
+    model_guard = ModelCallGuard(
+        max_workers=settings['MODEL_CALL_WORKERS'],
+        default_timeout=settings['MODEL_DEADLINE_SECONDS'],
+        hedge_percentile=settings['MODEL_HEDGE_PERCENTILE'],
+        hedge_min_samples=settings['MODEL_HEDGE_MIN_SAMPLES'],
+        breaker=CircuitBreaker(
+            failure_threshold=settings['BREAKER_FAILURE_THRESHOLD'],
+            reset_timeout=settings['BREAKER_RESET_TIMEOUT']
+        )
+    )
+    return MedicalChatbot(api_key, response_cache=response_cache, backend=backend,
+                          admission=admission, single_flight=single_flight,
+                          model_guard=model_guard, knowledge_base=get_knowledge_base(settings),
+                          sessions=sessions, similar_answers=similar_answers, rate_limiter=rate_limiter)
 
 def get_chatbot():
     """Get or initialize the chatbot instance."""
     global chatbot
     if chatbot is None:
-        api_key = current_app.config['GEMINI_API_KEY']
-        if not api_key:
-            raise ValueError("Gemini API key not found. Please check your .env file.")
-        logger.info("Initializing chatbot...")
-        chatbot = MedicalChatbot(api_key)
-        logger.info("Chatbot initialized successfully")
+        with _chatbot_lock:
+            # Re-check: another thread may have finished initialization meanwhile
+            if chatbot is None:
+                logger.info("Initializing chatbot...")
+                chatbot = build_chatbot(current_app.config)
+                logger.info("Chatbot initialized successfully with %s backend", chatbot.backend.name)
     return chatbot
 
+def get_chat_jobs() -> ChatJobQueue:
+    """Get or start the background job pool for /chat/jobs."""
+    global chat_jobs
+    if chat_jobs is None:
+        with _chat_jobs_lock:
+            if chat_jobs is None:
+                settings = current_app.config
+                chat_jobs = ChatJobQueue(
+                    max_workers=settings['CHAT_JOB_WORKERS'],
+                    max_pending=settings['CHAT_JOB_MAX_PENDING'],
+                    ttl=settings['CHAT_JOB_TTL'],
+                    max_wait=settings['CHAT_JOB_MAX_WAIT'],
+                    retry_after=settings['ADMISSION_RETRY_AFTER'],
+                    max_finished=settings['CHAT_JOB_MAX_FINISHED']
+                )
+    return chat_jobs
+
+def install_reload_signal(app):
+    """Reload the knowledge base in the background when KNOWLEDGE_BASE_RELOAD_SIGNAL arrives."""
+    name = app.config['KNOWLEDGE_BASE_RELOAD_SIGNAL']
+    if not name or not hasattr(signal, name) or threading.current_thread() is not threading.main_thread():
+        return
+    
+    def handle(signum, frame):
+        # Build off the interrupted thread; the store swaps the result in atomically
+        store = knowledge_base
+        if store is not None:
+            threading.Thread(target=store.reload, kwargs={'force': True}, name='kb-reload', daemon=True).start()
+    
+    signal.signal(getattr(signal, name), handle)
+
+def install_assets(app):
+    """Precompute static assets and the health tips body; templates get asset_url()."""
+    assets = AssetStore(app.static_folder)
+    assets.add('health_tips', PrecomputedResponse.json({
+        'tips': MedicalChatbot.get_health_tips(),
+        'status': 'success'
+    }))
+    app.extensions['assets'] = assets
+    app.jinja_env.globals['asset_url'] = assets.url
+
+def warm_up(app):
+    """Build the chatbot ahead of the first request; failures fall back to lazy init."""
+    if chatbot is not None:
+        return
+    start = time.perf_counter()
+    with app.app_context():
+        try:
+            get_chatbot()
+        except Exception as e:
+            logger.error("Chatbot warm-up failed, will retry on first request: %s", e)
+            return
+    STARTUP.labels('warmup').set(time.perf_counter() - start)
+
+def _reset_after_fork():
+    """Give each forked worker its own locks and watcher; drop clients that cannot cross fork()."""
+    global chatbot, chat_jobs, _chatbot_lock, _knowledge_base_lock, _chat_jobs_lock
+    _chatbot_lock = threading.Lock()
+    _knowledge_base_lock = threading.Lock()
+    _chat_jobs_lock = threading.Lock()
+    # The pool's threads did not survive fork; jobs submitted in the parent are lost anyway
+    chat_jobs = None
+    if knowledge_base is not None:
+        knowledge_base.after_fork()
+    if chatbot is not None and chatbot.rate_limiter is not None:
+        chatbot.rate_limiter.after_fork()
+    if chatbot is not None and not chatbot.backend.fork_safe:
+        chatbot = None
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+@main.before_app_request
+def _start_request_timer():
+    g.request_received = time.monotonic()
+    if _first_request_pending:
+        g.request_start = time.perf_counter()
+
+@main.after_app_request
+def _record_first_request(response):
+    global _first_request_pending
+    if _first_request_pending and 'request_start' in g:
+        _first_request_pending = False
+        latency = time.perf_counter() - g.request_start
+        STARTUP.labels('first_request').set(latency)
+        logger.info("First request served in %.3fs", latency)
+    return response
+
 @main.route('/')
 def index():
     """Home page."""
     try:
-        return render_template('index.html')
+        # Rendered once; clients revalidate with the ETag
+        page = current_app.extensions['assets'].rendered(
+            'index', lambda: (render_template('index.html').encode('utf-8'), 'text/html'))
+        return page.respond('no-cache')
     except Exception as e:
-        logger.error(f"Error loading home page: {str(e)}")
+        logger.error("Error loading home page: %s", e)
         return render_template('index.html', error="Configuration error. Please check API key.")
 
+def validate_message(data):
+    """
+    Validate a chat request body.
+    
+    Returns:
+        Tuple: (user_message, None) when valid, otherwise (None, error response)
+    """
+    if not data or 'message' not in data:
+        return None, (jsonify({'error': 'No message provided'}), 400)
+    
+    user_message = data['message'].strip()
+    
+    # Basic validation
+    if not user_message:
+        return None, (jsonify({'error': 'Message cannot be empty'}), 400)
+    
+    if len(user_message) > 1000:
+        return None, (jsonify({'error': 'Message too long. Please keep it under 1000 characters.'}), 400)
+    
+    return user_message, None
+
+def request_session(data, bot):
+    """
+    Session id for a chat request: the client's if it is a live session, otherwise a new one.
+    
+    Only ids the server issued are continued; an unknown or expired id gets a fresh
+    session rather than one created under the client's string, so ids cannot be
+    chosen, shared or guessed to reach another conversation.
+    
+    Returns:
+        Tuple: (session_id, None) when valid, otherwise (None, error response);
+        the id is None when sessions are disabled
+    """
+    if bot.sessions is None:
+        return None, None
+    session_id = data.get('session_id')
+    if session_id is None:
+        return new_session_id(), None
+    if not valid_session_id(session_id):
+        return None, (jsonify({'error': 'Invalid session_id', 'status': 'error'}), 400)
+    if not bot.sessions.active(session_id):
+        return new_session_id(), None
+    return session_id, None
+
+def request_client():
+    """Client identity for rate limiting: the peer address, or the first X-Forwarded-For hop behind a trusted proxy."""
+    if current_app.config['RATE_LIMIT_TRUST_PROXY']:
+        return request.access_route[0] if request.access_route else request.remote_addr
+    return request.remote_addr
+
+def rate_limited_response(e):
+    """429 response for a request refused by a rate limit."""
+    request_log.warning("Rate limited: %s", e.limit)
+    response = jsonify({
+        'error': 'Too many requests. Please try again shortly.',
+        'status': 'rate_limited'
+    })
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 429
+
+def request_deadline():
+    """Monotonic deadline for this request's model call."""
+    return g.get('request_received', time.monotonic()) + current_app.config['MODEL_DEADLINE_SECONDS']
+
+def chat_payload(result, session_id):
+    """Attach the session to a get_response result; it serializes as the /chat JSON body."""
+    if result.emergency:
+        request_log.warning("Emergency detected: %s", result.reasoning)
+    result.session_id = session_id
+    return result
+
 @main.route('/chat', methods=['POST'])
 def chat():
     """Handle chat messages with comprehensive safety and analysis."""
     try:
-        logger.info("Received chat request")
+        request_log.info("Received chat request")
         data = request.get_json()
-        if not data or 'message' not in data:
-            return jsonify({'error': 'No message provided'}), 400
+        user_message, error_response = validate_message(data)
+        if error_response:
+            return error_response
+        request_log.info("Processing message: %.50s...", user_message)
         
-        user_message = data['message'].strip()
-        logger.info(f"Processing message: {user_message[:50]}...")
+        # Get comprehensive chatbot response
+        bot = get_chatbot()
+        session_id, error_response = request_session(data, bot)
+        if error_response:
+            return error_response
+        result = bot.get_response(user_message, use_cache=not data.get('no_cache', False),
+                                  deadline=request_deadline(), session_id=session_id,
+                                  client_id=request_client())
         
-        # Basic validation
-        if not user_message:
-            return jsonify({'error': 'Message cannot be empty'}), 400
+        request_log.info("Generated response in %ss", result.response_time)
+        if result.error:
+            return jsonify(result), 500
         
-        if len(user_message) > 1000:
-            return jsonify({'error': 'Message too long. Please keep it under 1000 characters.'}), 400
+        with timed('response_assembly'):
+            return jsonify(chat_payload(result, session_id))
+        
+    except AdmissionRejected as ar:
+        request_log.warning("Chat request rejected: %s", ar.reason)
+        response = jsonify({
+            'error': 'The service is busy. Please try again shortly.',
+            'status': 'busy'
+        })
+        response.headers['Retry-After'] = str(ar.retry_after)
+        return response, 503
+    except RateLimited as rl:
+        return rate_limited_response(rl)
+    except ValueError as ve:
+        logger.error("Configuration error: %s", ve)
+        return jsonify({
+            'error': 'Configuration error. Please check your API key setup.',
+            'status': 'error'
+        }), 500
+    except Exception as e:
+        logger.error("Error in chat endpoint: %s", e)
+        return jsonify({
+            'error': 'Sorry, I encountered an error. Please try again.',
+            'status': 'error'
+        }), 500
+
+@main.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """Stream chat responses as Server-Sent Events."""
+    try:
+        data = request.get_json()
+        user_message, error_response = validate_message(data)
+        if error_response:
+            return error_response
+        request_log.info("Streaming message: %.50s...", user_message)
         
-        # Get comprehensive chatbot response
         bot = get_chatbot()
-        result = bot.get_response(user_message)
-        
-        logger.info(f"Generated response in {result.get('response_time', 0)}s")
-        
-        # Handle emergency cases
-        if result.get('emergency', False):
-            logger.warning(f"Emergency detected: {result.get('reasoning', 'Unknown')}")
-            return jsonify({
-                'response': result['response'],
-                'urgency': result['urgency'],
-                'risk_level': result['risk_level'],
-                'emergency': True,
-                'confidence': result['confidence'],
-                'reasoning': result['reasoning'],
-                'response_time': result['response_time'],
-                'status': 'emergency'
-            })
-        
-        # Standard response with comprehensive information
-        response_data = {
-            'response': result['response'],
-            'urgency': result['urgency'],
-            'risk_level': result['risk_level'],
-            'emergency': False,
-            'confidence': result['confidence'],
-            'reasoning': result['reasoning'],
-            'recommendations': result['recommendations'],
-            'response_time': result['response_time'],
-            'disclaimers': result['disclaimers'],
-            'status': 'success'
-        }
+        session_id, error_response = request_session(data, bot)
+        if error_response:
+            return error_response
+        events = bot.stream_response(user_message, use_cache=not data.get('no_cache', False),
+                                     deadline=request_deadline(), session_id=session_id,
+                                     client_id=request_client())
+        
+        dumps = current_app.json.dumps
         
-        # Include symptom analysis if available
-        if 'symptom_analysis' in result and result['symptom_analysis']['possible_conditions']:
-            response_data['symptom_analysis'] = result['symptom_analysis']
+        def generate():
+            for event, payload in events:
+                if event == 'triage':
+                    payload['session_id'] = session_id
+                if event == 'triage' and payload['emergency']:
+                    request_log.warning("Emergency detected: %s", payload['reasoning'])
+                yield f"event: {event}\ndata: {dumps(payload)}\n\n"
         
-        return jsonify(response_data)
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
         
     except ValueError as ve:
-        logger.error(f"Configuration error: {str(ve)}")
+        logger.error("Configuration error: %s", ve)
         return jsonify({
             'error': 'Configuration error. Please check your API key setup.',
             'status': 'error'
         }), 500
     except Exception as e:
-        logger.error(f"Error in chat endpoint: {str(e)}")
+        logger.error("Error in chat stream endpoint: %s", e)
         return jsonify({
             'error': 'Sorry, I encountered an error. Please try again.',
             'status': 'error'
         }), 500
 
-@main.route('/health-tips')
-def health_tips():
-    """Get health tips."""
+def job_error(error):
+    """Result body for a chat job that failed in the background."""
+    if isinstance(error, AdmissionRejected):
+        request_log.warning("Chat job rejected: %s", error.reason)
+        return {
+            'error': 'The service is busy. Please try again shortly.',
+            'retry_after': error.retry_after,
+            'status': 'busy'
+        }
+    if isinstance(error, RateLimited):
+        request_log.warning("Chat job rate limited: %s", error.limit)
+        return {
+            'error': 'Too many requests. Please try again shortly.',
+            'retry_after': error.retry_after,
+            'status': 'rate_limited'
+        }
+    logger.error("Error in chat job: %s", error)
+    return {
+        'error': 'Sorry, I encountered an error. Please try again.',
+        'status': 'error'
+    }
+
+@main.route('/chat/jobs', methods=['POST'])
+def create_chat_job():
+    """Triage a chat message now and generate the answer in the background."""
     try:
+        data = request.get_json()
+        user_message, error_response = validate_message(data)
+        if error_response:
+            return error_response
+        
         bot = get_chatbot()
-        tips = bot.get_health_tips()
+        session_id, error_response = request_session(data, bot)
+        if error_response:
+            return error_response
+        jobs = get_chat_jobs()
+        
+        with timed('job_triage'):
+            engines = bot.knowledge_base.engines
+            analysis = engines.analyzer.analyze(user_message)
+            triage_result = engines.safety.assess_urgency_from(analysis)
+            triage = {
+                'urgency': triage_result.urgency.value,
+                'risk_level': triage_result.risk.value,
+                'confidence': triage_result.confidence,
+                'reasoning': triage_result.reasoning,
+                'emergency': triage_result.urgency == UrgencyLevel.EMERGENCY,
+                'recommendations': triage_result.action_required,
+                'kb_version': engines.version
+            }
+        
+        use_cache = not data.get('no_cache', False)
+        if triage['emergency']:
+            # Emergencies never wait on the model: answer in full right away
+            result = bot.get_response(user_message, use_cache=use_cache, session_id=session_id)
+            job = jobs.complete(chat_payload(result, session_id))
+            return jsonify({**job.info(), 'triage': triage, 'session_id': session_id})
+        if bot.rate_limiter is not None:
+            # Charged at submission so a client cannot queue past its limit;
+            # the model quota is charged when the job reaches the model
+            bot.rate_limiter.check_client(request_client())
+        
+        deadline_seconds = current_app.config['MODEL_DEADLINE_SECONDS']
+        
+        def generate():
+            # The deadline covers the model call, not time spent queued for a worker
+            result = bot.get_response(user_message, use_cache=use_cache,
+                                      deadline=time.monotonic() + deadline_seconds, session_id=session_id)
+            if result.error:
+                raise RuntimeError(result.reasoning)
+            return chat_payload(result, session_id)
+        
+        job = jobs.submit(generate, job_error)
+        response = jsonify({**job.info(), 'triage': triage, 'session_id': session_id})
+        response.headers['Location'] = f'/chat/jobs/{job.job_id}'
+        return response, 202
+        
+    except JobQueueFull as e:
+        request_log.warning("Chat job rejected: queue full")
+        response = jsonify({
+            'error': 'The service is busy. Please try again shortly.',
+            'status': 'busy'
+        })
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 503
+    except RateLimited as rl:
+        return rate_limited_response(rl)
+    except ValueError as ve:
+        logger.error("Configuration error: %s", ve)
+        return jsonify({
+            'error': 'Configuration error. Please check your API key setup.',
+            'status': 'error'
+        }), 500
+    except Exception as e:
+        logger.error("Error in chat jobs endpoint: %s", e)
+        return jsonify({
+            'error': 'Sorry, I encountered an error. Please try again.',
+            'status': 'error'
+        }), 500
+
+@main.route('/chat/jobs/<job_id>')
+def get_chat_job(job_id):
+    """Fetch a chat job, long-polling up to ?wait= seconds for it to finish."""
+    try:
+        wait = float(request.args.get('wait', 0))
+    except ValueError:
+        return jsonify({'error': 'wait must be a number of seconds', 'status': 'error'}), 400
+    
+    job = get_chat_jobs().get(job_id, wait=wait)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job', 'status': 'error'}), 404
+    info = job.info()
+    return jsonify(info), 200 if 'result' in info else 202
+
+def parse_batch(data, max_items, max_chars):
+    """
+    Validate a batch triage request body.
+    
+    Returns:
+        Tuple: (items, None) when valid, otherwise (None, error response); items are
+        (id, message, error) triples with per-item validation errors
+    """
+    messages = data.get('messages') if isinstance(data, dict) else None
+    if not isinstance(messages, list) or not messages:
+        return None, (jsonify({'error': 'Provide a non-empty "messages" list', 'status': 'error'}), 400)
+    if len(messages) > max_items:
+        return None, (jsonify({
+            'error': f'Too many messages. Send at most {max_items} per batch.',
+            'limits': {'max_items': max_items, 'max_message_chars': max_chars},
+            'status': 'error'
+        }), 413)
+    
+    items = []
+    for entry in messages:
+        item_id, message = (entry.get('id'), entry.get('message')) if isinstance(entry, dict) else (None, entry)
+        if not isinstance(message, str) or not message.strip():
+            items.append((item_id, None, 'Message must be a non-empty string'))
+        elif len(message) > max_chars:
+            items.append((item_id, None, f'Message too long. Keep it under {max_chars} characters.'))
+        else:
+            items.append((item_id, message.strip(), None))
+    return items, None
+
+@main.route('/triage/batch', methods=['POST'])
+def triage_batch():
+    """Rule-based triage and symptom analysis for many messages; never calls the model."""
+    start = time.perf_counter()
+    max_items = current_app.config['TRIAGE_BATCH_MAX_ITEMS']
+    max_chars = current_app.config['TRIAGE_BATCH_MAX_MESSAGE_CHARS']
+    try:
+        items, error_response = parse_batch(request.get_json(silent=True), max_items, max_chars)
+        if error_response:
+            return error_response
+        
+        engines = get_knowledge_base().engines
+        valid = [message for _, message, error in items if error is None]
+        with timed('triage_batch'):
+            analyses = [engines.analyzer.analyze(message) for message in valid]
+            triage_results = engines.safety.assess_urgency_batch(valid, analyses)
+            symptom_results = engines.checker.analyze_symptoms_batch(valid, analyses)
+        
+        results = []
+        assessed = iter(zip(triage_results, symptom_results))
+        for index, (item_id, _, error) in enumerate(items):
+            entry = {'index': index} if item_id is None else {'index': index, 'id': item_id}
+            if error is not None:
+                entry['error'] = error
+            else:
+                triage, symptoms = next(assessed)
+                entry.update({
+                    'urgency': triage.urgency.value,
+                    'risk_level': triage.risk.value,
+                    'emergency': triage.urgency == UrgencyLevel.EMERGENCY,
+                    'confidence': triage.confidence,
+                    'reasoning': triage.reasoning,
+                    'recommendations': triage.action_required,
+                    'emergency_contacts': triage.emergency_contacts or [],
+                    'symptom_analysis': symptoms
+                })
+            results.append(entry)
+        
+        elapsed = time.perf_counter() - start
         return jsonify({
-            'tips': tips,
+            'results': results,
+            'count': len(results),
+            'errors': len(items) - len(valid),
+            'limits': {'max_items': max_items, 'max_message_chars': max_chars},
+            'kb_version': engines.version,
+            'timing': {
+                'total_ms': round(elapsed * 1000, 3),
+                'per_item_us': round(elapsed * 1e6 / len(items), 1)
+            },
             'status': 'success'
         })
     except Exception as e:
-        logger.error(f"Error getting health tips: {str(e)}")
+        logger.error("Error in batch triage endpoint: %s", e)
+        return jsonify({
+            'error': 'Sorry, I encountered an error. Please try again.',
+            'status': 'error'
+        }), 500
+
+@main.route('/health-tips')
+def health_tips():
+    """Get health tips."""
+    try:
+        # Static content precomputed at startup: never initialize the model client for it
+        tips = current_app.extensions['assets'].get('health_tips')
+        return tips.respond(f"public, max-age={current_app.config['HEALTH_TIPS_MAX_AGE']}")
+    except Exception as e:
+        logger.error("Error getting health tips: %s", e)
         return jsonify({
             'error': 'Unable to load health tips at this time.',
             'status': 'error'
         }), 500
+
+@main.route('/assets/<fingerprint>/<path:filename>')
+def asset(fingerprint, filename):
+    """Serve a precomputed static file; its fingerprinted URL can be cached forever."""
+    precomputed = current_app.extensions['assets'].asset(filename)
+    if precomputed is None:
+        return jsonify({'error': 'Not found', 'status': 'error'}), 404
+    # A stale fingerprint (e.g. a cached page from before a deploy) still gets the
+    # current file, just not with the immutable caching meant for the new URL
+    return precomputed.respond(IMMUTABLE if fingerprint == precomputed.fingerprint else 'no-cache')
+
+@main.route('/stats')
+def stats():
+    """Get cache, admission, rate limit and other component statistics."""
+    bot = chatbot
+    return jsonify({
+        'cache': bot.response_cache.stats() if bot and bot.response_cache else None,
+        'similar_answers': bot.similar_answers.stats() if bot and bot.similar_answers else None,
+        'admission': bot.admission.stats() if bot and bot.admission else None,
+        'coalescing': bot.single_flight.stats() if bot and bot.single_flight else None,
+        'model_guard': bot.model_guard.stats() if bot and bot.model_guard else None,
+        'knowledge_base': knowledge_base.stats() if knowledge_base else None,
+        'sessions': bot.sessions.stats() if bot and bot.sessions else None,
+        'assets': current_app.extensions['assets'].stats() if 'assets' in current_app.extensions else None,
+        'logging': log_pipeline.pipeline.stats() if log_pipeline.pipeline else None,
+        'chat_jobs': chat_jobs.stats() if chat_jobs else None,
+        'rate_limits': bot.rate_limiter.stats() if bot and bot.rate_limiter else None,
+        'status': 'success'
+    })
+
+@main.route('/metrics')
+def metrics():
+    """Expose latency histograms and counters in Prometheus text format."""
+    body = registry.render()
+    bot = chatbot
+    if bot and bot.response_cache:
+        body += render_gauges('chatbot_response_cache', 'Response cache statistics', 'stat',
+                              bot.response_cache.stats().items())
+    if bot and bot.similar_answers:
+        body += render_gauges('chatbot_similar_answers', 'Near-duplicate answer index statistics', 'stat',
+                              bot.similar_answers.stats().items())
+    if bot and bot.admission:
+        admission_stats = bot.admission.stats()
+        body += render_gauges('chatbot_admission_active', 'Model calls currently running', 'scope',
+                              [('all', admission_stats['active'])])
+        body += render_gauges('chatbot_admission_queue_depth', 'Requests waiting for a model slot', 'urgency',
+                              [(tier, data['queue_depth']) for tier, data in admission_stats['tiers'].items()])
+    if bot and bot.single_flight:
+        body += render_gauges('chatbot_coalescing', 'Request coalescing counters', 'stat',
+                              bot.single_flight.stats().items())
+    if bot and bot.sessions:
+        body += render_gauges('chatbot_sessions', 'Conversation session occupancy, compaction and eviction counters', 'stat',
+                              bot.sessions.stats().items())
+    if bot and bot.rate_limiter:
+        body += render_gauges('chatbot_rate_limits', 'Rate limit decisions in this worker and shared bucket occupancy', 'stat',
+                              bot.rate_limiter.stats().items())
+    if chat_jobs is not None:
+        body += render_gauges('chatbot_chat_jobs', 'Background chat job counts and queue occupancy', 'stat',
+                              chat_jobs.stats().items())
+    if log_pipeline.pipeline is not None:
+        body += render_gauges('chatbot_log_queue_depth', 'Log records waiting for the writer thread', 'scope',
+                              [('all', log_pipeline.pipeline.stats()['queue_depth'])])
+    if knowledge_base is not None:
+        body += render_gauges('chatbot_knowledge_base_info', 'Active knowledge base version (value is always 1)',
+                              'version', [(knowledge_base.version, 1)])
+    if bot and bot.model_guard:
+        guard_stats = bot.model_guard.stats()
+        body += render_gauges('chatbot_circuit_open', 'Whether the model circuit breaker is open (1) or half-open (0.5)', 'scope',
+                              [('model', {'closed': 0, 'half_open': 0.5, 'open': 1}[guard_stats.pop('breaker_state')])])
+        body += render_gauges('chatbot_model_guard', 'Model call timeout, failure and hedging counters', 'stat',
+                              guard_stats.items())
+    return Response(body, mimetype='text/plain; version=0.0.4')
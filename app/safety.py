@@ -3,10 +3,20 @@ Medical Safety and Triage System
 Implements emergency detection, risk assessment, and safety guardrails.
 """
 
+import copy
+import heapq
 import re
-from typing import Dict, List, Tuple
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from .fuzzy import FuzzyPhraseIndex
+from .knowledge_base import KnowledgeBase
+from .matcher import KeywordMatcher
+from .text_analysis import MessageAnalysis, SYMPTOM_TIER
+
+# Distinct matched keyword sets whose rendered emergency texts are kept
+EMERGENCY_RESPONSE_MEMO_SIZE = 1024
 
 class UrgencyLevel(Enum):
     """Medical urgency levels for triage."""
@@ -33,47 +43,22 @@ class TriageResult:
 class MedicalSafety:
     """Handles medical safety protocols and emergency detection."""
     
-    def __init__(self):
+    def __init__(self, knowledge_base: Optional[KnowledgeBase] = None):
+        """
+        Args:
+            knowledge_base (KnowledgeBase): Keyword tiers to use, defaults to the packaged data file
+        """
+        knowledge_base = knowledge_base or KnowledgeBase.builtin()
+        self.knowledge_base_version = knowledge_base.version
+        
         # Emergency keywords that require immediate medical attention
-        self.emergency_keywords = [
-            # Cardiac emergencies
-            'chest pain', 'heart attack', 'cardiac arrest', 'angina',
-            'severe chest pressure', 'crushing chest pain',
-            
-            # Breathing emergencies
-            'trouble breathing', 'shortness of breath', 'difficulty breathing',
-            'choking', 'wheezing severely', 'gasping for air',
-            
-            # Neurological emergencies
-            'stroke', 'seizure', 'unconscious', 'paralysis', 'facial drooping',
-            'severe headache with fever', 'sudden severe headache',
-            
-            # Mental health emergencies
-            'suicidal', 'suicide', 'kill myself', 'end my life', 'want to die',
-            'self harm', 'overdose', 'poisoning',
-            
-            # Severe injuries
-            'severe bleeding', 'broken bone', 'deep cut', 'head injury',
-            'spinal injury', 'severe burn',
-            
-            # Other emergencies
-            'allergic reaction', 'anaphylaxis', 'severe pain', 'fever over 103',
-            'vomiting blood', 'blood in stool', 'severe abdominal pain'
-        ]
+        self.emergency_keywords = list(knowledge_base.emergency_keywords)
         
         # High-risk keywords requiring urgent medical attention (24-48 hours)
-        self.urgent_keywords = [
-            'persistent fever', 'severe headache', 'vision problems',
-            'hearing loss', 'severe nausea', 'persistent vomiting',
-            'unusual bleeding', 'severe fatigue', 'weight loss',
-            'persistent cough', 'difficulty swallowing'
-        ]
+        self.urgent_keywords = list(knowledge_base.urgent_keywords)
         
         # Routine keywords for general health concerns
-        self.routine_keywords = [
-            'mild headache', 'common cold', 'minor cut', 'bruise',
-            'muscle soreness', 'mild fever', 'runny nose', 'sore throat'
-        ]
+        self.routine_keywords = list(knowledge_base.routine_keywords)
         
         # Emergency contact information
         self.emergency_contacts = {
@@ -85,6 +70,23 @@ class MedicalSafety:
             }
         }
 
+        # Rendered emergency/urgent texts by (urgency, action, reasoning), i.e. per matched keyword set
+        self._emergency_responses: Dict[Tuple[UrgencyLevel, str, str], str] = {}
+
+        self._build_keyword_matcher()
+
+    def _build_keyword_matcher(self):
+        """Compile the keyword tiers; call again after changing the keyword lists."""
+        # Compile every tier into a single automaton so triage is one pass
+        # over the message regardless of vocabulary size
+        self.keyword_matcher = KeywordMatcher({
+            UrgencyLevel.EMERGENCY.value: self.emergency_keywords,
+            UrgencyLevel.URGENT.value: self.urgent_keywords,
+            UrgencyLevel.ROUTINE.value: self.routine_keywords
+        })
+        # Typo-tolerant fallback for emergency phrases ("chest pian", "siezure")
+        self.fuzzy_emergency_matcher = FuzzyPhraseIndex(self.emergency_keywords)
+
     def assess_urgency(self, message: str) -> TriageResult:
         """
         Assess the urgency level of a medical query.
@@ -95,10 +97,46 @@ class MedicalSafety:
         Returns:
             TriageResult: Triage assessment with urgency level and recommendations
         """
-        message_lower = message.lower()
+        return self.assess_urgency_from(MessageAnalysis.from_text(message, self.keyword_matcher))
+
+    def assess_urgency_batch(self, messages: Sequence[str],
+                             analyses: Optional[Sequence[MessageAnalysis]] = None) -> List[TriageResult]:
+        """
+        Assess the urgency of many messages at once.
+        
+        Messages that are identical after lowercasing are assessed once and
+        share one TriageResult.
         
+        Args:
+            messages (Sequence[str]): User messages
+            analyses (Sequence[MessageAnalysis]): Optional pre-analyses aligned with ``messages``
+            
+        Returns:
+            List[TriageResult]: One assessment per message, in input order
+        """
+        if analyses is None:
+            analyses = [MessageAnalysis.from_text(message, self.keyword_matcher) for message in messages]
+        unique: Dict[str, TriageResult] = {}
+        results = []
+        for analysis in analyses:
+            result = unique.get(analysis.normalized)
+            if result is None:
+                result = unique[analysis.normalized] = self.assess_urgency_from(analysis)
+            results.append(result)
+        return results
+
+    def assess_urgency_from(self, analysis: MessageAnalysis) -> TriageResult:
+        """
+        Assess urgency from a message that has already been pre-analyzed.
+        
+        Args:
+            analysis (MessageAnalysis): Pre-analysis holding this system's keyword tiers
+            
+        Returns:
+            TriageResult: Triage assessment with urgency level and recommendations
+        """
         # Check for emergency keywords
-        emergency_matches = [kw for kw in self.emergency_keywords if kw in message_lower]
+        emergency_matches = analysis.terms(UrgencyLevel.EMERGENCY.value)
         if emergency_matches:
             return TriageResult(
                 urgency=UrgencyLevel.EMERGENCY,
@@ -109,8 +147,23 @@ class MedicalSafety:
                 emergency_contacts=["911", "988 (if mental health emergency)"]
             )
         
+        # Misspelled emergency phrases, looked up only among tokens no keyword matched exactly
+        fuzzy_matches = self.fuzzy_emergency_matcher.find(
+            analysis.normalized, [(m.start, m.end) for m in analysis.matches])
+        if fuzzy_matches:
+            found = ', '.join(f"{m.keyword} (as '{m.matched_text}', edit distance {m.distance})"
+                              for m in fuzzy_matches)
+            return TriageResult(
+                urgency=UrgencyLevel.EMERGENCY,
+                risk=RiskLevel.HIGH,
+                confidence=0.75,
+                reasoning=f"Possible emergency keywords detected (typo-tolerant match): {found}",
+                action_required="SEEK IMMEDIATE MEDICAL ATTENTION - Call 911 or go to the nearest emergency room",
+                emergency_contacts=["911", "988 (if mental health emergency)"]
+            )
+        
         # Check for urgent keywords
-        urgent_matches = [kw for kw in self.urgent_keywords if kw in message_lower]
+        urgent_matches = analysis.terms(UrgencyLevel.URGENT.value)
         if urgent_matches:
             return TriageResult(
                 urgency=UrgencyLevel.URGENT,
@@ -121,7 +174,7 @@ class MedicalSafety:
             )
         
         # Check for routine keywords
-        routine_matches = [kw for kw in self.routine_keywords if kw in message_lower]
+        routine_matches = analysis.terms(UrgencyLevel.ROUTINE.value)
         if routine_matches:
             return TriageResult(
                 urgency=UrgencyLevel.ROUTINE,
@@ -150,6 +203,18 @@ class MedicalSafety:
         Returns:
             str: Emergency response message
         """
+        if triage_result.urgency == UrgencyLevel.ROUTINE:
+            return None  # No emergency response needed
+        key = (triage_result.urgency, triage_result.action_required, triage_result.reasoning)
+        response = self._emergency_responses.get(key)
+        if response is None:
+            if len(self._emergency_responses) >= EMERGENCY_RESPONSE_MEMO_SIZE:
+                self._emergency_responses.clear()
+            response = self._emergency_responses[key] = self._render_emergency_response(triage_result)
+        return response
+
+    @staticmethod
+    def _render_emergency_response(triage_result: TriageResult) -> str:
         if triage_result.urgency == UrgencyLevel.EMERGENCY:
             return f"""
 🚨 MEDICAL EMERGENCY DETECTED 🚨
@@ -178,40 +243,35 @@ Your symptoms may require prompt medical evaluation. Please:
 
 Reasoning: {triage_result.reasoning}
             """
-        else:
-            return None  # No emergency response needed
 
 class SymptomChecker:
     """Provides symptom-to-condition matching with confidence scores."""
     
-    def __init__(self):
+    def __init__(self, knowledge_base: Optional[KnowledgeBase] = None):
+        """
+        Args:
+            knowledge_base (KnowledgeBase): Symptom patterns to use, defaults to the packaged data file
+        """
+        knowledge_base = knowledge_base or KnowledgeBase.builtin()
+        self.knowledge_base_version = knowledge_base.version
+        
         # Symptom patterns and their possible conditions
-        self.symptom_patterns = {
-            'flu_like': {
-                'symptoms': ['fever', 'headache', 'body aches', 'fatigue', 'chills'],
-                'conditions': [
-                    {'name': 'Influenza (Flu)', 'confidence': 0.8, 'reasoning': 'Classic flu symptoms include fever, headache, and body aches'},
-                    {'name': 'Common Cold', 'confidence': 0.6, 'reasoning': 'Similar symptoms but usually milder than flu'},
-                    {'name': 'COVID-19', 'confidence': 0.7, 'reasoning': 'Overlapping symptoms with flu, testing recommended'}
-                ]
-            },
-            'respiratory': {
-                'symptoms': ['cough', 'runny nose', 'sore throat', 'congestion'],
-                'conditions': [
-                    {'name': 'Upper Respiratory Infection', 'confidence': 0.8, 'reasoning': 'Common cold symptoms affecting upper respiratory tract'},
-                    {'name': 'Allergies', 'confidence': 0.6, 'reasoning': 'Seasonal allergies can cause similar symptoms'},
-                    {'name': 'Sinusitis', 'confidence': 0.7, 'reasoning': 'Sinus infection often presents with congestion and headache'}
-                ]
-            },
-            'digestive': {
-                'symptoms': ['nausea', 'vomiting', 'diarrhea', 'stomach pain'],
-                'conditions': [
-                    {'name': 'Gastroenteritis', 'confidence': 0.8, 'reasoning': 'Stomach flu commonly causes nausea, vomiting, and diarrhea'},
-                    {'name': 'Food Poisoning', 'confidence': 0.7, 'reasoning': 'Recent food consumption may be related to symptoms'},
-                    {'name': 'Viral Infection', 'confidence': 0.6, 'reasoning': 'Many viruses can cause digestive symptoms'}
-                ]
-            }
-        }
+        self.symptom_patterns = copy.deepcopy(knowledge_base.symptom_patterns)
+        
+        # Number of conditions reported per analysis
+        self.max_conditions = 3
+        
+        self._build_symptom_index()
+
+    def _build_symptom_index(self):
+        """Build the symptom -> pattern posting lists; call again after changing symptom_patterns."""
+        self.symptom_index: Dict[str, List[str]] = {}
+        for pattern_name, pattern_data in self.symptom_patterns.items():
+            for symptom in pattern_data['symptoms']:
+                self.symptom_index.setdefault(symptom, []).append(pattern_name)
+        
+        self._pattern_order = {name: i for i, name in enumerate(self.symptom_patterns)}
+        self.symptom_matcher = KeywordMatcher({SYMPTOM_TIER: list(self.symptom_index)})
 
     def analyze_symptoms(self, message: str) -> Dict:
         """
@@ -223,34 +283,85 @@ class SymptomChecker:
         Returns:
             Dict: Analysis results with possible conditions and reasoning
         """
-        message_lower = message.lower()
-        matched_conditions = []
+        return self.analyze_symptoms_from(MessageAnalysis.from_text(message, self.symptom_matcher))
+
+    def analyze_symptoms_batch(self, messages: Sequence[str],
+                               analyses: Optional[Sequence[MessageAnalysis]] = None) -> List[Dict]:
+        """
+        Analyze symptoms of many messages at once.
         
-        for pattern_name, pattern_data in self.symptom_patterns.items():
-            symptom_matches = sum(1 for symptom in pattern_data['symptoms'] if symptom in message_lower)
+        Messages that are identical after lowercasing are analyzed once and
+        share one result.
+        
+        Args:
+            messages (Sequence[str]): User symptom descriptions
+            analyses (Sequence[MessageAnalysis]): Optional pre-analyses aligned with ``messages``
             
-            if symptom_matches >= 2:  # At least 2 symptoms match
-                match_ratio = symptom_matches / len(pattern_data['symptoms'])
-                
-                for condition in pattern_data['conditions']:
-                    adjusted_confidence = condition['confidence'] * match_ratio
-                    matched_conditions.append({
-                        'condition': condition['name'],
-                        'confidence': round(adjusted_confidence, 2),
-                        'reasoning': condition['reasoning'],
-                        'matched_symptoms': symptom_matches,
-                        'total_symptoms': len(pattern_data['symptoms'])
-                    })
+        Returns:
+            List[Dict]: One analysis per message, in input order
+        """
+        if analyses is None:
+            analyses = [MessageAnalysis.from_text(message, self.symptom_matcher) for message in messages]
+        unique: Dict[str, Dict] = {}
+        results = []
+        for analysis in analyses:
+            result = unique.get(analysis.normalized)
+            if result is None:
+                result = unique[analysis.normalized] = self.analyze_symptoms_from(analysis)
+            results.append(result)
+        return results
+
+    def analyze_symptoms_from(self, analysis: MessageAnalysis) -> Dict:
+        """
+        Analyze symptoms of a message that has already been pre-analyzed.
         
-        # Sort by confidence
-        matched_conditions.sort(key=lambda x: x['confidence'], reverse=True)
+        Args:
+            analysis (MessageAnalysis): Pre-analysis holding this checker's symptom tier
+            
+        Returns:
+            Dict: Analysis results with possible conditions and reasoning
+        """
+        # Count symptom hits per pattern from the symptoms actually present
+        pattern_hits = Counter()
+        for symptom in analysis.terms(SYMPTOM_TIER):
+            pattern_hits.update(self.symptom_index[symptom])
+        
+        # Keep knowledge-base order so ties rank the same as a full scan
+        qualifying = sorted(
+            (name for name, hits in pattern_hits.items() if hits >= 2),  # At least 2 symptoms match
+            key=self._pattern_order.__getitem__
+        )
+        
+        total_matches = sum(len(self.symptom_patterns[name]['conditions']) for name in qualifying)
+        top_conditions = heapq.nlargest(
+            self.max_conditions,
+            self._score_conditions(qualifying, pattern_hits),
+            key=lambda x: x['confidence']
+        )
         
         return {
-            'possible_conditions': matched_conditions[:3],  # Top 3 matches
-            'total_matches': len(matched_conditions),
-            'analysis_confidence': 'high' if matched_conditions and matched_conditions[0]['confidence'] > 0.6 else 'moderate'
+            'possible_conditions': top_conditions,
+            'total_matches': total_matches,
+            'analysis_confidence': 'high' if top_conditions and top_conditions[0]['confidence'] > 0.6 else 'moderate'
         }
 
+    def _score_conditions(self, pattern_names: List[str], pattern_hits: Counter):
+        """Yield a scored condition entry for every condition of the given patterns."""
+        for pattern_name in pattern_names:
+            pattern_data = self.symptom_patterns[pattern_name]
+            symptom_matches = pattern_hits[pattern_name]
+            match_ratio = symptom_matches / len(pattern_data['symptoms'])
+            
+            for condition in pattern_data['conditions']:
+                adjusted_confidence = condition['confidence'] * match_ratio
+                yield {
+                    'condition': condition['name'],
+                    'confidence': round(adjusted_confidence, 2),
+                    'reasoning': condition['reasoning'],
+                    'matched_symptoms': symptom_matches,
+                    'total_symptoms': len(pattern_data['symptoms'])
+                }
+
     def generate_explanation(self, analysis: Dict) -> str:
         """
         Generate a clear explanation of the symptom analysis.
@@ -0,0 +1,62 @@
+"""
+JSON Serialization
+Flask JSON provider that serializes ChatResult objects directly and encodes
+with orjson when it is installed, falling back to the standard library.
+"""
+
+import json
+from typing import Any
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+from .results import ChatResult
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library encoder is used without it
+    orjson = None
+
+
+def _default(o: Any) -> Any:
+    if isinstance(o, ChatResult):
+        return o.to_json()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    DefaultJSONProvider with the same output values (dates, dataclasses,
+    sorted keys) that understands result types and skips the str round-trip.
+    """
+
+    default = staticmethod(_default)
+
+    if orjson is not None:
+        # Datetimes and dataclasses go through Flask's own conversions, as before
+        _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def _encode(self, obj: Any) -> bytes:
+        if orjson is not None:
+            options = self._OPTIONS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+            try:
+                return orjson.dumps(obj, default=_default, option=options)
+            except TypeError:
+                # Values orjson rejects (e.g. integers over 64 bits) still serialize below
+                pass
+        return json.dumps(obj, default=_default, sort_keys=self.sort_keys, ensure_ascii=self.ensure_ascii,
+                          separators=(',', ':')).encode('utf-8')
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            kwargs.setdefault('default', _default)
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj).decode('utf-8')
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        if self.compact is False or (self.compact is None and self._app.debug):
+            # Pretty-printed output keeps the stock path; create_app sets compact from
+            # JSON_PRETTY_PRINT, so debug mode alone does not turn the fast path off
+            return super().response(obj)
+        return self._app.response_class(self._encode(obj) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,240 @@
+"""
+Conversation Sessions
+Bounded in-process store of multi-turn chat history. Each session keeps a
+short ring of recent turns plus a compact summary of triage-relevant facts
+(symptoms reported, conditions considered, highest urgency); turns that no
+longer fit the token budget are folded into the summary.
+"""
+
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, Optional
+
+from .prompts import estimate_tokens
+
+# Lowest to highest, for tracking the most serious urgency seen in a session
+URGENCY_ORDER = ('routine', 'urgent', 'emergency')
+
+# Ids are 16 random bytes, urlsafe-base64 encoded without padding
+SESSION_ID_BYTES = 16
+SESSION_ID = re.compile(r'^[A-Za-z0-9_-]{22}$')
+
+# Rough fixed footprint of a session and of a turn beyond their text
+SESSION_OVERHEAD = 512
+TURN_OVERHEAD = 128
+
+
+def new_session_id() -> str:
+    """Generate an unguessable session id."""
+    return secrets.token_urlsafe(SESSION_ID_BYTES)
+
+
+def valid_session_id(session_id) -> bool:
+    """Whether ``session_id`` has the shape of an id from new_session_id()."""
+    return isinstance(session_id, str) and SESSION_ID.match(session_id) is not None
+
+
+def _remember(facts: "OrderedDict[str, None]", values: Iterable[str], limit: int) -> None:
+    """Add values as the most recent facts, keeping at most ``limit``."""
+    for value in values:
+        facts.pop(value, None)
+        facts[value] = None
+    while len(facts) > limit:
+        facts.popitem(last=False)
+
+
+@dataclass(frozen=True)
+class Turn:
+    """One exchange kept verbatim (the reply possibly shortened)."""
+    user: str
+    reply: str
+    urgency: str
+    tokens: int
+
+
+class Session:
+    """History of one conversation; guarded by the owning store's lock."""
+
+    def __init__(self, session_id: str, now: float):
+        self.session_id = session_id
+        self.turns: Deque[Turn] = deque()
+        self.history_tokens = 0
+        self.symptoms: "OrderedDict[str, None]" = OrderedDict()
+        self.conditions: "OrderedDict[str, None]" = OrderedDict()
+        self.highest_urgency: Optional[str] = None
+        self.compacted_turns = 0
+        self.last_seen = now
+        self.size = SESSION_OVERHEAD
+
+    def _recompute_size(self) -> None:
+        self.size = (SESSION_OVERHEAD
+                     + sum(TURN_OVERHEAD + len(t.user) + len(t.reply) for t in self.turns)
+                     + sum(len(s) for s in self.symptoms) + sum(len(c) for c in self.conditions))
+
+    def context(self) -> str:
+        """Render the summary and recent turns as prompt lines, or '' for a new session."""
+        if not self.turns and not self.compacted_turns:
+            return ''
+        facts = [f"{self.compacted_turns + len(self.turns)} earlier turns"]
+        if self.symptoms:
+            facts.append('symptoms reported: ' + ', '.join(self.symptoms))
+        if self.conditions:
+            facts.append('conditions considered: ' + ', '.join(self.conditions))
+        if self.highest_urgency:
+            facts.append(f"highest urgency: {self.highest_urgency}")
+        lines = ['CONVERSATION: ' + '; '.join(facts)]
+        for turn in self.turns:
+            lines.append(f"EARLIER USER: {turn.user}")
+            lines.append(f"EARLIER ASSISTANT: {turn.reply}")
+        return '\n'.join(lines)
+
+
+class SessionStore:
+    """Thread-safe LRU store of conversation sessions bounded by count, bytes and idle time."""
+
+    def __init__(self, max_sessions: int = 10000, max_bytes: int = 16 * 1024 * 1024,
+                 idle_timeout: float = 1800.0, max_turns: int = 6,
+                 history_token_budget: int = 300, max_facts: int = 12, reply_chars: int = 280):
+        """
+        Args:
+            max_sessions (int): Maximum number of live sessions
+            max_bytes (int): Maximum estimated size of all sessions
+            idle_timeout (float): Seconds without a message before a session is dropped
+            max_turns (int): Recent turns kept verbatim per session
+            history_token_budget (int): Estimated prompt tokens the verbatim turns may use;
+                older turns are compacted into the summary beyond it (the latest turn is always kept)
+            max_facts (int): Symptoms and conditions each kept in the summary
+            reply_chars (int): Characters of each assistant reply kept for context
+        """
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_timeout = idle_timeout
+        self.max_turns = max_turns
+        self.history_token_budget = history_token_budget
+        self.max_facts = max_facts
+        self.reply_chars = reply_chars
+
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.compactions = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def context(self, session_id: str) -> str:
+        """Prompt context for ``session_id``, or '' if the session is new or expired."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                return ''
+            self._sessions.move_to_end(session_id)
+            session.last_seen = now
+            return session.context()
+
+    def active(self, session_id: str) -> bool:
+        """Whether ``session_id`` is a live session (one that has recorded a turn and not expired)."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return session_id in self._sessions
+
+    def record(self, session_id: str, user_message: str, reply: str, urgency: str,
+               symptoms: Iterable[str] = (), conditions: Iterable[str] = ()) -> None:
+        """
+        Append a turn to the session, creating it if needed.
+
+        Args:
+            session_id (str): Session id issued by new_session_id()
+            user_message (str): The user's message
+            reply (str): The answer sent back
+            urgency (str): Triage urgency of the message
+            symptoms (Iterable[str]): Symptom terms found in the message
+            conditions (Iterable[str]): Possible conditions suggested for it
+        """
+        if self.max_sessions <= 0:
+            return
+        now = time.monotonic()
+        reply = ' '.join(reply.split())
+        if len(reply) > self.reply_chars:
+            reply = reply[:self.reply_chars].rstrip() + '…'
+        turn = Turn(user_message, reply, urgency, estimate_tokens(user_message) + estimate_tokens(reply))
+
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Session(session_id, now)
+                self._bytes += session.size
+                self.created += 1
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_seen = now
+
+            session.turns.append(turn)
+            session.history_tokens += turn.tokens
+            _remember(session.symptoms, symptoms, self.max_facts)
+            _remember(session.conditions, conditions, self.max_facts)
+            if urgency in URGENCY_ORDER and (session.highest_urgency is None or
+                                             URGENCY_ORDER.index(urgency) > URGENCY_ORDER.index(session.highest_urgency)):
+                session.highest_urgency = urgency
+
+            # Facts are already in the summary, so compacting just drops the verbatim text.
+            # The latest turn always stays; it is bounded by the message limit and reply_chars.
+            while len(session.turns) > 1 and (len(session.turns) > self.max_turns
+                                              or session.history_tokens > self.history_token_budget):
+                session.history_tokens -= session.turns.popleft().tokens
+                session.compacted_turns += 1
+                self.compactions += 1
+
+            self._bytes -= session.size
+            session._recompute_size()
+            self._bytes += session.size
+
+            while len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes:
+                _, evicted = self._sessions.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def drop(self, session_id: str) -> bool:
+        """Forget a session; returns whether it existed."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                return False
+            self._bytes -= session.size
+            return True
+
+    def clear(self) -> None:
+        """Drop every session."""
+        with self._lock:
+            self._sessions.clear()
+            self._bytes = 0
+
+    def _expire(self, now: float) -> None:
+        # Least recently used first, so the sweep stops at the first live session
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_seen < self.idle_timeout:
+                break
+            self._sessions.popitem(last=False)
+            self._bytes -= session.size
+            self.expirations += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Get session occupancy and compaction/eviction counters."""
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'bytes': self._bytes,
+                'created': self.created,
+                'compactions': self.compactions,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
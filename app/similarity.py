@@ -0,0 +1,282 @@
+"""
+Near-Duplicate Answer Index
+MinHash signatures with LSH banding over normalized message shingles, so a
+rewording of a previously answered question ("I've got a fever and
+headache" / "I have a headache and a fever") can reuse its answer. Questions
+that differ in a negation or in who, which drug or which body part they are
+about are never treated as the same question.
+"""
+
+import hashlib
+import re
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Function words and conversational filler that carry no medical meaning
+STOP_WORDS = frozenset("""
+a about after all also am an and any are as at be been but by can could did do does doing for from
+get getting got had has have having he her him his how i i'm i've im in is it it's its ive just kind
+me my of on or our really she since so some sort still that the their them then there these they
+this to too very was we were what when where which while who why will with would you your
+""".split())
+
+# Words that change what a question asks however similar the rest is ("with" vs "without
+# food", "my dog" vs "my child", "water" vs "alcohol"); answers are only shared between
+# questions with exactly the same ones
+NEGATION_WORDS = frozenset("""
+no not never without none nor cannot can't cant don't dont doesn't doesnt didn't didnt isn't isnt
+aren't arent wasn't wasnt weren't won't wont shouldn't shouldnt wouldn't couldn't haven't hasn't
+hadn't avoid instead
+""".split())
+
+SUBJECT_WORDS = frozenset("""
+child children kid kids baby babies infant newborn toddler teen teenager son daughter boy girl
+mother mom father dad parent husband wife partner grandmother grandfather grandma grandpa elderly
+adult man woman pregnant pregnancy breastfeeding nursing dog dogs puppy cat cats kitten pet
+""".split())
+
+SUBSTANCE_WORDS = frozenset("""
+aspirin ibuprofen advil motrin tylenol acetaminophen paracetamol naproxen aleve excedrin
+antibiotic antibiotics amoxicillin penicillin azithromycin doxycycline antihistamine benadryl
+diphenhydramine claritin loratadine zyrtec cetirizine allegra sudafed pseudoephedrine
+decongestant dayquil nyquil mucinex codeine tramadol oxycodone morphine opioid opioids
+insulin metformin statin statins lisinopril warfarin thinners prednisone steroid steroids
+antidepressant antidepressants sertraline zoloft fluoxetine prozac xanax melatonin
+contraceptive contraceptives pill pills vaccine vaccines supplement supplements vitamin vitamins
+iron zinc alcohol beer wine caffeine coffee tea nicotine cigarettes smoking vaping cannabis
+marijuana water milk juice sugar salt
+""".split())
+
+BODY_PART_WORDS = frozenset("""
+head face eye eyes ear ears nose mouth tooth teeth gum gums tongue throat neck shoulder shoulders
+arm arms elbow wrist hand hands finger fingers chest breast breasts heart lung lungs back spine
+stomach belly abdomen liver kidney kidneys bladder bowel hip hips groin leg legs thigh knee knees
+ankle ankles foot feet toe toes skin scalp hair nail nails joint joints muscle muscles bone bones
+""".split())
+
+ANCHOR_WORDS = NEGATION_WORDS | SUBJECT_WORDS | SUBSTANCE_WORDS | BODY_PART_WORDS
+
+_MAX_HASH = (1 << 32) - 1
+
+# Distinct features whose hashes are memoized
+MEMO_SIZE = 65536
+
+
+def shingles(text: str, extra: Iterable[str] = ()) -> FrozenSet[str]:
+    """
+    Order-insensitive features of a message: its content words plus ``extra`` terms.
+
+    Args:
+        text (str): Message text
+        extra (Iterable[str]): Additional features, e.g. multi-word symptom terms found in it
+    """
+    words = {w.strip("'") for w in _WORD.findall(text.lower())}
+    return frozenset(w for w in words if w and w not in STOP_WORDS) | frozenset(extra)
+
+
+def anchors(features: FrozenSet[str]) -> FrozenSet[str]:
+    """Negation, subject, substance and body-part words among ``features``; must match exactly to share an answer."""
+    return features & ANCHOR_WORDS
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """
+    MinHash signatures from one extendable-output hash per feature.
+
+    Each feature's shake_128 digest is split into ``num_perm`` independent
+    32-bit hash values, so a signature is an element-wise minimum computed in C.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        self.num_perm = num_perm
+        self._seed = seed.to_bytes(8, 'little')
+        self._unpack = struct.Struct(f'<{num_perm}I').unpack
+        # Feature vocabularies are small and repetitive, so per-feature hashes are memoized
+        self._memo: Dict[str, Tuple[int, ...]] = {}
+
+    def _hashes(self, feature: str) -> Tuple[int, ...]:
+        hashes = self._memo.get(feature)
+        if hashes is None:
+            digest = hashlib.shake_128(self._seed + feature.encode('utf-8')).digest(4 * self.num_perm)
+            hashes = self._unpack(digest)
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[feature] = hashes
+        return hashes
+
+    def signature(self, features: Iterable[str]) -> Tuple[int, ...]:
+        rows = [self._hashes(f) for f in features]
+        if not rows:
+            return (_MAX_HASH,) * self.num_perm
+        if len(rows) == 1:
+            return rows[0]
+        return tuple(map(min, *rows))
+
+
+class _Entry:
+    __slots__ = ('features', 'answer', 'bucket_keys', 'expires_at')
+
+    def __init__(self, features, answer, bucket_keys, expires_at):
+        self.features = features
+        self.answer = answer
+        self.bucket_keys = bucket_keys
+        self.expires_at = expires_at
+
+
+class SimilarAnswerIndex:
+    """
+    Thread-safe bounded index of answers, looked up by approximate Jaccard similarity.
+
+    Entries are partitioned by a caller-supplied key (e.g. urgency and matched
+    symptom pattern) and by their anchor words, so only answers given under the
+    same triage outcome to a question about the same people, drugs and body
+    parts, with the same negations, can be reused. LSH bands narrow each lookup to a handful of candidates, whose
+    exact feature similarity is then checked against the threshold.
+    """
+
+    def __init__(self, threshold: float = 0.85, max_entries: int = 2048, ttl: float = 600.0,
+                 num_perm: int = 64, bands: int = 32, max_candidates: int = 32):
+        """
+        Args:
+            threshold (float): Minimum Jaccard similarity to reuse an answer
+            max_entries (int): Maximum number of stored answers (least recently used evicted)
+            ttl (float): Seconds an answer stays reusable after being stored
+            num_perm (int): MinHash signature length
+            bands (int): LSH bands; ``num_perm`` must divide evenly into them. More bands
+                find lower-similarity candidates at the cost of more bucket lookups
+            max_candidates (int): Upper bound on candidates verified per lookup
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_candidates = max_candidates
+        self.hasher = MinHasher(num_perm)
+
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        # Each bucket is an insertion-ordered set of entry ids
+        self._buckets: Dict[Hashable, Dict[int, None]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.candidates_checked = 0
+
+    def _bucket_keys(self, partition: Hashable, features: FrozenSet[str]) -> List[Hashable]:
+        signature = self.hasher.signature(features)
+        rows = self.rows
+        partition = (partition, anchors(features))
+        return [(partition, band, signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def lookup(self, partition: Hashable, features: FrozenSet[str]) -> Optional[Tuple[str, float]]:
+        """
+        Find a stored answer similar to ``features`` within ``partition``.
+
+        Returns:
+            Optional[Tuple[str, float]]: The answer and its similarity, or None
+        """
+        if not features:
+            return None
+        bucket_keys = self._bucket_keys(partition, features)
+        now = time.monotonic()
+        best, best_similarity = None, 0.0
+        with self._lock:
+            seen = set()
+            for key in bucket_keys:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    continue
+                # Newest first
+                for entry_id in reversed(bucket):
+                    if entry_id in seen:
+                        continue
+                    if len(seen) >= self.max_candidates:
+                        break
+                    seen.add(entry_id)
+                    entry = self._entries[entry_id]
+                    if entry.expires_at <= now:
+                        continue
+                    similarity = jaccard(features, entry.features)
+                    if similarity > best_similarity:
+                        best, best_similarity = entry_id, similarity
+            self.candidates_checked += len(seen)
+
+            if best is None or best_similarity < self.threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best)
+            self.hits += 1
+            return self._entries[best].answer, best_similarity
+
+    def add(self, partition: Hashable, features: FrozenSet[str], answer: str) -> None:
+        """Store ``answer`` for a message with ``features`` under ``partition``."""
+        if self.max_entries <= 0 or not features:
+            return
+        bucket_keys = self._bucket_keys(partition, features)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(features, answer, bucket_keys, now + self.ttl)
+            for key in bucket_keys:
+                self._buckets.setdefault(key, {})[entry_id] = None
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every stored answer."""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def _expire(self, now: float) -> None:
+        # Entries expire in insertion order but are reordered by hits, so only
+        # sweep the cold end until the first live one
+        while self._entries:
+            entry_id, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            self._remove(entry_id)
+            self.expirations += 1
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        for key in entry.bucket_keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.pop(entry_id, None)
+                if not bucket:
+                    del self._buckets[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Get index occupancy and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'buckets': len(self._buckets),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'candidates_checked': self.candidates_checked
+            }
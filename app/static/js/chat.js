@@ -11,6 +11,9 @@ class AdvancedMedicalChatbot {
         this.clearButton = document.getElementById('clearChat');
         this.showFeaturesButton = document.getElementById('showFeatures');
         
+        // Conversation session, assigned by the server on the first reply
+        this.sessionId = null;
+        
         // Check if required elements exist
         if (!this.messageInput || !this.sendButton || !this.chatMessages) {
             console.error('Required DOM elements not found:', {
@@ -189,7 +192,7 @@ class AdvancedMedicalChatbot {
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify({ message: message })
+                body: JSON.stringify(this.sessionId ? { message: message, session_id: this.sessionId } : { message: message })
             });
             
             const response = await Promise.race([fetchPromise, timeoutPromise]);
@@ -202,6 +205,9 @@ class AdvancedMedicalChatbot {
             
             const data = await response.json();
             console.log('Response data:', data);
+            if (data.session_id) {
+                this.sessionId = data.session_id;
+            }
             this.addDebugMessage && this.addDebugMessage(`Data received, emergency: ${data.emergency}`);
             
             const responseTime = ((Date.now() - startTime) / 1000).toFixed(2);
@@ -526,6 +532,9 @@ class AdvancedMedicalChatbot {
     }
     
     clearChat() {
+        // Start a fresh conversation on the server too
+        this.sessionId = null;
+        
         // Keep only the initial bot message
         const initialMessage = this.chatMessages.querySelector('.message.bot-message');
         this.chatMessages.innerHTML = '';
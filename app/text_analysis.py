@@ -0,0 +1,69 @@
+"""
+Message Pre-Analysis
+Normalizes a message and finds every recognized medical term once per
+request, so triage, symptom analysis and caching share a single scan.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List, Tuple
+
+from .matcher import KeywordMatch, KeywordMatcher
+
+_TOKEN = re.compile(r'\w+')
+
+SYMPTOM_TIER = 'symptom'
+
+
+@dataclass
+class MessageAnalysis:
+    """Normalized text, token offsets and recognized terms of one message."""
+    text: str
+    normalized: str
+    matches: List[KeywordMatch] = field(default_factory=list)
+
+    @classmethod
+    def from_text(cls, message: str, matcher: KeywordMatcher) -> 'MessageAnalysis':
+        """Lowercase ``message`` and scan it once with ``matcher``."""
+        normalized = message.lower()
+        return cls(text=message, normalized=normalized, matches=matcher.find_all(normalized))
+
+    @cached_property
+    def tokens(self) -> List[Tuple[int, int]]:
+        """Start/end offsets of word tokens in the normalized text."""
+        return [m.span() for m in _TOKEN.finditer(self.normalized)]
+
+    @cached_property
+    def cache_text(self) -> str:
+        """Whitespace-collapsed normalized text, used for cache keys."""
+        return ' '.join(self.normalized.split())
+
+    @cached_property
+    def _terms_by_tier(self) -> Dict[str, List[str]]:
+        found: Dict[str, Dict[int, str]] = {}
+        for match in self.matches:
+            found.setdefault(match.tier, {})[match.index] = match.keyword
+        return {tier: [terms[i] for i in sorted(terms)] for tier, terms in found.items()}
+
+    def terms(self, tier: str) -> List[str]:
+        """Distinct terms matched in ``tier``, in vocabulary order."""
+        return self._terms_by_tier.get(tier, [])
+
+
+class TextAnalyzer:
+    """Joint matcher over triage keyword tiers and the symptom vocabulary."""
+
+    def __init__(self, safety_system, symptom_checker):
+        """
+        Args:
+            safety_system (MedicalSafety): Supplies the emergency/urgent/routine tiers
+            symptom_checker (SymptomChecker): Supplies the symptom vocabulary
+        """
+        tiers = dict(safety_system.keyword_matcher.tiers)
+        tiers[SYMPTOM_TIER] = symptom_checker.symptom_matcher.tiers[SYMPTOM_TIER]
+        self.matcher = KeywordMatcher(tiers)
+
+    def analyze(self, message: str) -> MessageAnalysis:
+        """Pre-analyze a message for every engine in a single pass."""
+        return MessageAnalysis.from_text(message, self.matcher)
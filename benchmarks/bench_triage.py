@@ -0,0 +1,226 @@
+"""
+Triage Engine Benchmarks
+Microbenchmarks for MedicalSafety and SymptomChecker over synthetic message
+corpora, with vocabularies grown from the built-in lists up to 10k terms.
+
+Usage:
+    python -m benchmarks.bench_triage --output bench.json
+    python -m benchmarks.bench_triage --compare baseline.json --threshold 0.10
+"""
+
+import argparse
+import json
+import platform
+import random
+import string
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence
+
+from app.safety import MedicalSafety, SymptomChecker, UrgencyLevel
+
+DEFAULT_VOCAB_SIZES = (0, 1000, 5000, 10000)  # 0 = today's built-in lists
+
+FILLER_WORDS = [
+    'i', 'have', 'had', 'a', 'my', 'the', 'since', 'yesterday', 'and', 'really',
+    'bad', 'for', 'two', 'days', 'it', 'is', 'getting', 'worse', 'after', 'eating',
+    'what', 'should', 'do', 'about', 'some', 'kind', 'of', 'mild', 'morning', 'night'
+]
+
+
+@dataclass(frozen=True)
+class CorpusProfile:
+    """Shape of a synthetic message corpus."""
+    name: str
+    words: int  # Words per message
+    density: float  # Probability that a word slot holds a keyword
+    tier_mix: Sequence[float]  # Weights for emergency, urgent, routine keywords
+
+
+PROFILES = (
+    CorpusProfile('short_sparse', words=8, density=0.1, tier_mix=(0.05, 0.25, 0.7)),
+    CorpusProfile('long_sparse', words=120, density=0.05, tier_mix=(0.05, 0.25, 0.7)),
+    CorpusProfile('long_dense', words=120, density=0.3, tier_mix=(0.2, 0.4, 0.4)),
+    CorpusProfile('emergency_heavy', words=20, density=0.3, tier_mix=(0.8, 0.1, 0.1)),
+)
+
+
+def _synthetic_term(rng: random.Random) -> str:
+    """A made-up one to three word term that never collides with real keywords."""
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+             for _ in range(rng.randint(1, 3))]
+    return 'zq' + ' '.join(words)
+
+
+def grow_vocabulary(safety: MedicalSafety, checker: SymptomChecker, size: int,
+                    rng: random.Random) -> None:
+    """
+    Extend keyword lists and symptom patterns with synthetic terms.
+
+    Args:
+        safety (MedicalSafety): Instance whose keyword tiers are extended
+        checker (SymptomChecker): Instance whose symptom patterns are extended
+        size (int): Target total keyword count across tiers (0 keeps the built-ins)
+        rng (random.Random): Source of randomness
+    """
+    tiers = [safety.emergency_keywords, safety.urgent_keywords, safety.routine_keywords]
+    current = sum(len(tier) for tier in tiers)
+    for i in range(max(0, size - current)):
+        tiers[i % 3].append(_synthetic_term(rng))
+    safety._build_keyword_matcher()
+
+    symptom_count = sum(len(p['symptoms']) for p in checker.symptom_patterns.values())
+    pattern_id = 0
+    while symptom_count < size:
+        symptoms = [_synthetic_term(rng) for _ in range(rng.randint(3, 6))]
+        checker.symptom_patterns[f'synthetic_{pattern_id}'] = {
+            'symptoms': symptoms,
+            'conditions': [
+                {'name': f'Synthetic Condition {pattern_id}.{j}', 'confidence': round(rng.uniform(0.4, 0.9), 2),
+                 'reasoning': 'Synthetic benchmark pattern'}
+                for j in range(3)
+            ]
+        }
+        symptom_count += len(symptoms)
+        pattern_id += 1
+    checker._build_symptom_index()
+
+
+def generate_corpus(safety: MedicalSafety, checker: SymptomChecker, profile: CorpusProfile,
+                    count: int, rng: random.Random) -> List[str]:
+    """Generate ``count`` messages following a corpus profile."""
+    tiers = [safety.emergency_keywords, safety.urgent_keywords, safety.routine_keywords]
+    symptoms = list(checker.symptom_index)
+    messages = []
+    for _ in range(count):
+        words = []
+        for _ in range(profile.words):
+            roll = rng.random()
+            if roll < profile.density:
+                tier = rng.choices(tiers, weights=profile.tier_mix)[0]
+                words.append(rng.choice(tier))
+            elif roll < profile.density * 2:
+                words.append(rng.choice(symptoms))
+            else:
+                words.append(rng.choice(FILLER_WORDS))
+        messages.append(' '.join(words))
+    return messages
+
+
+def measure(func: Callable, inputs: Sequence, repeat: int) -> Dict[str, float]:
+    """Time ``func`` over every input ``repeat`` times and summarize per-call cost."""
+    samples = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter_ns()
+            func(item)
+            samples.append(time.perf_counter_ns() - start)
+    samples.sort()
+    total_seconds = sum(samples) / 1e9
+    return {
+        'calls': len(samples),
+        'ops_per_sec': round(len(samples) / total_seconds, 1) if total_seconds else 0.0,
+        'mean_us': round(sum(samples) / len(samples) / 1000, 3),
+        'p50_us': round(samples[len(samples) // 2] / 1000, 3),
+        'p95_us': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] / 1000, 3),
+    }
+
+
+def run_suite(vocab_sizes: Sequence[int], messages: int, repeat: int, seed: int) -> Dict:
+    """Run every benchmark for each vocabulary size and corpus profile."""
+    results = {}
+    for size in vocab_sizes:
+        rng = random.Random(seed)
+        safety = MedicalSafety()
+        checker = SymptomChecker()
+        grow_vocabulary(safety, checker, size, rng)
+        label_size = size or 'builtin'
+
+        for profile in PROFILES:
+            corpus = generate_corpus(safety, checker, profile, messages, rng)
+            triage = [safety.assess_urgency(m) for m in corpus]
+            analyses = [checker.analyze_symptoms(m) for m in corpus]
+            flagged = [t for t in triage if t.urgency != UrgencyLevel.ROUTINE] or triage
+
+            benchmarks = {
+                'assess_urgency': (safety.assess_urgency, corpus),
+                'analyze_symptoms': (checker.analyze_symptoms, corpus),
+                'generate_explanation': (checker.generate_explanation, analyses),
+                'get_emergency_response': (safety.get_emergency_response, flagged),
+            }
+            for name, (func, inputs) in benchmarks.items():
+                key = f'{name}[vocab={label_size},corpus={profile.name}]'
+                results[key] = measure(func, inputs, repeat)
+                print(f"{key:<70} {results[key]['ops_per_sec']:>12,.0f} ops/s "
+                      f"p95 {results[key]['p95_us']:>9.2f}us", file=sys.stderr)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'messages': messages,
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Find benchmarks whose throughput dropped more than ``threshold`` vs. the baseline.
+
+    Returns:
+        List[str]: Human-readable regression descriptions
+    """
+    regressions = []
+    for key, base in baseline['results'].items():
+        result = current['results'].get(key)
+        if result is None or not base['ops_per_sec']:
+            continue
+        change = result['ops_per_sec'] / base['ops_per_sec'] - 1
+        if change < -threshold:
+            regressions.append(f'{key}: {base["ops_per_sec"]:,.0f} -> {result["ops_per_sec"]:,.0f} ops/s '
+                               f'({change:+.1%})')
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the triage engine.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_VOCAB_SIZES),
+                        help='Vocabulary sizes to benchmark (0 = built-in lists)')
+    parser.add_argument('--messages', type=int, default=500, help='Messages per corpus')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over each corpus')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results JSON to this path')
+    parser.add_argument('--compare', metavar='BASELINE', help='Baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Allowed fractional throughput drop before flagging a regression')
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.sizes, args.messages, args.repeat, args.seed)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for line in regressions:
+            print(f'REGRESSION {line}', file=sys.stderr)
+        if regressions:
+            return 1
+        print(f'No regressions beyond {args.threshold:.0%}', file=sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
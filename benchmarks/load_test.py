@@ -0,0 +1,395 @@
+"""
+End-to-End Load Test
+Starts the app under gunicorn (or a threaded werkzeug server) with the model
+replaced by the in-process stub backend, drives a weighted mix of scenarios
+at fixed open-loop arrival rates, and reports throughput, latency
+percentiles and error rates per route and urgency.
+
+Arrivals are scheduled independently of responses, and latency is measured
+from each request's scheduled start, so a saturated server shows up as
+growing latency instead of silently lowering the offered load.
+
+Usage:
+    python -m benchmarks.load_test --rates 20 50 100 --duration 30 --workers 4 --threads 8
+    python -m benchmarks.load_test --latency-ms 800 --jitter-ms 400 --error-rate 0.02 --output load.json
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --rates 50   # an already running server
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One kind of request in the load mix."""
+    name: str
+    method: str
+    path: str
+    urgency: str  # Expected triage outcome, used when the response does not report one
+    messages: Sequence[str] = ()
+
+
+SCENARIOS = (
+    Scenario('routine_chat', 'POST', '/chat', 'routine', (
+        'How much water should I drink every day?',
+        'I have a mild headache and a runny nose',
+        'What can I do about trouble sleeping?',
+        'I have a sore throat and feel tired',
+        'Is it normal to feel bloated after eating?',
+    )),
+    Scenario('urgent_chat', 'POST', '/chat', 'urgent', (
+        'I have had a persistent fever for three days',
+        'I have a persistent cough that keeps me up at night',
+        'I have a severe headache and vision problems since this morning',
+    )),
+    Scenario('emergency_chat', 'POST', '/chat', 'emergency', (
+        'I have crushing chest pain spreading to my arm',
+        "My father can't breathe and his lips are blue",
+        'I think I am having a stroke, my face is drooping',
+    )),
+    Scenario('health_tips', 'GET', '/health-tips', 'none'),
+)
+
+DEFAULT_MIX = 'routine_chat=60,urgent_chat=15,emergency_chat=5,health_tips=20'
+
+
+@dataclass
+class Sample:
+    """Outcome of one request."""
+    scenario: str
+    route: str
+    urgency: str
+    status: int  # 0 when no HTTP response was received
+    scheduled: float  # perf_counter() time the request was due to start
+    finished: float  # perf_counter() time the response (or failure) ended
+    error: Optional[str] = None
+
+    @property
+    def latency(self) -> float:
+        return self.finished - self.scheduled
+
+
+def parse_mix(spec: str, scenarios: Sequence[Scenario] = SCENARIOS) -> Dict[str, float]:
+    """Parse "routine_chat=60,health_tips=20" into scenario weights."""
+    known = {s.name for s in scenarios}
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, weight = item.partition('=')
+        if name not in known:
+            raise ValueError(f"Unknown scenario: {name} (choose from {', '.join(sorted(known))})")
+        weights[name] = float(weight)
+    if not any(weights.values()):
+        raise ValueError("The scenario mix needs at least one positive weight")
+    return weights
+
+
+class Client:
+    """Keep-alive HTTP connections, one per driver thread."""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, body: Optional[bytes]) -> tuple:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            return response.status, response.read()
+        except Exception:
+            # Never reuse a connection in an unknown state
+            conn.close()
+            self._local.conn = None
+            raise
+
+
+def fire(client: Client, scenario: Scenario, message: Optional[str], scheduled: float,
+         no_cache: bool) -> Sample:
+    """Send one request and record its outcome, timed from ``scheduled``."""
+    body = None
+    if message is not None:
+        body = json.dumps({'message': message, 'no_cache': no_cache}).encode('utf-8')
+    urgency = scenario.urgency
+    try:
+        status, payload = client.request(scenario.method, scenario.path, body)
+    except Exception as e:
+        return Sample(scenario.name, scenario.path, urgency, 0, scheduled, time.perf_counter(),
+                      type(e).__name__)
+    finished = time.perf_counter()
+    if message is not None and status == 200:
+        try:
+            urgency = json.loads(payload).get('urgency', urgency)
+        except ValueError:
+            pass
+    error = None if status < 400 else f'HTTP {status}'
+    return Sample(scenario.name, scenario.path, urgency, status, scheduled, finished, error)
+
+
+def run_rate(base_url: str, rate: float, duration: float, weights: Dict[str, float],
+             scenarios: Sequence[Scenario] = SCENARIOS, arrivals: str = 'fixed',
+             max_in_flight: int = 256, request_timeout: float = 60.0, no_cache: bool = False,
+             seed: int = 42) -> List[Sample]:
+    """
+    Offer ``rate`` requests per second for ``duration`` seconds, open-loop.
+
+    Args:
+        base_url (str): Server to drive, e.g. http://127.0.0.1:8000
+        rate (float): Arrivals per second
+        duration (float): Seconds of arrivals (in-flight requests are then awaited)
+        weights (Dict[str, float]): Scenario name -> relative weight
+        arrivals (str): 'fixed' spacing or 'poisson' (exponential inter-arrival times)
+        max_in_flight (int): Driver threads; arrivals beyond this wait client-side, and
+            that wait counts toward their latency
+        request_timeout (float): Socket timeout per request
+        no_cache (bool): Ask /chat to bypass the response cache
+        seed (int): Seed for the arrival schedule, scenario and message choices
+    """
+    rng = random.Random(seed)
+    by_name = {s.name: s for s in scenarios}
+    names = [name for name, weight in weights.items() if weight > 0]
+    relative = [weights[name] for name in names]
+
+    client = Client(base_url, request_timeout)
+    samples: List[Sample] = []
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='load') as pool:
+        start = time.perf_counter()
+        offset = 0.0
+        while offset < duration:
+            scenario = by_name[rng.choices(names, relative)[0]]
+            message = rng.choice(scenario.messages) if scenario.messages else None
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(fire, client, scenario, message, scheduled, no_cache))
+            offset += rng.expovariate(rate) if arrivals == 'poisson' else 1.0 / rate
+        for future in futures:
+            samples.append(future.result())
+    return samples
+
+
+def _percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(samples: Sequence[Sample], window: float) -> Dict:
+    """
+    Throughput, latency percentiles (ms) and error rate of a group of samples.
+
+    Args:
+        samples (Sequence[Sample]): The group's requests
+        window (float): Seconds from the first arrival to the last completion of the whole run
+    """
+    if not samples:
+        return {'requests': 0}
+    latencies = sorted(s.latency for s in samples)
+    errors = sum(1 for s in samples if s.error)
+    statuses = defaultdict(int)
+    for s in samples:
+        statuses[str(s.status)] += 1
+    return {
+        'requests': len(samples),
+        'throughput_rps': round((len(samples) - errors) / window, 2),
+        'error_rate': round(errors / len(samples), 4),
+        'statuses': dict(sorted(statuses.items())),
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 1),
+        'p90_ms': round(_percentile(latencies, 0.90) * 1000, 1),
+        'p99_ms': round(_percentile(latencies, 0.99) * 1000, 1),
+        'max_ms': round(latencies[-1] * 1000, 1),
+    }
+
+
+def report(samples: Sequence[Sample], rate: float, duration: float) -> Dict:
+    """Summaries overall, per route and per urgency for one arrival rate."""
+    window = (max(s.finished for s in samples) - min(s.scheduled for s in samples)) if samples else duration
+    groups = {'route': defaultdict(list), 'urgency': defaultdict(list)}
+    for s in samples:
+        groups['route'][s.route].append(s)
+        groups['urgency'][s.urgency].append(s)
+    return {
+        'offered_rps': rate,
+        'duration': duration,
+        'window': round(window, 3),
+        'overall': summarize(samples, window),
+        'by_route': {k: summarize(v, window) for k, v in sorted(groups['route'].items())},
+        'by_urgency': {k: summarize(v, window) for k, v in sorted(groups['urgency'].items())},
+    }
+
+
+def print_report(result: Dict, out=sys.stderr) -> None:
+    print(f"\n== offered {result['offered_rps']:g} req/s for {result['duration']:g}s ==", file=out)
+    print(f"{'':<22}{'requests':>9}{'ok req/s':>10}{'errors':>8}{'p50 ms':>9}{'p90 ms':>9}"
+          f"{'p99 ms':>9}{'max ms':>9}", file=out)
+    rows = [('overall', result['overall'])]
+    rows += [(f'route {k}', v) for k, v in result['by_route'].items()]
+    rows += [(f'urgency {k}', v) for k, v in result['by_urgency'].items()]
+    for label, s in rows:
+        if not s['requests']:
+            continue
+        print(f"{label:<22}{s['requests']:>9}{s['throughput_rps']:>10.1f}{s['error_rate']:>8.1%}"
+              f"{s['p50_ms']:>9.1f}{s['p90_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}", file=out)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def server_env(args) -> Dict[str, str]:
+    """Environment for the server process: production config with the stub model."""
+    env = dict(os.environ)
+    env.update({
+        'FLASK_CONFIG': 'production',
+        'LLM_BACKEND': 'stub',
+        'STUB_LATENCY_MS': str(args.latency_ms),
+        'STUB_LATENCY_JITTER_MS': str(args.jitter_ms),
+        'STUB_LATENCY_DISTRIBUTION': args.distribution,
+        'STUB_ERROR_RATE': str(args.error_rate),
+        'STUB_RESPONSE_CHARS': str(args.response_chars),
+        'STUB_SEED': str(args.seed),
+        'MODEL_DEADLINE_SECONDS': str(args.model_timeout),
+        'GUNICORN_WORKERS': str(args.workers),
+        'GUNICORN_THREADS': str(args.threads),
+        # Every simulated user shares one address, so per-client limits would cap the run
+        'RATE_LIMIT_ENABLED': 'true' if args.rate_limit else 'false',
+    })
+    return env
+
+
+def start_server(args, port: int, log) -> subprocess.Popen:
+    """Start gunicorn (or werkzeug's threaded server) on ``port``, writing its output to ``log``."""
+    env = server_env(args)
+    if args.server == 'gunicorn':
+        env['GUNICORN_BIND'] = f'127.0.0.1:{port}'
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'run:app',
+                   '--timeout', str(args.worker_timeout)]
+    else:
+        command = [sys.executable, '-c',
+                   'import sys; from werkzeug.serving import run_simple; from run import app; '
+                   'run_simple("127.0.0.1", int(sys.argv[1]), app, threaded=True)', str(port)]
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_ready(base_url: str, server: Optional[subprocess.Popen] = None, timeout: float = 30.0) -> None:
+    client = Client(base_url, timeout=2.0)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode} before becoming ready")
+        try:
+            if client.request('GET', '/stats', None)[0] == 200:
+                return
+        except (OSError, http.client.HTTPException):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout:g}s")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Load-test the app with a simulated model.')
+    target = parser.add_argument_group('server')
+    target.add_argument('--url', help='Drive an already running server instead of starting one')
+    target.add_argument('--server', choices=('gunicorn', 'werkzeug'), default='gunicorn')
+    target.add_argument('--workers', type=int, default=4, help='Gunicorn worker processes')
+    target.add_argument('--threads', type=int, default=4, help='Gunicorn threads per worker')
+    target.add_argument('--worker-timeout', type=int, default=30, help='Gunicorn worker timeout (s)')
+    target.add_argument('--model-timeout', type=float, default=25.0, help='MODEL_DEADLINE_SECONDS')
+    target.add_argument('--rate-limit', action='store_true',
+                        help='Turn the server\'s rate limits on (all load comes from one client)')
+    model = parser.add_argument_group('simulated model')
+    model.add_argument('--latency-ms', type=float, default=800.0)
+    model.add_argument('--jitter-ms', type=float, default=200.0)
+    model.add_argument('--distribution', choices=('fixed', 'uniform', 'normal', 'lognormal'),
+                       default='lognormal')
+    model.add_argument('--error-rate', type=float, default=0.0)
+    model.add_argument('--response-chars', type=int, default=1200)
+    load = parser.add_argument_group('load')
+    load.add_argument('--rates', type=float, nargs='+', default=[10.0, 25.0, 50.0],
+                      help='Open-loop arrival rates (requests per second), run in turn')
+    load.add_argument('--duration', type=float, default=20.0, help='Seconds of arrivals per rate')
+    load.add_argument('--mix', default=DEFAULT_MIX, help='Scenario weights')
+    load.add_argument('--arrivals', choices=('fixed', 'poisson'), default='poisson')
+    load.add_argument('--max-in-flight', type=int, default=512)
+    load.add_argument('--request-timeout', type=float, default=60.0)
+    load.add_argument('--no-cache', action='store_true', help='Bypass the response cache on /chat')
+    load.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results JSON to this path')
+    parser.add_argument('--server-log', default=os.devnull, help='Where the started server writes its logs')
+    args = parser.parse_args(argv)
+
+    weights = parse_mix(args.mix)
+    server = None
+    base_url = args.url
+    log = open(args.server_log, 'wb')
+    if base_url is None:
+        port = _free_port()
+        base_url = f'http://127.0.0.1:{port}'
+        server = start_server(args, port, log)
+    try:
+        wait_ready(base_url, server)
+        results = []
+        for rate in args.rates:
+            samples = run_rate(base_url, rate, args.duration, weights, arrivals=args.arrivals,
+                               max_in_flight=args.max_in_flight, request_timeout=args.request_timeout,
+                               no_cache=args.no_cache, seed=args.seed)
+            results.append(report(samples, rate, args.duration))
+            print_report(results[-1])
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        log.close()
+
+    output = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'server': 'external' if args.url else args.server,
+            'workers': args.workers,
+            'threads': args.threads,
+            'model': {
+                'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms,
+                'distribution': args.distribution, 'error_rate': args.error_rate,
+                'response_chars': args.response_chars,
+            },
+            'mix': weights,
+            'arrivals': args.arrivals,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,6 +9,110 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-here'
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
     
+    # Logging: records are written by a background thread. Per-request lines are sampled
+    # by level (e.g. "INFO=0.1") and every level is capped in records per second.
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+    LOG_REQUEST_SAMPLE_RATES = os.environ.get('LOG_REQUEST_SAMPLE_RATES', 'INFO=0.1')
+    LOG_RATE_LIMITS = os.environ.get('LOG_RATE_LIMITS', 'INFO=100,WARNING=50,ERROR=50')
+    
+    # Chatbot warm-up: 'eager' (in create_app), 'post_fork' (per gunicorn worker,
+    # use with --preload) or 'lazy' (on first request)
+    CHATBOT_WARMUP = os.environ.get('CHATBOT_WARMUP', 'eager')
+    
+    # Generation backend: 'gemini' or 'stub' (local stand-in, no API calls)
+    LLM_BACKEND = os.environ.get('LLM_BACKEND', 'gemini')
+    GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-1.5-flash')
+    STUB_LATENCY_MS = float(os.environ.get('STUB_LATENCY_MS', 0))
+    STUB_LATENCY_JITTER_MS = float(os.environ.get('STUB_LATENCY_JITTER_MS', 0))
+    STUB_LATENCY_DISTRIBUTION = os.environ.get('STUB_LATENCY_DISTRIBUTION', 'fixed')
+    STUB_RESPONSE_MODE = os.environ.get('STUB_RESPONSE_MODE', 'canned')
+    STUB_RESPONSE_TEXT = os.environ.get('STUB_RESPONSE_TEXT')
+    STUB_SEED = int(os.environ['STUB_SEED']) if os.environ.get('STUB_SEED') else None
+    STUB_ERROR_RATE = float(os.environ.get('STUB_ERROR_RATE', 0))
+    STUB_RESPONSE_CHARS = int(os.environ.get('STUB_RESPONSE_CHARS', 0))
+    
+    # Browser cache lifetime for /health-tips (assets under /assets/<fingerprint>/ never expire)
+    HEALTH_TIPS_MAX_AGE = int(os.environ.get('HEALTH_TIPS_MAX_AGE', 3600))
+    
+    # Indent JSON responses for reading; independent of DEBUG, so development runs the
+    # same compact (orjson, when installed) encoder as production
+    JSON_PRETTY_PRINT = os.environ.get('JSON_PRETTY_PRINT', 'false').lower() == 'true'
+    
+    # Response cache for repeated non-emergency questions
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+    RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 600))
+    
+    # Reuse answers to reworded questions with the same urgency, symptom pattern, negations
+    # and subject/drug/body-part words. Off by default: a reused answer may miss a detail
+    # that set the new question apart.
+    SIMILAR_ANSWERS_ENABLED = os.environ.get('SIMILAR_ANSWERS_ENABLED', 'false').lower() == 'true'
+    SIMILAR_ANSWERS_THRESHOLD = float(os.environ.get('SIMILAR_ANSWERS_THRESHOLD', 0.85))
+    SIMILAR_ANSWERS_MAX_ENTRIES = int(os.environ.get('SIMILAR_ANSWERS_MAX_ENTRIES', 2048))
+    SIMILAR_ANSWERS_TTL = float(os.environ.get('SIMILAR_ANSWERS_TTL', 600))
+    
+    # Coalesce identical in-flight queries into one model call
+    COALESCING_ENABLED = os.environ.get('COALESCING_ENABLED', 'true').lower() == 'true'
+    COALESCING_WAIT_TIMEOUT = float(os.environ.get('COALESCING_WAIT_TIMEOUT', 30))
+    
+    # Multi-turn conversation sessions keyed by the session_id sent with /chat
+    SESSIONS_ENABLED = os.environ.get('SESSIONS_ENABLED', 'true').lower() == 'true'
+    SESSION_MAX_SESSIONS = int(os.environ.get('SESSION_MAX_SESSIONS', 10000))
+    SESSION_MAX_BYTES = int(os.environ.get('SESSION_MAX_BYTES', 16 * 1024 * 1024))
+    SESSION_IDLE_TIMEOUT = float(os.environ.get('SESSION_IDLE_TIMEOUT', 1800))
+    SESSION_MAX_TURNS = int(os.environ.get('SESSION_MAX_TURNS', 6))
+    SESSION_HISTORY_TOKEN_BUDGET = int(os.environ.get('SESSION_HISTORY_TOKEN_BUDGET', 300))
+    
+    # Asynchronous /chat/jobs: background generations and long-polling
+    CHAT_JOB_WORKERS = int(os.environ.get('CHAT_JOB_WORKERS', 32))
+    CHAT_JOB_MAX_PENDING = int(os.environ.get('CHAT_JOB_MAX_PENDING', 500))
+    CHAT_JOB_TTL = float(os.environ.get('CHAT_JOB_TTL', 300))
+    CHAT_JOB_MAX_WAIT = float(os.environ.get('CHAT_JOB_MAX_WAIT', 30))
+    CHAT_JOB_MAX_FINISHED = int(os.environ.get('CHAT_JOB_MAX_FINISHED', 5000))
+    
+    # Rate limits shared by all workers on a host through a memory-mapped file (empty path =
+    # a file under /dev/shm per deployment directory). Per-client requests/second and burst;
+    # host-wide model calls/second (0 = no quota). Emergency-triaged messages are never limited.
+    # Off by default: clients are keyed by address, so behind a reverse proxy set
+    # RATE_LIMIT_TRUST_PROXY or every user shares one bucket.
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'false').lower() == 'true'
+    RATE_LIMIT_PATH = os.environ.get('RATE_LIMIT_PATH') or None
+    RATE_LIMIT_SLOTS = int(os.environ.get('RATE_LIMIT_SLOTS', 4096))
+    RATE_LIMIT_CLIENT_RATE = float(os.environ.get('RATE_LIMIT_CLIENT_RATE', 1))
+    RATE_LIMIT_CLIENT_BURST = float(os.environ.get('RATE_LIMIT_CLIENT_BURST', 20))
+    RATE_LIMIT_MODEL_RATE = float(os.environ.get('RATE_LIMIT_MODEL_RATE', 0))
+    RATE_LIMIT_MODEL_BURST = float(os.environ.get('RATE_LIMIT_MODEL_BURST', 0))
+    # Use the first X-Forwarded-For address as the client (only behind a proxy that sets it)
+    RATE_LIMIT_TRUST_PROXY = os.environ.get('RATE_LIMIT_TRUST_PROXY', 'false').lower() == 'true'
+    
+    # Triage knowledge base (keyword tiers and symptom patterns); defaults to the packaged
+    # app/data/knowledge_base.json. Reloaded when the file changes or on the signal below.
+    KNOWLEDGE_BASE_PATH = os.environ.get('KNOWLEDGE_BASE_PATH') or None
+    KNOWLEDGE_BASE_RELOAD_INTERVAL = float(os.environ.get('KNOWLEDGE_BASE_RELOAD_INTERVAL', 30))
+    KNOWLEDGE_BASE_RELOAD_SIGNAL = os.environ.get('KNOWLEDGE_BASE_RELOAD_SIGNAL', 'SIGHUP')
+    
+    # Rule-based batch triage (/triage/batch never calls the model)
+    TRIAGE_BATCH_MAX_ITEMS = int(os.environ.get('TRIAGE_BATCH_MAX_ITEMS', 500))
+    TRIAGE_BATCH_MAX_MESSAGE_CHARS = int(os.environ.get('TRIAGE_BATCH_MAX_MESSAGE_CHARS', 1000))
+    
+    # Model call deadline, optional hedging (latency percentile, 0 = off) and circuit breaker
+    MODEL_DEADLINE_SECONDS = float(os.environ.get('MODEL_DEADLINE_SECONDS', 25))
+    MODEL_CALL_WORKERS = int(os.environ.get('MODEL_CALL_WORKERS', 16))
+    MODEL_HEDGE_PERCENTILE = float(os.environ.get('MODEL_HEDGE_PERCENTILE', 0))
+    MODEL_HEDGE_MIN_SAMPLES = int(os.environ.get('MODEL_HEDGE_MIN_SAMPLES', 20))
+    BREAKER_FAILURE_THRESHOLD = int(os.environ.get('BREAKER_FAILURE_THRESHOLD', 5))
+    BREAKER_RESET_TIMEOUT = float(os.environ.get('BREAKER_RESET_TIMEOUT', 30))
+    
+    # Admission control for model calls (urgent requests are admitted first)
+    ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', 'true').lower() == 'true'
+    ADMISSION_MAX_CONCURRENT = int(os.environ.get('ADMISSION_MAX_CONCURRENT', 8))
+    ADMISSION_URGENT_QUEUE_LIMIT = int(os.environ.get('ADMISSION_URGENT_QUEUE_LIMIT', 64))
+    ADMISSION_ROUTINE_QUEUE_LIMIT = int(os.environ.get('ADMISSION_ROUTINE_QUEUE_LIMIT', 32))
+    ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 10))
+    ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER', 5))
+    
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
@@ -0,0 +1,26 @@
+"""
+Gunicorn configuration.
+
+Usage:
+    gunicorn -c gunicorn.conf.py run:app
+
+With --preload the app is imported once in the master. Set
+CHATBOT_WARMUP=post_fork so the model client is built in each worker
+instead of being shared across fork().
+"""
+
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+
+def post_worker_init(worker):
+    """Warm up the chatbot in every worker before it accepts requests."""
+    from app.routes import install_reload_signal, warm_up
+    warm_up(worker.wsgi)
+    # Gunicorn resets signal handlers in workers; send the reload signal
+    # (default SIGHUP) to a worker pid to reload its knowledge base
+    install_reload_signal(worker.wsgi)
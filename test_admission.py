@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from app.admission import AdmissionController, AdmissionRejected
+from app.safety import UrgencyLevel
+
+
+def wait_for_depth(controller, tier, depth):
+    deadline = time.monotonic() + 2
+    while controller.stats()['tiers'][tier]['queue_depth'] != depth:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_urgent_waiters_admitted_before_routine():
+    controller = AdmissionController(max_concurrent=1, queue_timeout=2)
+    controller.acquire(UrgencyLevel.ROUTINE)
+    order = []
+
+    def worker(urgency):
+        with controller.slot(urgency):
+            order.append(urgency)
+
+    routine = threading.Thread(target=worker, args=(UrgencyLevel.ROUTINE,))
+    routine.start()
+    wait_for_depth(controller, 'routine', 1)
+    urgent = threading.Thread(target=worker, args=(UrgencyLevel.URGENT,))
+    urgent.start()
+    wait_for_depth(controller, 'urgent', 1)
+
+    controller.release()
+    routine.join()
+    urgent.join()
+
+    assert order == [UrgencyLevel.URGENT, UrgencyLevel.ROUTINE]
+    assert controller.stats()['active'] == 0
+
+
+def test_full_queue_rejects_immediately():
+    controller = AdmissionController(max_concurrent=1, queue_limits={'routine': 0, 'urgent': 1})
+    controller.acquire(UrgencyLevel.URGENT)
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        controller.acquire(UrgencyLevel.ROUTINE)
+
+    assert excinfo.value.reason == 'queue full'
+    assert controller.stats()['tiers']['routine']['rejected'] == 1
+
+
+def test_queue_wait_times_out_and_frees_queue():
+    controller = AdmissionController(max_concurrent=1, queue_timeout=0.01)
+    controller.acquire(UrgencyLevel.URGENT)
+
+    with pytest.raises(AdmissionRejected):
+        controller.acquire(UrgencyLevel.ROUTINE)
+
+    controller.release()
+    controller.acquire(UrgencyLevel.ROUTINE)
+    stats = controller.stats()
+    assert stats['tiers']['routine']['timed_out'] == 1
+    assert stats['tiers']['routine']['queue_depth'] == 0
+    assert stats['active'] == 1
@@ -0,0 +1,44 @@
+import gzip
+import json
+import re
+
+import pytest
+
+from app import create_app
+
+
+@pytest.fixture
+def client():
+    return create_app('development').test_client()
+
+
+def test_health_tips_served_precompressed_with_etag(client):
+    plain = client.get('/health-tips')
+    compressed = client.get('/health-tips', headers={'Accept-Encoding': 'gzip'})
+
+    assert plain.get_json()['tips'] and plain.headers['Cache-Control'] == 'public, max-age=3600'
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(compressed.data)) == plain.get_json()
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+    for etag in (plain.headers['ETag'], compressed.headers['ETag']):
+        revalidated = client.get('/health-tips', headers={'If-None-Match': etag})
+        assert revalidated.status_code == 304 and not revalidated.data
+
+
+def test_page_links_fingerprinted_assets_cached_forever(client):
+    page = client.get('/')
+    urls = re.findall(r'/assets/\w+/[\w/.]+', page.get_data(as_text=True))
+
+    assert page.headers['Cache-Control'] == 'no-cache'
+    assert page.headers['Content-Type'] == 'text/html; charset=utf-8'
+    assert client.get('/', headers={'If-None-Match': page.headers['ETag']}).status_code == 304
+    assert sorted(url.split('/', 3)[3] for url in urls) == ['css/style.css', 'js/chat.js']
+    script = client.get(urls[1])
+    assert script.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert script.data.startswith(b'// Enhanced Medical Chatbot')
+    # The system mime table decides text/ or application/javascript; either way one charset
+    assert script.headers['Content-Type'].endswith('javascript; charset=utf-8')
+    assert script.headers['Content-Type'].count('charset') == 1
+    assert client.get(urls[0]).headers['Content-Type'] == 'text/css; charset=utf-8'
+    assert client.get('/assets/stale/js/chat.js').headers['Cache-Control'] == 'no-cache'
+    assert client.get('/assets/x/missing.js').status_code == 404
@@ -0,0 +1,26 @@
+import random
+
+from app.safety import MedicalSafety, SymptomChecker
+from benchmarks.bench_triage import PROFILES, compare, generate_corpus, grow_vocabulary
+
+
+def test_grow_vocabulary_reaches_target_size():
+    safety, checker = MedicalSafety(), SymptomChecker()
+    grow_vocabulary(safety, checker, 500, random.Random(0))
+
+    total = len(safety.emergency_keywords) + len(safety.urgent_keywords) + len(safety.routine_keywords)
+    assert total == 500
+    assert len(checker.symptom_index) >= 400
+    corpus = generate_corpus(safety, checker, PROFILES[0], 10, random.Random(0))
+    assert len(corpus) == 10
+    assert all(len(message.split()) >= PROFILES[0].words for message in corpus)
+
+
+def test_compare_flags_throughput_drops_beyond_threshold():
+    baseline = {'results': {'a': {'ops_per_sec': 1000.0}, 'b': {'ops_per_sec': 1000.0}}}
+    current = {'results': {'a': {'ops_per_sec': 950.0}, 'b': {'ops_per_sec': 700.0}}}
+
+    regressions = compare(current, baseline, threshold=0.10)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith('b:')
@@ -0,0 +1,58 @@
+import gzip
+import json
+from dataclasses import asdict
+
+from app.bulk_triage import run
+from app.knowledge_base import KnowledgeBase
+
+MESSAGES = [
+    "I have chest pain and trouble breathing",
+    "I've had a persistent cough for two weeks",
+    "I have a mild headache and a runny nose",
+    "fever, headache and body aches since yesterday",
+]
+
+
+def write_corpus(path, count):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(json.dumps({'id': i, 'message': MESSAGES[i % len(MESSAGES)]}) + '\n')
+        f.write('not json\n')
+
+
+def read_jsonl(path):
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_parallel_run_keeps_input_order(tmp_path):
+    source = tmp_path / 'logs.jsonl.gz'
+    write_corpus(source, 101)
+
+    summary = run(str(source), str(tmp_path / 'out.jsonl.gz'), [None], workers=2, chunk_size=7)
+    records = read_jsonl(tmp_path / 'out.jsonl.gz')
+
+    assert [r['id'] for r in records[:-1]] == list(range(101))
+    assert records[0]['urgency'] == 'emergency'
+    assert records[3]['conditions'][0] == 'Influenza (Flu)'
+    assert 'error' in records[-1] and records[-1]['line'] == 102
+    assert summary['messages'] == 102 and summary['errors'] == 1
+    assert summary['urgency'] == {'emergency': 26, 'routine': 50, 'urgent': 25}
+
+
+def test_diff_reports_only_changed_triage(tmp_path):
+    source = tmp_path / 'logs.jsonl.gz'
+    write_corpus(source, 8)
+    data = {**asdict(KnowledgeBase.builtin()), 'version': 'v2'}
+    data['urgent_keywords'] = list(data['urgent_keywords']) + ['mild headache']
+    (tmp_path / 'kb_v2.json').write_text(json.dumps(data))
+
+    summary = run(str(source), str(tmp_path / 'diff.jsonl'), [None, str(tmp_path / 'kb_v2.json')], workers=1)
+    records = read_jsonl(tmp_path / 'diff.jsonl')
+
+    changed = [r for r in records if 'before' in r]
+    assert [r['id'] for r in changed] == [2, 6]
+    assert changed[0]['before']['urgency'] == 'routine' and changed[0]['after']['urgency'] == 'urgent'
+    assert summary['changed'] == 2
+    assert summary['urgency'] == {'routine->urgent': 2}
@@ -0,0 +1,68 @@
+from app.cache import ResponseCache
+from app.backends import LLMBackend
+from app.chatbot import MedicalChatbot
+from app.matcher import KeywordMatcher
+from app.text_analysis import MessageAnalysis
+
+
+class CountingBackend(LLMBackend):
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, system_instruction=None):
+        self.calls += 1
+        return f'answer {self.calls}'
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.set('a', '1')
+    cache.set('b', '2')
+    assert cache.get('a') == '1'
+    cache.set('c', '3')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == '1'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_cache_respects_byte_bound_and_ttl():
+    cache = ResponseCache(max_entries=10, max_bytes=20, ttl=0)
+    cache.set('a', 'x' * 100)
+    assert cache.stats()['entries'] == 0
+
+    cache.set('a', 'short')
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_cache_text_collapses_case_and_whitespace():
+    analysis = MessageAnalysis.from_text('  I have a  Headache\nand fever ', KeywordMatcher({}))
+    assert analysis.cache_text == 'i have a headache and fever'
+
+
+def test_get_response_serves_repeats_from_cache():
+    backend = CountingBackend()
+    bot = MedicalChatbot(None, response_cache=ResponseCache(), backend=backend)
+
+    first = bot.get_response('I have a headache and fever')
+    second = bot.get_response('i have a  headache and FEVER')
+    bypassed = bot.get_response('I have a headache and fever', use_cache=False)
+
+    assert first.cached is False
+    assert second.cached is True
+    assert second.response == first.response
+    assert bypassed.response == 'answer 2'
+    assert backend.calls == 2
+
+
+def test_emergency_bypasses_cache():
+    cache = ResponseCache()
+    backend = CountingBackend()
+    bot = MedicalChatbot(None, response_cache=cache, backend=backend)
+
+    result = bot.get_response('I have chest pain')
+
+    assert result.emergency is True
+    assert backend.calls == 0
+    assert cache.stats()['misses'] == 0
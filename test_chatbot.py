@@ -13,7 +13,7 @@ try:
     bot = MedicalChatbot(api_key)
     response = bot.get_response("Hello, how are you?")
     print("✅ Chatbot test successful!")
-    print(f"Response: {response[:100]}...")
+    print(f"Response: {response.response[:100]}...")
     
 except Exception as e:
     print(f"❌ Error: {e}")
@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from app.backends import LLMBackend
+from app.chatbot import MedicalChatbot
+from app.coalescing import CoalescedWaitTimeout, SingleFlight
+
+
+def run_concurrently(count, target):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'answer'
+
+    results, errors = run_concurrently(5, lambda: flight.do('key', slow))
+
+    assert not errors
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert flight.stats()['calls_saved'] == 4
+
+
+def test_leader_error_reaches_every_waiter():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.05)
+        raise RuntimeError('upstream down')
+
+    results, errors = run_concurrently(3, lambda: flight.do('key', failing))
+
+    assert not results
+    assert [str(e) for e in errors] == ['upstream down'] * 3
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_follower_wait_is_bounded():
+    flight = SingleFlight(wait_timeout=0.01)
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=('key', release.wait))
+    leader.start()
+    while not flight.stats()['in_flight']:
+        time.sleep(0.001)
+
+    with pytest.raises(CoalescedWaitTimeout):
+        flight.do('key', lambda: 'never')
+
+    release.set()
+    leader.join()
+    assert flight.stats()['follower_timeouts'] == 1
+
+
+def test_get_response_coalesces_identical_queries():
+    class SlowBackend(LLMBackend):
+        calls = 0
+
+        def generate(self, prompt, system_instruction=None):
+            SlowBackend.calls += 1
+            time.sleep(0.2)
+            return 'shared answer'
+
+    bot = MedicalChatbot(None, backend=SlowBackend(), single_flight=SingleFlight())
+    results, errors = run_concurrently(4, lambda: bot.get_response('How much water should I drink?'))
+
+    assert not errors
+    assert SlowBackend.calls == 1
+    assert {r.response for r in results} == {'shared answer'}
+    assert sum(r.coalesced for r in results) == 3
+
+
+def test_follower_wait_timeout_falls_back_to_triage():
+    release = threading.Event()
+
+    class StalledBackend(LLMBackend):
+        def generate(self, prompt, system_instruction=None):
+            release.wait()
+            return 'late answer'
+
+    bot = MedicalChatbot(None, backend=StalledBackend(), single_flight=SingleFlight(wait_timeout=0.05))
+    leader = threading.Thread(target=bot.get_response, args=('I have a fever and a cough',))
+    leader.start()
+    time.sleep(0.05)
+    follower = bot.get_response('I have a fever and a cough')
+    release.set()
+    leader.join()
+
+    assert not follower.error and follower.degraded is True
+    assert 'temporarily unavailable' in follower.response
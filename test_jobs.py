@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+from app import create_app, routes
+from app.backends import LLMBackend
+from app.chatbot import MedicalChatbot
+from app.jobs import ChatJobQueue, JobQueueFull
+
+
+class GatedBackend(LLMBackend):
+    def __init__(self):
+        self.release = threading.Event()
+
+    def generate(self, prompt, system_instruction=None):
+        self.release.wait(5)
+        return 'Stay hydrated.'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    bot = MedicalChatbot(None, backend=GatedBackend())
+    monkeypatch.setattr(routes, 'chatbot', bot)
+    monkeypatch.setattr(routes, 'chat_jobs', ChatJobQueue(max_workers=2, max_pending=2))
+    client = create_app('development').test_client()
+    client.bot = bot
+    return client
+
+
+def test_job_returns_triage_then_result_by_long_poll(client):
+    response = client.post('/chat/jobs', json={'message': 'I have a mild headache'})
+    job = response.get_json()
+
+    assert response.status_code == 202
+    assert job['state'] in ('queued', 'running') and job['triage']['urgency'] == 'routine'
+    assert client.get(f"/chat/jobs/{job['job_id']}").status_code == 202
+
+    client.bot.backend.release.set()
+    done = client.get(f"/chat/jobs/{job['job_id']}?wait=5")
+    assert done.status_code == 200
+    assert done.get_json()['state'] == 'done'
+    assert done.get_json()['result']['response'] == 'Stay hydrated.'
+    assert client.get('/chat/jobs/unknown').status_code == 404
+
+
+def test_emergency_job_completes_immediately_and_queue_is_bounded(client):
+    emergency = client.post('/chat/jobs', json={'message': 'I have chest pain'})
+    assert emergency.status_code == 200
+    assert emergency.get_json()['result']['status'] == 'emergency'
+
+    for _ in range(2):
+        assert client.post('/chat/jobs', json={'message': 'I have a mild headache'}).status_code == 202
+    full = client.post('/chat/jobs', json={'message': 'I have a mild headache'})
+    assert full.status_code == 503 and full.headers['Retry-After'] == '5'
+    client.bot.backend.release.set()
+
+
+def test_finished_jobs_expire_after_ttl():
+    jobs = ChatJobQueue(max_workers=1, max_pending=1, ttl=0)
+    job = jobs.submit(lambda: 'ok', lambda e: 'failed')
+    assert job.finished.wait(5)
+    failing = jobs.submit(lambda: 1 / 0, lambda e: type(e).__name__)
+    failing.finished.wait(5)
+
+    assert failing.info() == {'job_id': failing.job_id, 'state': 'failed', 'result': 'ZeroDivisionError'}
+    assert jobs.get(job.job_id) is None
+    assert jobs.stats()['expired'] == 2
+
+    blocker = threading.Event()
+    jobs.submit(blocker.wait, lambda e: None)
+    with pytest.raises(JobQueueFull):
+        jobs.submit(lambda: 'ok', lambda e: None)
+    blocker.set()
+
+
+def test_finished_jobs_are_capped_and_swept_past_a_running_job():
+    jobs = ChatJobQueue(max_workers=2, max_pending=1, ttl=60, max_finished=3)
+    blocker = threading.Event()
+    running = jobs.submit(lambda: blocker.wait(5), lambda e: None)
+    # Emergencies finish synchronously and never count as pending
+    finished = [jobs.complete({'status': 'emergency'}) for _ in range(10)]
+
+    assert jobs.stats()['jobs'] == 4 and jobs.stats()['evicted'] == 7
+    assert jobs.get(finished[0].job_id) is None and jobs.get(finished[-1].job_id) is finished[-1]
+
+    # Expired results behind the still-running job are swept too
+    jobs.ttl = 0
+    assert jobs.get(finished[-1].job_id) is None
+    assert jobs.stats()['jobs'] == 1 and jobs.stats()['expired'] == 3
+    blocker.set()
+    assert running.finished.wait(5)
@@ -0,0 +1,94 @@
+import json
+import os
+from dataclasses import asdict
+
+from app.backends import LLMBackend
+from app.chatbot import MedicalChatbot
+from app.knowledge_base import KnowledgeBase, KnowledgeBaseStore
+from app.safety import MedicalSafety
+
+
+def write_kb(path, version, **changes):
+    data = {**asdict(KnowledgeBase.builtin()), 'version': version, **changes}
+    path.write_text(json.dumps(data))
+    # Make sure the change is visible even on filesystems with coarse mtimes
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + int(version.split('.')[-1]) * 10**9))
+
+
+def test_builtin_knowledge_base_matches_packaged_file():
+    safety = MedicalSafety()
+
+    assert safety.knowledge_base_version == KnowledgeBase.builtin().version
+    assert 'chest pain' in safety.emergency_keywords
+    assert safety.assess_urgency('I have chest pain').urgency.value == 'emergency'
+
+
+def test_reload_swaps_engines_and_keeps_old_on_bad_file(tmp_path):
+    path = tmp_path / 'kb.json'
+    write_kb(path, '1.1')
+    store = KnowledgeBaseStore(str(path))
+    before = store.engines
+
+    assert store.reload() is False  # Unchanged file
+    write_kb(path, '1.2', urgent_keywords=['mild headache'])
+    assert store.reload() is True
+
+    assert store.version == '1.2'
+    assert store.engines.safety.assess_urgency('mild headache').urgency.value == 'urgent'
+    assert before.safety.assess_urgency('mild headache').urgency.value == 'routine'
+
+    path.write_text('{"version": "broken"')
+    assert store.reload(force=True) is False
+    assert store.version == '1.2'
+    assert store.stats()['failures'] == 1
+
+
+def test_in_flight_request_keeps_its_snapshot(tmp_path):
+    path = tmp_path / 'kb.json'
+    write_kb(path, '1.1')
+    store = KnowledgeBaseStore(str(path))
+
+    class ReloadingBackend(LLMBackend):
+        name = 'reloading'
+
+        def generate(self, prompt, system_instruction=None):
+            write_kb(path, '1.2', routine_keywords=[])
+            store.reload()
+            return 'answer'
+
+        def stream(self, prompt, system_instruction=None):
+            yield self.generate(prompt)
+
+    bot = MedicalChatbot(None, backend=ReloadingBackend(), knowledge_base=store)
+    first = bot.get_response('I have a mild fever')
+    second = bot.get_response('I have a mild fever')
+
+    assert first.kb_version == '1.1'
+    assert first.reasoning == 'Common symptoms detected: mild fever'
+    assert second.kb_version == '1.2'
+    assert second.reasoning == 'General health inquiry without specific urgent symptoms'
+
+
+def test_urgent_warning_comes_from_the_request_snapshot(tmp_path):
+    path = tmp_path / 'kb.json'
+    write_kb(path, '1.1')
+    store = KnowledgeBaseStore(str(path))
+
+    class ReloadingBackend(LLMBackend):
+        name = 'reloading'
+
+        def generate(self, prompt, system_instruction=None):
+            write_kb(path, '1.2')
+            store.reload()
+            store.engines.safety.get_emergency_response = lambda triage: 'warning from 1.2'
+            return 'answer'
+
+        def stream(self, prompt, system_instruction=None):
+            yield self.generate(prompt)
+
+    bot = MedicalChatbot(None, backend=ReloadingBackend(), knowledge_base=store)
+    result = bot.get_response('I have a persistent cough', use_cache=False)
+
+    assert result.urgency == 'urgent' and result.kb_version == '1.1'
+    assert 'warning from 1.2' not in result.response and 'URGENT' in result.response.upper()
@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+from app import create_app, routes
+from app.backends import StubBackend, StubBackendError
+from app.chatbot import MedicalChatbot
+from benchmarks.load_test import Sample, parse_mix, report, run_rate
+
+
+def test_stub_backend_simulates_errors_and_response_length():
+    backend = StubBackend(error_rate=0.5, response_chars=300, seed=1)
+    outcomes = []
+    for _ in range(200):
+        try:
+            outcomes.append(len(backend.generate('USER QUERY: hi')))
+        except StubBackendError:
+            outcomes.append(None)
+
+    assert 70 < outcomes.count(None) < 130
+    assert set(outcomes) == {None, 300}
+    with pytest.raises(ValueError):
+        StubBackend(error_rate=2)
+
+
+def test_report_groups_by_route_and_urgency():
+    samples = [
+        Sample('routine_chat', '/chat', 'routine', 200, 0.0, 0.1),
+        Sample('routine_chat', '/chat', 'routine', 500, 0.5, 0.7, 'HTTP 500'),
+        Sample('emergency_chat', '/chat', 'emergency', 200, 1.0, 1.01),
+        Sample('health_tips', '/health-tips', 'none', 200, 1.5, 2.0),
+    ]
+    result = report(samples, rate=2.0, duration=2.0)
+
+    assert result['overall']['requests'] == 4 and result['overall']['error_rate'] == 0.25
+    assert result['by_route']['/chat']['throughput_rps'] == 1.0
+    assert result['by_urgency']['routine']['statuses'] == {'200': 1, '500': 1}
+    assert result['by_urgency']['emergency']['p50_ms'] == 10.0
+    with pytest.raises(ValueError):
+        parse_mix('routine_chat=1,unknown=2')
+
+
+def test_run_rate_drives_a_live_server(monkeypatch):
+    monkeypatch.setattr(routes, 'chatbot', MedicalChatbot(None, backend=StubBackend(latency_ms=5)))
+    server = make_server('127.0.0.1', 0, create_app('production'), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        samples = run_rate(f'http://127.0.0.1:{server.port}', rate=100, duration=0.3,
+                           weights=parse_mix('routine_chat=1,emergency_chat=1,health_tips=1'), no_cache=True)
+    finally:
+        server.shutdown()
+
+    assert len(samples) == 30
+    assert all(s.status == 200 for s in samples)
+    assert {s.urgency for s in samples} == {'routine', 'emergency', 'none'}
@@ -0,0 +1,61 @@
+import logging
+import threading
+
+from app.log_pipeline import REQUEST_LOGGER, LogPipeline, parse_levels, redact
+
+
+class SlowSink(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.messages = []
+
+    def emit(self, record):
+        self.gate.wait(5)
+        self.messages.append(record.getMessage())
+
+
+def test_redact_masks_contact_details_and_ids_in_one_pass():
+    text = 'mail jane.doe@example.com or call +1 (555) 123-4567, member 12345678, key AIza' + 'x' * 35
+    assert redact(text) == 'mail [email] or call [phone], member [number], key [key]'
+    assert redact('fever of 103 for 2 days') == 'fever of 103 for 2 days'
+
+
+def test_redact_keeps_addresses_and_versions_but_masks_phone_formats():
+    text = 'client 192.168.10.254 via 10.0.0.1 on v1.2.3.4, build 2024.1.15, took 1.234 s'
+    assert redact(text) == text
+    assert redact('call 555-123-4567, (555) 123 4567 or +44 20 7946 0958.') == \
+        'call [phone], [phone] or [phone].'
+
+
+def test_pipeline_samples_caps_and_drops_without_blocking():
+    sink = SlowSink()
+    pipeline = LogPipeline(queue_size=5, sample_rates=parse_levels('INFO=0'),
+                           rate_limits=parse_levels('WARNING=20'), sink=sink)
+    handler = pipeline.handler
+    requests, errors = logging.getLogger(REQUEST_LOGGER), logging.getLogger('app.test')
+    for logger in (requests, errors):
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    pipeline.start()
+    logging.getLogger().removeHandler(handler)
+    try:
+        for _ in range(100):
+            requests.info('Processing message: %.10s...', 'call me at 555-123-4567 please')
+        for i in range(30):
+            errors.warning('Failure %d for user@example.com', i)
+
+        stats = pipeline.stats()
+        assert stats['dropped_sampled'] == 100
+        assert stats['dropped_rate_limited'] == 10
+        assert stats['enqueued'] + stats['dropped_queue_full'] == 20
+        assert stats['dropped_queue_full'] >= 14
+    finally:
+        sink.gate.set()
+        pipeline.stop()
+        for logger in (requests, errors):
+            logger.removeHandler(handler)
+            logger.propagate = True
+
+    assert sink.messages[0] == 'Failure 0 for [email]'
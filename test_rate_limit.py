@@ -0,0 +1,147 @@
+import multiprocessing
+
+import pytest
+
+from app import create_app, routes
+from app.admission import AdmissionController, AdmissionRejected
+from app.backends import LLMBackend
+from app.cache import ResponseCache
+from app.chatbot import MedicalChatbot
+from app.rate_limit import RateLimited, RateLimiter, SharedTokenBuckets, default_path
+from app.safety import UrgencyLevel
+
+
+class CountingBackend(LLMBackend):
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, system_instruction=None):
+        self.calls += 1
+        return 'Rest and drink fluids.'
+
+
+def _take_in_child(path, results):
+    buckets = SharedTokenBuckets(str(path), slots=64, stripes=8)
+    results.put([buckets.take('client:shared', rate=0.001, burst=5) for _ in range(3)])
+    buckets.close()
+
+
+def test_client_bucket_limits_and_refills(tmp_path):
+    limiter = RateLimiter(SharedTokenBuckets(str(tmp_path / 'limits'), slots=64, stripes=8),
+                          client_rate=0.5, client_burst=3)
+    for _ in range(3):
+        limiter.check_client('203.0.113.7')
+    with pytest.raises(RateLimited) as excinfo:
+        limiter.check_client('203.0.113.7')
+
+    assert excinfo.value.limit == 'client' and excinfo.value.retry_after == 2
+    # Other clients and anonymous callers have their own (or no) bucket
+    limiter.check_client('198.51.100.1')
+    limiter.check_client(None)
+    assert limiter.stats()['client_limited'] == 1 and limiter.stats()['buckets'] == 2
+
+
+def test_buckets_are_shared_across_processes(tmp_path):
+    path = tmp_path / 'limits'
+    buckets = SharedTokenBuckets(str(path), slots=64, stripes=8)
+    assert [buckets.take('client:shared', rate=0.001, burst=5) for _ in range(3)] == [0.0] * 3
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    child = context.Process(target=_take_in_child, args=(path, results))
+    child.start()
+    waits = results.get(timeout=30)
+    child.join()
+
+    # Five tokens in total: the child gets the last two, then has to wait
+    assert waits[:2] == [0.0, 0.0] and waits[2] > 0
+    assert buckets.take('client:shared', rate=0.001, burst=5) > 0
+
+
+def test_full_stripe_evicts_the_stalest_bucket(tmp_path):
+    buckets = SharedTokenBuckets(str(tmp_path / 'limits'), slots=8, stripes=1)
+    for i in range(20):
+        assert buckets.take(f'client:{i}', rate=1, burst=1) == 0.0
+
+    assert buckets.occupancy() == 8 and buckets.evictions == 12
+
+
+def test_file_with_another_layout_is_refused_not_rewritten(tmp_path):
+    path = str(tmp_path / 'limits')
+    buckets = SharedTokenBuckets(path, slots=64, stripes=8)
+    assert buckets.take('client:a', rate=0.001, burst=1) == 0.0
+
+    with pytest.raises(ValueError, match='64 slots'):
+        SharedTokenBuckets(path, slots=128, stripes=8)
+    # The table in use is untouched
+    assert buckets.take('client:a', rate=0.001, burst=1) > 0
+    assert default_path('/srv/site-a') != default_path('/srv/site-b')
+
+
+def test_model_quota_counts_model_calls_only(tmp_path):
+    backend = CountingBackend()
+    limiter = RateLimiter(SharedTokenBuckets(str(tmp_path / 'limits'), slots=64, stripes=8),
+                          client_rate=0, model_rate=0.01, model_burst=1)
+    bot = MedicalChatbot(None, response_cache=ResponseCache(), backend=backend, rate_limiter=limiter)
+
+    bot.get_response('I have a persistent cough')
+    # Served from the cache without touching the quota
+    assert bot.get_response('I have a persistent cough').cached is True
+    with pytest.raises(RateLimited):
+        bot.get_response('I have a mild rash on my arm')
+    # Emergencies never call the model and are never limited
+    assert bot.get_response('I have chest pain').emergency is True
+
+    events = list(bot.stream_response('My knee hurts after running', use_cache=False))
+    assert events[-1][0] == 'error' and events[-1][1]['status'] == 'rate_limited'
+    assert backend.calls == 1 and limiter.stats()['model_limited'] == 2
+
+
+def test_rejected_admission_keeps_its_model_quota(tmp_path):
+    backend = CountingBackend()
+    limiter = RateLimiter(SharedTokenBuckets(str(tmp_path / 'limits'), slots=64, stripes=8),
+                          client_rate=0, model_rate=0.01, model_burst=1)
+    admission = AdmissionController(max_concurrent=1, queue_limits={'routine': 0, 'urgent': 0})
+    bot = MedicalChatbot(None, backend=backend, admission=admission, rate_limiter=limiter)
+
+    admission.acquire(UrgencyLevel.ROUTINE)
+    with pytest.raises(AdmissionRejected):
+        bot.get_response('I have a mild rash on my arm')
+    admission.release()
+
+    assert bot.get_response('I have a mild rash on my arm').response == 'Rest and drink fluids.'
+    assert backend.calls == 1 and limiter.stats()['model_limited'] == 0
+
+
+def test_chat_returns_429_with_retry_after(monkeypatch, tmp_path):
+    limiter = RateLimiter(SharedTokenBuckets(str(tmp_path / 'limits'), slots=64, stripes=8),
+                          client_rate=0.2, client_burst=2)
+    monkeypatch.setattr(routes, 'chatbot', MedicalChatbot(None, backend=CountingBackend(), rate_limiter=limiter))
+    client = create_app('production').test_client()
+
+    for message in ('I have a headache', 'I have a sore throat'):
+        assert client.post('/chat', json={'message': message}).status_code == 200
+    response = client.post('/chat', json={'message': 'I have a runny nose'})
+    assert response.status_code == 429 and response.headers['Retry-After'] == '5'
+    assert response.get_json()['status'] == 'rate_limited'
+    assert client.post('/chat/jobs', json={'message': 'I have a runny nose'}).status_code == 429
+    # The same client still gets emergency guidance
+    assert client.post('/chat', json={'message': 'I have chest pain'}).get_json()['emergency'] is True
+    assert client.get('/stats').get_json()['rate_limits']['client_limited'] == 2
+
+
+def test_limits_are_off_by_default_and_built_from_config(monkeypatch, tmp_path):
+    app = create_app('production')
+    monkeypatch.setattr(routes, 'chatbot', None)
+    app.config.update(LLM_BACKEND='stub', GEMINI_API_KEY=None)
+    with app.app_context():
+        assert routes.get_chatbot().rate_limiter is None
+
+    monkeypatch.setattr(routes, 'chatbot', None)
+    app.config.update(RATE_LIMIT_ENABLED=True, RATE_LIMIT_PATH=str(tmp_path / 'limits'),
+                      RATE_LIMIT_CLIENT_RATE=0.1, RATE_LIMIT_CLIENT_BURST=1)
+    client = app.test_client()
+    assert client.post('/chat', json={'message': 'I have a headache'}).status_code == 200
+    assert client.post('/chat', json={'message': 'I have a headache'}).status_code == 429
+    assert routes.chatbot.rate_limiter.buckets.path == str(tmp_path / 'limits')
+    monkeypatch.setattr(routes, 'chatbot', None)
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+
+from app.backends import LLMBackend
+from app.chatbot import MedicalChatbot
+from app.resilience import CircuitBreaker, CircuitOpen, DeadlineExceeded, ModelCallGuard
+
+
+class SlowBackend(LLMBackend):
+    name = 'slow'
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+
+    def generate(self, prompt, system_instruction=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        return 'Model answer'
+
+    def stream(self, prompt, system_instruction=None):
+        yield self.generate(prompt, system_instruction)
+
+
+def test_call_past_deadline_raises_and_frees_caller():
+    guard = ModelCallGuard()
+    release = threading.Event()
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        guard.call(release.wait, deadline=time.monotonic() + 0.05)
+    release.set()
+
+    assert time.monotonic() - start < 1
+    assert guard.stats()['timeouts'] == 1
+
+
+def test_breaker_opens_after_repeated_failures_then_recovers():
+    guard = ModelCallGuard(breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.05))
+
+    def failing():
+        raise RuntimeError('upstream down')
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            guard.call(failing)
+    assert guard.stats()['breaker_state'] == 'open'
+
+    with pytest.raises(CircuitOpen):
+        guard.call(lambda: 'skipped')
+
+    time.sleep(0.06)
+    assert guard.call(lambda: 'recovered') == 'recovered'
+    assert guard.stats()['breaker_state'] == 'closed'
+    assert guard.stats()['short_circuited'] == 1
+
+
+def test_half_open_allows_a_single_trial_call():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+
+def test_slow_call_is_hedged_after_percentile():
+    guard = ModelCallGuard(hedge_percentile=0.5, hedge_min_samples=3)
+    for _ in range(3):
+        guard.call(lambda: 'fast')
+
+    attempts = []
+
+    def first_slow_then_fast():
+        attempts.append(1)
+        if len(attempts) == 1:
+            time.sleep(0.5)
+            return 'slow'
+        return 'hedged'
+
+    assert guard.call(first_slow_then_fast, deadline=time.monotonic() + 2) == 'hedged'
+    assert guard.stats()['hedges'] == 1
+    assert guard.stats()['hedge_wins'] == 1
+
+
+def test_open_breaker_returns_triage_only_answer():
+    backend = SlowBackend(delay=0.2)
+    guard = ModelCallGuard(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    bot = MedicalChatbot(None, backend=backend, model_guard=guard)
+    message = "I have a fever, cough and body aches"
+
+    first = bot.get_response(message, deadline=time.monotonic() + 0.05)
+    start = time.perf_counter()
+    second = bot.get_response(message + " today", deadline=time.monotonic() + 5)
+
+    assert time.perf_counter() - start < 0.1
+    assert backend.calls == 1
+    for result in (first, second):
+        assert result.degraded is True
+        assert 'temporarily unavailable' in result.response
+        assert result.symptom_analysis['possible_conditions']
+        assert result.disclaimers
+    assert 'Common Cold' in second.response or 'Flu' in second.response
+
+
+def test_stream_stalled_before_first_chunk_is_cut_off():
+    release = threading.Event()
+
+    class StalledBackend(LLMBackend):
+        def generate(self, prompt, system_instruction=None):
+            return 'unused'
+
+        def stream(self, prompt, system_instruction=None):
+            release.wait()
+            yield 'too late'
+
+    guard = ModelCallGuard()
+    bot = MedicalChatbot(None, backend=StalledBackend(), model_guard=guard)
+
+    start = time.monotonic()
+    events = list(bot.stream_response('I have a sore throat', use_cache=False,
+                                      deadline=time.monotonic() + 0.1))
+    release.set()
+
+    assert time.monotonic() - start < 1
+    assert events[-1][0] == 'error' and events[-1][1]['status'] == 'timeout'
+    assert guard.stats()['timeouts'] == 1
@@ -0,0 +1,79 @@
+import datetime
+import json
+import types
+
+import pytest
+
+from app import create_app, routes, serialization
+from app.backends import LLMBackend
+from app.chatbot import MedicalChatbot
+from config import DevelopmentConfig
+
+
+class FixedBackend(LLMBackend):
+    def generate(self, prompt, system_instruction=None):
+        return 'Rest and drink fluids.'
+
+
+@pytest.fixture
+def bot(monkeypatch):
+    bot = MedicalChatbot(None, backend=FixedBackend())
+    monkeypatch.setattr(routes, 'chatbot', bot)
+    return bot
+
+
+@pytest.mark.parametrize('fast', [True, False])
+def test_chat_json_shape(monkeypatch, bot, fast):
+    if not fast:
+        monkeypatch.setattr(serialization, 'orjson', None)
+    client = create_app('production').test_client()
+
+    data = client.post('/chat', json={'message': 'I have a fever and headache'}).get_json()
+    assert set(data) == {'response', 'urgency', 'risk_level', 'emergency', 'confidence', 'reasoning',
+                         'recommendations', 'response_time', 'disclaimers', 'cached', 'similarity',
+                         'prompt_tokens', 'kb_version', 'session_id', 'status', 'symptom_analysis'}
+    assert data['response'] == 'Rest and drink fluids.' and data['status'] == 'success'
+    assert len(data['disclaimers']) == 3 and data['prompt_tokens']['total'] > 0
+
+    data = client.post('/chat', json={'message': 'I have chest pain'}).get_json()
+    assert set(data) == {'response', 'urgency', 'risk_level', 'emergency', 'confidence', 'reasoning',
+                         'response_time', 'kb_version', 'session_id', 'status'}
+    assert data['emergency'] is True and 'MEDICAL EMERGENCY' in data['response']
+
+
+def test_results_share_precomputed_pieces(bot):
+    first = bot.get_response('I have a persistent cough', use_cache=False)
+    second = bot.get_response('I have a persistent cough', use_cache=False)
+
+    assert first.disclaimers is second.disclaimers
+    assert first.disclaimers[0].startswith('⚠️')
+    # The urgent warning is rendered once per matched keyword set
+    warning = bot.safety_system.get_emergency_response
+    triage = bot.safety_system.assess_urgency('I have a persistent cough')
+    assert warning(triage) is warning(bot.safety_system.assess_urgency('persistent cough again'))
+
+
+def test_provider_matches_stdlib_output(monkeypatch):
+    app = create_app('production')
+    values = [{'when': datetime.datetime(2024, 1, 2, 3, 4, 5), 'items': ('a', 'é')}, {1: 'x'}, [2 ** 70]]
+    fast = [json.loads(app.json.dumps(v)) for v in values]
+    monkeypatch.setattr(serialization, 'orjson', None)
+    slow = [json.loads(app.json.dumps(v)) for v in values]
+    assert fast == slow == [{'when': 'Tue, 02 Jan 2024 03:04:05 GMT', 'items': ['a', 'é']}, {'1': 'x'}, [2 ** 70]]
+
+
+def test_debug_app_uses_fast_encoder_unless_pretty_printing(monkeypatch, bot):
+    orjson = pytest.importorskip('orjson')
+    calls = []
+
+    def dumps(*args, **kwargs):
+        calls.append(args[0])
+        return orjson.dumps(*args, **kwargs)
+
+    monkeypatch.setattr(serialization, 'orjson', types.SimpleNamespace(dumps=dumps, OPT_SORT_KEYS=orjson.OPT_SORT_KEYS))
+    body = create_app('development').test_client().post('/chat', json={'message': 'I have a cough'}).data
+    assert calls and b'\n ' not in body
+
+    monkeypatch.setattr(DevelopmentConfig, 'JSON_PRETTY_PRINT', True)
+    body = create_app('development').test_client().post('/chat', json={'message': 'I have a cough'}).data
+    assert b'\n  "cached"' in body
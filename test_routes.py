@@ -0,0 +1,244 @@
+import json
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from app import create_app, routes
+from app.backends import LLMBackend, StubBackend
+from app.admission import AdmissionController
+from app.chatbot import MedicalChatbot
+from app.safety import UrgencyLevel
+from app.sessions import SessionStore, new_session_id
+
+
+class CountingBackend(LLMBackend):
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, system_instruction=None):
+        self.calls += 1
+        return 'Stay hydrated.'
+
+    def stream(self, prompt, system_instruction=None):
+        self.calls += 1
+        yield 'Stay '
+        yield 'hydrated.'
+
+
+@pytest.fixture
+def bot(monkeypatch):
+    bot = MedicalChatbot(None, backend=CountingBackend())
+    monkeypatch.setattr(routes, 'chatbot', bot)
+    return bot
+
+
+@pytest.fixture
+def client():
+    return create_app('development').test_client()
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        name, data = block.split('\n')
+        events.append((name[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+
+def test_chat_stream_sends_triage_first_then_chunks(client, bot):
+    response = client.post('/chat/stream', json={'message': 'I have a persistent cough'})
+    assert response.mimetype == 'text/event-stream'
+
+    events = parse_events(response.get_data(as_text=True))
+    names = [name for name, _ in events]
+    assert names[0] == 'triage'
+    assert events[0][1]['urgency'] == 'urgent'
+    assert names[-1] == 'done'
+    assert events[-1][1]['disclaimers']
+
+    text = ''.join(payload['text'] for name, payload in events if name == 'chunk')
+    assert text.endswith('Stay hydrated.')
+    assert 'URGENT MEDICAL ATTENTION' in text
+
+
+def test_chat_stream_emergency_skips_model(client, bot):
+    response = client.post('/chat/stream', json={'message': 'I think I am having a heart attack'})
+    events = parse_events(response.get_data(as_text=True))
+
+    assert [name for name, _ in events] == ['triage', 'done']
+    assert events[0][1]['emergency'] is True
+    assert 'MEDICAL EMERGENCY' in events[0][1]['response']
+    assert bot.backend.calls == 0
+
+
+def test_chat_stream_rejects_empty_message(client, bot):
+    response = client.post('/chat/stream', json={'message': '   '})
+    assert response.status_code == 400
+
+
+def test_stub_backend_selected_from_config(monkeypatch):
+    app = create_app('development')
+    monkeypatch.setattr(routes, 'chatbot', None)
+    app.config.update(LLM_BACKEND='stub', STUB_RESPONSE_MODE='echo', GEMINI_API_KEY=None)
+
+    response = app.test_client().post('/chat', json={'message': 'How much water should I drink?'})
+    data = response.get_json()
+
+    assert isinstance(routes.chatbot.backend, StubBackend)
+    assert data['response'] == 'Echo: How much water should I drink?'
+    monkeypatch.setattr(routes, 'chatbot', None)
+
+
+def test_chat_returns_503_when_admission_queue_full(client, bot):
+    bot.admission = AdmissionController(max_concurrent=1, queue_limits={'routine': 0, 'urgent': 0},
+                                        retry_after=7)
+    bot.admission.acquire(UrgencyLevel.ROUTINE)
+
+    response = client.post('/chat', json={'message': 'How much water should I drink?'})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '7'
+    assert bot.backend.calls == 0
+
+
+def test_metrics_exposes_stage_histograms(client, bot):
+    client.post('/chat', json={'message': 'I have a headache and fever'})
+
+    body = client.get('/metrics').get_data(as_text=True)
+
+    for stage in ('text_analysis', 'assess_urgency', 'analyze_symptoms',
+                  'prompt_assembly', 'model_call', 'response_assembly'):
+        assert f'chatbot_stage_duration_seconds_count{{stage="{stage}"}}' in body
+    assert 'chatbot_requests_total{urgency="routine",outcome="success"}' in body
+    assert 'chatbot_stage_duration_seconds_quantile{stage="model_call",quantile="0.99"}' in body
+
+
+def test_concurrent_first_requests_build_one_chatbot(monkeypatch):
+    app = create_app('development')
+    monkeypatch.setattr(routes, 'chatbot', None)
+    app.config.update(LLM_BACKEND='stub', GEMINI_API_KEY=None)
+    built = []
+    original = routes.build_chatbot
+
+    def counting_build(settings):
+        built.append(1)
+        return original(settings)
+
+    monkeypatch.setattr(routes, 'build_chatbot', counting_build)
+    barrier = threading.Barrier(8)
+
+    def first_request():
+        barrier.wait()
+        with app.app_context():
+            routes.get_chatbot()
+
+    threads = [threading.Thread(target=first_request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1
+    monkeypatch.setattr(routes, 'chatbot', None)
+
+
+def test_health_tips_and_triage_do_not_import_gemini_sdk():
+    script = (
+        "import sys\n"
+        "from app import create_app\n"
+        "app = create_app('development')\n"
+        "app.config.update(LLM_BACKEND='stub')\n"
+        "client = app.test_client()\n"
+        "assert client.get('/health-tips').status_code == 200\n"
+        "assert client.post('/triage/batch', json={'messages': ['chest pain']}).status_code == 200\n"
+        "from app.safety import MedicalSafety\n"
+        "MedicalSafety().assess_urgency('chest pain')\n"
+        "assert 'google.generativeai' not in sys.modules\n"
+    )
+    env = {'CHATBOT_WARMUP': 'lazy', 'GEMINI_API_KEY': '', 'PATH': ''}
+    result = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_chat_reports_prompt_tokens_and_sends_system_instruction(client, bot):
+    seen = {}
+
+    def generate(prompt, system_instruction=None):
+        seen.update(prompt=prompt, system=system_instruction)
+        return 'ok'
+
+    bot.backend.generate = generate
+    data = client.post('/chat', json={'message': 'I have a headache and fever and body aches'}).get_json()
+
+    assert seen['system'] == bot.prompt_builder.system_instruction
+    assert not seen['system'].startswith(' ')
+    assert 'SYMPTOM PATTERNS: Influenza (Flu)' in seen['prompt']
+    assert seen['prompt'].endswith('USER QUERY: I have a headache and fever and body aches')
+    assert data['prompt_tokens']['total'] == data['prompt_tokens']['system'] + data['prompt_tokens']['user']
+
+
+def test_triage_batch_returns_per_item_results_without_model(client, bot):
+    messages = [
+        'I have chest pain',
+        {'id': 'intake-7', 'message': 'fever, headache and body aches'},
+        '   ',
+        'I have chest pain',
+    ]
+    response = client.post('/triage/batch', json={'messages': messages})
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert bot.backend.calls == 0
+    assert [r.get('urgency') for r in data['results']] == ['emergency', 'routine', None, 'emergency']
+    assert data['results'][1]['id'] == 'intake-7'
+    assert data['results'][1]['symptom_analysis']['possible_conditions'][0]['condition'] == 'Influenza (Flu)'
+    assert 'error' in data['results'][2]
+    assert data['errors'] == 1
+    assert data['limits']['max_items'] == 500
+    assert data['timing']['total_ms'] >= 0
+    assert data['kb_version'] == routes.knowledge_base.version
+    assert f'chatbot_knowledge_base_info{{version="{data["kb_version"]}"}} 1' in client.get('/metrics').get_data(as_text=True)
+
+
+def test_triage_batch_enforces_item_limit(client):
+    client.application.config['TRIAGE_BATCH_MAX_ITEMS'] = 2
+    response = client.post('/triage/batch', json={'messages': ['a', 'b', 'c']})
+
+    assert response.status_code == 413
+    assert response.get_json()['limits']['max_items'] == 2
+
+
+def test_chat_session_carries_history_into_prompt(client, monkeypatch):
+    prompts = []
+    bot = MedicalChatbot(None, backend=CountingBackend(), sessions=SessionStore())
+    monkeypatch.setattr(routes, 'chatbot', bot)
+    bot.backend.generate = lambda prompt, system_instruction=None: prompts.append(prompt) or 'ok'
+
+    first = client.post('/chat', json={'message': 'I have a persistent cough'}).get_json()
+    session_id = first['session_id']
+    client.post('/chat', json={'message': 'It is worse at night', 'session_id': session_id})
+
+    assert 'CONVERSATION' not in prompts[0]
+    assert 'CONVERSATION: 1 earlier turns; symptoms reported: persistent cough, cough; highest urgency: urgent' in prompts[1]
+    assert 'EARLIER USER: I have a persistent cough' in prompts[1]
+    assert client.post('/chat', json={'message': 'hi', 'session_id': 'bad id!'}).status_code == 400
+    assert 'chatbot_sessions{stat="sessions"} 1' in client.get('/metrics').get_data(as_text=True)
+
+
+def test_unissued_session_id_starts_a_new_conversation(client, monkeypatch):
+    prompts = []
+    bot = MedicalChatbot(None, backend=CountingBackend(), sessions=SessionStore())
+    monkeypatch.setattr(routes, 'chatbot', bot)
+    bot.backend.generate = lambda prompt, system_instruction=None: prompts.append(prompt) or 'ok'
+
+    first = client.post('/chat', json={'message': 'I have a persistent cough'}).get_json()
+    # Well-formed but never issued: a fresh session, not one under the client's string
+    guessed = new_session_id()
+    reply = client.post('/chat', json={'message': 'It is worse at night', 'session_id': guessed}).get_json()
+
+    assert reply['session_id'] not in (guessed, first['session_id'])
+    assert 'CONVERSATION' not in prompts[1]
+    assert not bot.sessions.active(guessed)
+    assert client.post('/chat', json={'message': 'hi', 'session_id': 'x'}).status_code == 400
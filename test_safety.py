@@ -0,0 +1,173 @@
+import random
+
+from app.fuzzy import FuzzyPhraseIndex
+from app.matcher import KeywordMatcher
+from app.safety import MedicalSafety, SymptomChecker, UrgencyLevel
+from app.text_analysis import TextAnalyzer
+
+
+def naive_tier_matches(safety, message):
+    message_lower = message.lower()
+    return {
+        'emergency': [kw for kw in safety.emergency_keywords if kw in message_lower],
+        'urgent': [kw for kw in safety.urgent_keywords if kw in message_lower],
+        'routine': [kw for kw in safety.routine_keywords if kw in message_lower],
+    }
+
+
+def test_matcher_reports_overlapping_keywords_with_spans():
+    matcher = KeywordMatcher({'a': ['chest pain', 'crushing chest pain'], 'b': ['pain']})
+    text = 'crushing chest pain'
+    matches = matcher.find_all(text)
+
+    found = {(m.tier, m.keyword, m.start, m.end) for m in matches}
+    assert found == {
+        ('a', 'crushing chest pain', 0, 19),
+        ('a', 'chest pain', 9, 19),
+        ('b', 'pain', 15, 19),
+    }
+    for m in matches:
+        assert text[m.start:m.end] == m.keyword
+
+
+def test_matcher_whole_word_filter():
+    matcher = KeywordMatcher({'a': ['stroke']})
+    assert [m.whole_word for m in matcher.find_all('heatstroke, stroke')] == [False, True]
+    assert len(matcher.find_all('heatstroke, stroke', whole_words=True)) == 1
+
+
+def test_assess_urgency_matches_naive_scan():
+    safety = MedicalSafety()
+    vocabulary = safety.emergency_keywords + safety.urgent_keywords + safety.routine_keywords
+    filler = ['i', 'have', 'a', 'since', 'yesterday', 'and', 'really', 'bad', 'the']
+    rng = random.Random(1234)
+
+    for _ in range(500):
+        words = [rng.choice(filler + vocabulary) for _ in range(rng.randint(1, 12))]
+        message = ' '.join(words).upper() if rng.random() < 0.2 else ' '.join(words)
+        expected = naive_tier_matches(safety, message)
+        result = safety.assess_urgency(message)
+
+        if expected['emergency']:
+            assert result.urgency == UrgencyLevel.EMERGENCY
+            assert result.reasoning == f"Emergency keywords detected: {', '.join(expected['emergency'])}"
+        elif expected['urgent']:
+            assert result.urgency == UrgencyLevel.URGENT
+            assert result.reasoning == f"Urgent symptoms detected: {', '.join(expected['urgent'])}"
+        elif expected['routine']:
+            assert result.reasoning == f"Common symptoms detected: {', '.join(expected['routine'])}"
+        else:
+            assert result.confidence == 0.4
+
+
+def naive_analyze_symptoms(checker, message):
+    message_lower = message.lower()
+    matched_conditions = []
+    for pattern_data in checker.symptom_patterns.values():
+        symptom_matches = sum(1 for symptom in pattern_data['symptoms'] if symptom in message_lower)
+        if symptom_matches >= 2:
+            match_ratio = symptom_matches / len(pattern_data['symptoms'])
+            for condition in pattern_data['conditions']:
+                matched_conditions.append({
+                    'condition': condition['name'],
+                    'confidence': round(condition['confidence'] * match_ratio, 2),
+                    'reasoning': condition['reasoning'],
+                    'matched_symptoms': symptom_matches,
+                    'total_symptoms': len(pattern_data['symptoms'])
+                })
+    matched_conditions.sort(key=lambda x: x['confidence'], reverse=True)
+    return {
+        'possible_conditions': matched_conditions[:3],
+        'total_matches': len(matched_conditions),
+        'analysis_confidence': 'high' if matched_conditions and matched_conditions[0]['confidence'] > 0.6 else 'moderate'
+    }
+
+
+def test_analyze_symptoms_matches_full_scan():
+    checker = SymptomChecker()
+    symptoms = list(checker.symptom_index)
+    filler = ['i', 'have', 'a', 'with', 'and', 'since', 'monday']
+    rng = random.Random(99)
+
+    for _ in range(500):
+        words = [rng.choice(filler + symptoms) for _ in range(rng.randint(1, 10))]
+        message = ' '.join(words)
+        assert checker.analyze_symptoms(message) == naive_analyze_symptoms(checker, message)
+
+
+def test_shared_analysis_matches_string_apis():
+    safety, checker = MedicalSafety(), SymptomChecker()
+    analyzer = TextAnalyzer(safety, checker)
+    message = 'Severe headache, fever and body aches with a persistent cough'
+
+    analysis = analyzer.analyze(message)
+
+    assert safety.assess_urgency_from(analysis) == safety.assess_urgency(message)
+    assert checker.analyze_symptoms_from(analysis) == checker.analyze_symptoms(message)
+    assert analysis.terms('symptom') == ['fever', 'headache', 'body aches', 'cough']
+    for match in analysis.matches:
+        assert analysis.normalized[match.start:match.end] == match.keyword
+    assert analysis.tokens[0] == (0, 6)
+
+
+def test_batch_methods_match_single_message_results():
+    safety, checker = MedicalSafety(), SymptomChecker()
+    messages = ['I have chest pain', 'persistent cough and fever', 'I have chest pain', 'runny nose, cough, sore throat']
+
+    triage = safety.assess_urgency_batch(messages)
+    symptoms = checker.analyze_symptoms_batch(messages)
+
+    assert triage == [safety.assess_urgency(m) for m in messages]
+    assert symptoms == [checker.analyze_symptoms(m) for m in messages]
+    assert triage[0] is triage[2]
+
+
+def test_misspelled_emergency_phrases_are_caught():
+    safety = MedicalSafety()
+    cases = {
+        'I have chest pian': ("chest pain", "chest pian", 1),
+        'cant breath': ("can't breathe", "cant breath", 1),
+        'I think I had a siezure': ("seizure", "siezure", 1),
+        'severe headache with fevr': ("severe headache with fever", "severe headache with fevr", 1),
+    }
+
+    for message, (keyword, matched, distance) in cases.items():
+        result = safety.assess_urgency(message)
+        assert result.urgency == UrgencyLevel.EMERGENCY
+        assert f"{keyword} (as '{matched}', edit distance {distance})" in result.reasoning
+
+
+def test_fuzzy_matching_ignores_near_miss_everyday_words():
+    safety = MedicalSafety()
+
+    for message in ['I enjoy cooking', 'a lightning strike', 'my chest is fine', 'I have a mild headache']:
+        assert safety.assess_urgency(message).urgency != UrgencyLevel.EMERGENCY
+
+
+def test_fuzzy_matching_leaves_real_words_alone():
+    safety = MedicalSafety()
+    messages = ['the severe rain last night', 'I have severe gain in weight', 'a severe pair of shoes',
+                'broken bond with my sister', 'heart attach on my email', 'chest plain']
+
+    for message in messages:
+        assert safety.assess_urgency(message).urgency != UrgencyLevel.EMERGENCY, message
+
+
+def test_short_keyword_words_need_a_missing_or_swapped_letter():
+    index = FuzzyPhraseIndex(['chest pain', 'heart attack'], known_words=())
+
+    assert index.find('chest pian') and index.find('chst pain')
+    assert not index.find('chest rain') and not index.find('chest paint')
+    # Longer words still tolerate a substitution unless they are known words
+    assert index.find('heart attach')
+    assert not FuzzyPhraseIndex(['heart attack'], known_words=['attach']).find('heart attach')
+
+
+def test_fuzzy_index_bounds_edit_distance():
+    index = FuzzyPhraseIndex(['chest pain', 'anaphylaxis'])
+
+    assert [m.distance for m in index.find('chest pian')] == [1]
+    assert [m.distance for m in index.find('anaphlaxis')] == [1]
+    assert not index.find('anaphlaxsis')  # Lone words tolerate a single edit
+    assert index.find('chst pian') and not index.find('chst pn')
+    assert not index.find('chest pian', covered=[(6, 10)])
@@ -0,0 +1,47 @@
+from app.sessions import SessionStore, new_session_id, valid_session_id
+
+
+def test_history_is_compacted_into_summary_within_budget():
+    store = SessionStore(max_turns=3, history_token_budget=60)
+    store.record('s1', 'I have a fever', 'Rest and fluids.', 'routine', symptoms=['fever'])
+    store.record('s1', 'now a severe headache too', 'Please see a doctor.', 'urgent',
+                 symptoms=['headache'], conditions=['Migraine'])
+    for i in range(50):
+        store.record('s1', f'question {i} ' + 'words ' * 20, 'answer ' * 200, 'routine')
+
+    context = store.context('s1')
+    assert context.startswith('CONVERSATION: 52 earlier turns; symptoms reported: fever, headache; '
+                              'conditions considered: Migraine; highest urgency: urgent')
+    assert 'question 49' in context and 'question 10' not in context
+    assert len(context) < 1500
+    assert store.stats()['compactions'] >= 49
+
+
+def test_sessions_evicted_by_count_bytes_and_idle_time():
+    store = SessionStore(max_sessions=2)
+    for session_id in ('a', 'b'):
+        store.record(session_id, 'hello', 'hi', 'routine')
+    store.context('a')
+    store.record('c', 'hello', 'hi', 'routine')
+
+    assert store.context('b') == ''
+    assert store.context('a') and store.context('c')
+    assert store.stats()['evictions'] == 1
+
+    small = SessionStore(max_bytes=2000)
+    for session_id in range(10):
+        small.record(str(session_id), 'x' * 300, 'y' * 200, 'routine')
+    assert small.stats()['bytes'] <= 2000 and small.stats()['sessions'] < 10
+
+    idle = SessionStore(idle_timeout=0)
+    idle.record('a', 'hello', 'hi', 'routine')
+    assert idle.context('a') == ''
+    assert idle.stats() == {'sessions': 0, 'bytes': 0, 'created': 1, 'compactions': 0,
+                            'evictions': 0, 'expirations': 1}
+
+
+def test_valid_session_id():
+    assert valid_session_id(new_session_id())
+    # Short client-chosen ids are refused, not just malformed ones
+    assert not valid_session_id('x') and not valid_session_id('1') and not valid_session_id('Ab3_-x')
+    assert not valid_session_id('') and not valid_session_id('a b' * 8) and not valid_session_id(7)
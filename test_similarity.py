@@ -0,0 +1,54 @@
+from app.backends import LLMBackend
+from app.chatbot import MedicalChatbot
+from app.similarity import SimilarAnswerIndex, shingles
+
+
+class CountingBackend(LLMBackend):
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, system_instruction=None):
+        self.calls += 1
+        return f'answer {self.calls}'
+
+
+def test_paraphrase_reuses_answer_with_same_triage_outcome():
+    bot = MedicalChatbot(None, backend=CountingBackend(), similar_answers=SimilarAnswerIndex())
+
+    first = bot.get_response("I've got a fever and headache")
+    second = bot.get_response('I have a headache and a fever')
+    other = bot.get_response('fever and a persistent cough')  # Urgent: separate partition
+
+    assert second.response == first.response == 'answer 1'
+    assert second.cached and second.similarity >= 0.85
+    assert other.response.endswith('answer 2') and other.similarity is None
+    assert bot.get_response('headache and fever', use_cache=False).response == 'answer 3'
+
+
+def test_index_is_bounded_and_checks_few_candidates():
+    index = SimilarAnswerIndex(threshold=0.6, max_entries=100)
+    for i in range(500):
+        index.add('p', shingles(f'topic{i} detail{i} extra{i}'), f'answer {i}')
+
+    assert index.stats()['entries'] == 100
+    assert index.lookup('p', shingles('topic5 detail5 extra5')) is None  # Evicted
+    assert index.lookup('p', shingles('topic450 detail450 extra450 now')) == ('answer 450', 0.75)
+    assert index.lookup('q', shingles('topic450 detail450 extra450')) is None
+    assert index.stats()['candidates_checked'] < 10
+
+
+def test_questions_about_different_things_never_share_an_answer():
+    pairs = [
+        ('Is it safe to give aspirin to my dog?', 'Is it safe to give aspirin to my child?'),
+        ('Can I take ibuprofen with food', 'Can I take ibuprofen without food'),
+        ('is tylenol safe when pregnant', 'is tylenol not safe when pregnant'),
+        ('How much water should I drink daily?', 'How much alcohol should I drink daily?'),
+    ]
+    for first, second in pairs:
+        # Even a permissive threshold cannot bridge a changed anchor word
+        for threshold in (0.85, 0.5):
+            bot = MedicalChatbot(None, backend=CountingBackend(),
+                                 similar_answers=SimilarAnswerIndex(threshold=threshold))
+            assert bot.get_response(first).response == 'answer 1'
+            result = bot.get_response(second)
+            assert result.response == 'answer 2' and result.similarity is None, (first, second)